@@ -1,4 +1,6 @@
 xref_map = {
+    "apply_piecewise_affine": ("function", "menpo.transform.apply_piecewise_affine"),
+    "apply_tiled": ("function", "menpo.image.apply_tiled"),
     "as_vector": ("function", "menpo.base.Vectorizable.as_vector"),
     "Affine": ("class", "menpo.transform.Affine"),
     "Alignment": ("class", "menpo.transform.Alignment"),
@@ -6,6 +8,8 @@ xref_map = {
     "AlignmentSimilarity": ("class", "menpo.transform.AlignmentSimilarity"),
     "BooleanImage": ("class", "menpo.image.BooleanImage"),
     "bounding_box": ("function", "menpo.shape.pointcloud.bounding_box"),
+    "clear_shared_caches": ("function", "menpo.transform.clear_shared_caches"),
+    "copy_on_write": ("function", "menpo.base.copy_on_write"),
     "Copyable": ("class", "menpo.base.Copyable"),
     "ComposableTransform": (
         "class",
@@ -13,20 +17,42 @@ xref_map = {
     ),
     "DirectedGraph": ("class", "menpo.shape.DirectedGraph"),
     "DiscreteAffine": ("class", "menpo.transform.DiscreteAffine"),
+    "ensure_writeable": ("function", "menpo.base.ensure_writeable"),
+    "es": ("function", "menpo.feature.es"),
+    "extract_patches_from_images": (
+        "function",
+        "menpo.image.extract_patches_from_images",
+    ),
     "from_vector_inplace": ("function", "menpo.base.Vectorizable.from_vector_inplace"),
     "from_vector": ("function", "menpo.base.Vectorizable.from_vector"),
+    "gaussian_filter": ("function", "menpo.feature.gaussian_filter"),
+    "get_copy_on_write": ("function", "menpo.base.get_copy_on_write"),
+    "get_default_interpolation_backend": (
+        "function",
+        "menpo.image.get_default_interpolation_backend",
+    ),
+    "get_max_transform_memory": ("function", "menpo.base.get_max_transform_memory"),
+    "get_pixel_precision": ("function", "menpo.base.get_pixel_precision"),
+    "get_shared_cache_memory": ("function", "menpo.transform.get_shared_cache_memory"),
     "glyph": ("function", "menpo.feature.visualize.glyph"),
     "GMRFModel": ("class", "menpo.model.gmrf.GMRFModel"),
     "GMRFVectorModel": ("class", "menpo.model.gmrf.GMRFVectorModel"),
+    "gradient": ("function", "menpo.feature.gradient"),
     "GraphPlotter": ("class", "menpo.visualize.GraphPlotter"),
     "Homogeneous": ("class", "menpo.transform.Homogeneous"),
     "HomogFamilyAlignment": ("class", "menpo.transform.HomogFamilyAlignment"),
+    "igo": ("function", "menpo.feature.igo"),
+    "import_image": ("function", "menpo.io.import_image"),
     "import_images": ("function", "menpo.io.import_images"),
     "Image": ("class", "menpo.image.Image"),
+    "ImageInfo": ("class", "menpo.io.ImageInfo"),
+    "ImagePyramid": ("class", "menpo.image.ImagePyramid"),
     "image_paths": ("function", "menpo.io.image_paths"),
     "ImageBoundaryError": ("class", "menpo.image.ImageBoundaryError"),
     "InstanceBackedModel": ("class", "menpo.model.instancebacked.InstanceBackedModel"),
     "Invertible": ("class", "menpo.transform.base.invertible.Invertible"),
+    "iter_tiles": ("function", "menpo.image.iter_tiles"),
+    "keep_integer_pixels": ("function", "menpo.base.keep_integer_pixels"),
     "LabelledPointUndirectedGraph": (
         "class",
         "menpo.shape.LabelledPointUndirectedGraph",
@@ -40,6 +66,7 @@ xref_map = {
     "LinearModel": ("class", "menpo.model.linear.LinearModel"),
     "MaskedImage": ("class", "menpo.image.MaskedImage"),
     "MatplotlibRenderer": ("class", "menpo.visualize.MatplotlibRenderer"),
+    "max_transform_memory": ("function", "menpo.base.max_transform_memory"),
     "MeanInstanceLinearModel": ("class", "menpo.model.MeanInstanceLinearModel"),
     "MeanLinearModel": ("class", "menpo.model.linear.MeanLinearModel"),
     "MultipleAlignment": ("class", "menpo.transform.MultipleAlignment"),
@@ -47,11 +74,19 @@ xref_map = {
     "PCAModel": ("class", "menpo.model.pca.PCAModel"),
     "PCAVectorModel": ("class", "menpo.model.pca.PCAVectorModel"),
     "PiecewiseAffine": ("class", "menpo.transform.PiecewiseAffine"),
+    "pixel_float_dtype": ("function", "menpo.base.pixel_float_dtype"),
+    "pixel_precision": ("function", "menpo.base.pixel_precision"),
+    "probe_image": ("function", "menpo.io.probe_image"),
+    "probe_images": ("function", "menpo.io.probe_images"),
     "PointCloud": ("class", "menpo.shape.PointCloud"),
     "PointGraphViewer2d": ("class", "menpo.visualize.PointGraphViewer2d"),
     "PointDirectedGraph": ("class", "menpo.shape.PointDirectedGraph"),
     "pca": ("function", "menpo.math.pca"),
     "pcacov": ("function", "menpo.math.pcacov"),
+    "set_copy_on_write": ("function", "menpo.base.set_copy_on_write"),
+    "set_max_transform_memory": ("function", "menpo.base.set_max_transform_memory"),
+    "set_pixel_precision": ("function", "menpo.base.set_pixel_precision"),
+    "set_shared_cache_memory": ("function", "menpo.transform.set_shared_cache_memory"),
     "Shape": ("class", "menpo.shape.Shape"),
     "PointTree": ("class", "menpo.shape.PointTree"),
     "PointUndirectedGraph": ("class", "menpo.shape.PointUndirectedGraph"),
@@ -59,7 +94,9 @@ xref_map = {
     "Renderer": ("class", "menpo.visualize.Renderer"),
     "Rotation": ("class", "menpo.shape.Rotation"),
     "Scale": ("class", "menpo.shape.Scale"),
+    "shared_cache_memory": ("function", "menpo.transform.shared_cache_memory"),
     "Similarity": ("class", "menpo.transform.Similarity"),
+    "SplineCoefficients": ("class", "menpo.image.SplineCoefficients"),
     "sum_channels": ("function", "menpo.feature.visualize.sum_channels"),
     "Targetable": ("class", "menpo.base.Targetable"),
     "Transform": ("class", "menpo.transform.Transform"),
@@ -78,4 +115,15 @@ xref_map = {
     "VComposable": ("class", "menpo.transform.VComposable"),
     "VInvertible": ("class", "menpo.transform.base.invertible.VInvertible"),
     "video_paths": ("function", "menpo.io.video_paths"),
+    "warp_to_shape_tiled": ("function", "menpo.image.warp_to_shape_tiled"),
+    "WarpPlan": ("class", "menpo.image.WarpPlan"),
+    "warp_images": ("function", "menpo.image.warp_images"),
+    "register_interpolation_backend": (
+        "function",
+        "menpo.image.register_interpolation_backend",
+    ),
+    "set_default_interpolation_backend": (
+        "function",
+        "menpo.image.set_default_interpolation_backend",
+    ),
 }
@@ -6,10 +6,13 @@ except ImportError:
     import collections as collections_abc
 import textwrap
 import warnings
+from contextlib import contextmanager
 from functools import partial, wraps
 from itertools import chain
 from pprint import pformat
 
+import numpy as np
+
 
 class Copyable(object):
     """
@@ -19,6 +22,9 @@ class Copyable(object):
     efficiently.
     """
 
+    # The array attributes that are shared under copy-on-write
+    _copy_on_write_attributes = ()
+
     def copy(self):
         r"""
         Generate an efficient copy of this object.
@@ -26,17 +32,35 @@ class Copyable(object):
         Note that Numpy arrays and other :map:`Copyable` objects on ``self``
         will be deeply copied. Dictionaries and sets will be shallow copied,
         and everything else will be assigned (no copy will be made).
+        Read-only, file-backed memory maps are not read into memory - the
+        same region of the file is mapped again in copy-on-write mode.
 
         Classes that store state other than numpy arrays and immutable types
         should overwrite this method to ensure all state is copied.
 
+        If copy-on-write is enabled (see :map:`set_copy_on_write`), the arrays
+        named in ``_copy_on_write_attributes`` (e.g. the pixels of images and
+        the points of pointclouds) are not copied. Instead, they are shared by
+        this object and the copy and marked read-only, until either side
+        obtains a private copy with :map:`ensure_writeable`.
+
         Returns
         -------
         ``type(self)``
             A copy of this object
         """
         new = self.__class__.__new__(self.__class__)
+        shared = self._copy_on_write_attributes if get_copy_on_write() else ()
         for k, v in self.__dict__.items():
+            region = memmap_region(v)
+            if region is not None:
+                new.__dict__[k] = open_memmap_region(*region, mode="c")
+                continue
+            if k in shared and isinstance(v, np.ndarray):
+                # Share the buffer, protecting both sides from writes
+                v.flags.writeable = False
+                new.__dict__[k] = v
+                continue
             try:
                 new.__dict__[k] = v.copy()
             except AttributeError:
@@ -816,3 +840,346 @@ def copy_landmarks_and_path(source, target):
     if hasattr(source, "path"):
         target.path = source.path
     return target
+
+
+def memmap_region(array):
+    r"""
+    Describe the region of a file that is covered by a read-only, file-backed
+    :class:`numpy.memmap` (or a C-contiguous view of one). As the contents of
+    such an array are guaranteed to match the file, the region can be mapped
+    again (see :func:`open_memmap_region`) instead of copying the data.
+
+    Parameters
+    ----------
+    array : `object`
+        The object to describe.
+
+    Returns
+    -------
+    region : `tuple` or ``None``
+        The ``(filename, offset, shape, dtype)`` of the region, or ``None`` if
+        ``array`` is not a read-only, C-contiguous, file-backed memory map.
+    """
+    if (
+        not isinstance(array, np.memmap)
+        or array.flags.writeable
+        or not array.flags.c_contiguous
+    ):
+        return None
+    # Find the array that directly wraps the memory mapped file
+    root = array
+    while isinstance(root.base, np.ndarray):
+        root = root.base
+    if not isinstance(root, np.memmap) or root.filename is None:
+        return None
+    offset = root.offset + (array.ctypes.data - root.ctypes.data)
+    return root.filename, offset, array.shape, array.dtype
+
+
+def open_memmap_region(filename, offset, shape, dtype, mode="r"):
+    r"""
+    Memory map a region of a file as an array, without reading it.
+
+    Parameters
+    ----------
+    filename : `str`
+        The path to the file.
+    offset : `int`
+        The offset, in bytes, of the start of the region.
+    shape : `tuple`
+        The shape of the array.
+    dtype : `numpy.dtype`
+        The type of the array elements.
+    mode : ``{r, c}``, optional
+        ``'r'`` maps the file read-only, ``'c'`` maps it copy-on-write, so
+        that the array can be modified without the changes reaching the file.
+
+    Returns
+    -------
+    array : :class:`numpy.memmap`
+        The memory mapped region.
+    """
+    return np.memmap(filename, dtype=dtype, mode=mode, offset=offset, shape=shape)
+
+
+_PIXEL_PRECISIONS = {
+    np.dtype(np.float64): np.dtype(np.float64),
+    np.dtype(np.float32): np.dtype(np.float32),
+    np.dtype(np.uint8): np.dtype(np.float32),
+}
+_pixel_precision = [np.dtype(np.float64)]
+
+
+def get_pixel_precision():
+    r"""
+    The library-wide pixel precision policy (see :map:`set_pixel_precision`).
+
+    Returns
+    -------
+    dtype : `numpy.dtype`
+        One of ``float64`` (the default), ``float32`` or ``uint8``.
+    """
+    return _pixel_precision[0]
+
+
+def set_pixel_precision(dtype):
+    r"""
+    Set the library-wide pixel precision policy, which controls the type that
+    pixels are stored and processed in:
+
+    - ``float64`` (the default): images are imported and normalised into
+      double precision and features are computed in double precision.
+    - ``float32``: images are imported and normalised into single precision.
+      New images and features are created in single precision, halving the
+      memory (and memory bandwidth) that they require.
+    - ``uint8``: images are imported without normalisation, keeping their
+      native integer type. Warps preserve the integer type, and operations that
+      require floating point arithmetic (e.g. features) compute in single
+      precision.
+
+    Floating point pixels are never converted to a lower precision - the
+    policy only decides the type that integer pixels are converted to and the
+    type of newly created pixels.
+
+    Parameters
+    ----------
+    dtype : `numpy.dtype` or `type` or `str`
+        One of ``float64``, ``float32`` or ``uint8``.
+
+    Raises
+    ------
+    ValueError
+        If ``dtype`` is not a supported precision.
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in _PIXEL_PRECISIONS:
+        raise ValueError(
+            'Unsupported pixel precision "{}", must be one of '
+            "(float64, float32, uint8)".format(dtype)
+        )
+    _pixel_precision[0] = dtype
+
+
+@contextmanager
+def pixel_precision(dtype):
+    r"""
+    Context manager that sets the pixel precision policy (see
+    :map:`set_pixel_precision`) for the duration of a ``with`` block,
+    restoring the previous policy afterwards. ::
+
+        with pixel_precision(np.float32):
+            images = mio.import_images(path)
+
+    Parameters
+    ----------
+    dtype : `numpy.dtype` or `type` or `str`
+        One of ``float64``, ``float32`` or ``uint8``.
+
+    Raises
+    ------
+    ValueError
+        If ``dtype`` is not a supported precision.
+    """
+    previous = get_pixel_precision()
+    set_pixel_precision(dtype)
+    try:
+        yield
+    finally:
+        set_pixel_precision(previous)
+
+
+def keep_integer_pixels():
+    r"""
+    Whether the pixel precision policy keeps integer pixels in their native
+    type (i.e. the policy is ``uint8``).
+
+    Returns
+    -------
+    keep : `bool`
+        ``True`` if imported pixels should not be normalised.
+    """
+    return get_pixel_precision() == np.uint8
+
+
+def pixel_float_dtype(dtype=None):
+    r"""
+    The floating point type to use for pixels of the given type under the
+    current pixel precision policy. Floating point types are preserved, other
+    types are given the floating point type of the policy.
+
+    Parameters
+    ----------
+    dtype : `numpy.dtype` or ``None``, optional
+        The type of the pixels. If ``None``, the floating point type of the
+        policy is returned, e.g. for newly created pixels.
+
+    Returns
+    -------
+    float_dtype : `numpy.dtype`
+        The floating point type.
+    """
+    if dtype is not None and np.issubdtype(dtype, np.floating):
+        return np.dtype(dtype)
+    return _PIXEL_PRECISIONS[get_pixel_precision()]
+
+
+_copy_on_write = [False]
+
+
+def get_copy_on_write():
+    r"""
+    Whether copy-on-write is enabled (see :map:`set_copy_on_write`).
+
+    Returns
+    -------
+    enabled : `bool`
+        ``True`` if copies share their pixels and points.
+    """
+    return _copy_on_write[0]
+
+
+def set_copy_on_write(enabled):
+    r"""
+    Enable or disable copy-on-write, which is disabled by default. When
+    enabled, :meth:`Copyable.copy` shares the pixels of images and the points
+    of pointclouds (and so of landmark groups) between an object and its copy
+    instead of copying them. The shared arrays are marked read-only on both
+    sides, so that neither can change the other. This avoids copying the pixels
+    in the many operations that copy an image only to replace its pixels (e.g.
+    cropping, warping, greyscale conversion), which adds up over chains of
+    operations where the intermediate images are discarded.
+
+    Menpo's own in-place operations obtain a private copy of a shared array
+    with :map:`ensure_writeable` before writing to it, on either side. Code
+    that modifies pixels or points in place must do the same, e.g. ::
+
+        image.pixels = ensure_writeable(image.pixels)
+        image.pixels[0, :10] = 0
+
+    as writing to a shared array (including the one of the original object)
+    raises a ``ValueError`` rather than silently changing the copies.
+
+    Parameters
+    ----------
+    enabled : `bool`
+        Whether copies should share their pixels and points.
+    """
+    _copy_on_write[0] = bool(enabled)
+
+
+@contextmanager
+def copy_on_write(enabled=True):
+    r"""
+    Context manager that enables (or disables) copy-on-write (see
+    :map:`set_copy_on_write`) for the duration of a ``with`` block,
+    restoring the previous setting afterwards. ::
+
+        with copy_on_write():
+            image = image.crop(min_indices, max_indices).as_greyscale()
+
+    Parameters
+    ----------
+    enabled : `bool`, optional
+        Whether copies should share their pixels and points.
+    """
+    previous = get_copy_on_write()
+    set_copy_on_write(enabled)
+    try:
+        yield
+    finally:
+        set_copy_on_write(previous)
+
+
+def ensure_writeable(array):
+    r"""
+    Return the given array if it can be written to, or a private copy of it
+    otherwise, e.g. if it is shared by copy-on-write (see
+    :map:`set_copy_on_write`).
+
+    Parameters
+    ----------
+    array : `ndarray`
+        The array that is about to be modified.
+
+    Returns
+    -------
+    writeable : `ndarray`
+        ``array`` or a writeable copy of it.
+    """
+    if array.flags.writeable:
+        return array
+    return array.copy()
+
+
+_max_transform_memory = [None]
+
+
+def get_max_transform_memory():
+    r"""
+    The memory budget of applying transforms (see
+    :map:`set_max_transform_memory`).
+
+    Returns
+    -------
+    n_bytes : `int` or ``None``
+        The maximum number of bytes of intermediate results, or ``None`` if
+        there is no budget.
+    """
+    return _max_transform_memory[0]
+
+
+def set_max_transform_memory(n_bytes):
+    r"""
+    Set the library-wide memory budget of applying transforms, which is not
+    set by default. Some transforms (e.g. :map:`ThinPlateSplines`) compute
+    intermediate results whose size grows with both the number of points and
+    the number of e.g. centres of the transform, which can become very large
+    when warping large images. When a budget is set, every
+    :meth:`Transform.apply` that is not given an explicit ``batch_size``
+    splits the points into batches whose intermediate results fit within the
+    budget. The result is the same as applying the transform to all of the
+    points at once.
+
+    Parameters
+    ----------
+    n_bytes : `int` or ``None``
+        The maximum number of bytes of intermediate results, or ``None`` to
+        remove the budget.
+
+    Raises
+    ------
+    ValueError
+        If ``n_bytes`` is not positive.
+    """
+    if n_bytes is not None and n_bytes <= 0:
+        raise ValueError("The memory budget must be positive, not {}".format(n_bytes))
+    _max_transform_memory[0] = n_bytes
+
+
+@contextmanager
+def max_transform_memory(n_bytes):
+    r"""
+    Context manager that sets the memory budget of applying transforms (see
+    :map:`set_max_transform_memory`) for the duration of a ``with`` block,
+    restoring the previous budget afterwards. ::
+
+        with max_transform_memory(256 * 2 ** 20):
+            warped = image.warp_to_shape(shape, tps)
+
+    Parameters
+    ----------
+    n_bytes : `int` or ``None``
+        The maximum number of bytes of intermediate results, or ``None`` to
+        remove the budget.
+
+    Raises
+    ------
+    ValueError
+        If ``n_bytes`` is not positive.
+    """
+    previous = get_max_transform_memory()
+    set_max_transform_memory(n_bytes)
+    try:
+        yield
+    finally:
+        set_max_transform_memory(previous)
@@ -5,9 +5,11 @@ import warnings
 
 import numpy as np
 
+from menpo.base import keep_integer_pixels, pixel_float_dtype
+
 scipy_gaussian_filter = None  # expensive
 
-from .base import ndfeature, imgfeature
+from .base import ndfeature, imgfeature, rebuild_feature_image
 
 
 @ndfeature
@@ -28,7 +30,9 @@ def gradient(pixels):
         is interpreted as channels. This means an N-dimensional image is
         represented by an N+1 dimensional array.
         If the image is 2-dimensional the pixels should be of type
-        float/double (int is not supported).
+        float/double (int is not supported), unless the pixel precision policy
+        is ``uint8``, in which case integer pixels are converted to the
+        floating point type of the policy.
 
     Returns
     -------
@@ -41,8 +45,10 @@ def gradient(pixels):
         all the ``y``-gradients are returned over each channel, then all
         the ``x``-gradients.
     """
-    if pixels.dtype == np.uint8:
-        raise TypeError("Attempting to take the gradient on a uint8 image.")
+    if not np.issubdtype(pixels.dtype, np.floating):
+        if pixels.dtype == np.uint8 and not keep_integer_pixels():
+            raise TypeError("Attempting to take the gradient on a uint8 image.")
+        pixels = pixels.astype(pixel_float_dtype(pixels.dtype))
     n_dims = pixels.ndim - 1
     grad_per_dim_per_channel = [np.gradient(g, edge_order=1) for g in pixels]
     # Flatten out the separate dims
@@ -151,7 +157,7 @@ def igo(pixels, double_angles=False, verbose=False):
     grad_orient = np.angle(grad[:n_img_chnls] + 1j * grad[n_img_chnls:])
     # compute igo image
     igo_pixels = np.empty(
-        (n_img_chnls * feat_chnls, pixels.shape[1], pixels.shape[2]), dtype=pixels.dtype
+        (n_img_chnls * feat_chnls, pixels.shape[1], pixels.shape[2]), dtype=grad.dtype
     )
 
     if double_angles:
@@ -233,7 +239,7 @@ def es(pixels, verbose=False):
     grad_abs = grad_abs + np.median(grad_abs)
     es_pixels = np.empty(
         (pixels.shape[0] * feat_channels, pixels.shape[1], pixels.shape[2]),
-        dtype=pixels.dtype,
+        dtype=grad.dtype,
     )
 
     es_pixels[:n_img_chnls] = grad[:n_img_chnls] / grad_abs
@@ -397,8 +403,66 @@ def daisy(
     return daisy_descriptor
 
 
+def _validate_out(out, shape):
+    r"""
+    Check that ``out`` can be written into by :map:`normalize` for pixels of
+    the given shape, returning it with the shape of the pixels.
+    """
+    if out.shape != shape and (shape[0] != 1 or out.shape != shape[1:]):
+        raise ValueError(
+            "The output must have shape {} (not {})".format(shape, out.shape)
+        )
+    if not np.issubdtype(out.dtype, np.floating):
+        raise ValueError(
+            "The output must have a floating point dtype " "(not {})".format(out.dtype)
+        )
+    if not out.flags.c_contiguous:
+        raise ValueError("The output must be C-contiguous")
+    return out if out.shape == shape else out.reshape(shape)
+
+
+def _normalize_vector(pixels, scale_func, mode, error_on_divide_by_zero, out=None):
+    r"""
+    Mean centre and scale a ``(n_channels, n_pixels)`` array of pixels,
+    writing the result into ``out`` (which may be ``pixels`` itself) if it is
+    given. See :map:`normalize` for the parameters.
+    """
+    # The pixels are only written to once the scale factor is known to be
+    # valid, so that they are left unchanged if an error is raised
+    centered = None if out is not None and np.may_share_memory(out, pixels) else out
+    if mode == "all":
+        centered_pixels = np.subtract(pixels, np.mean(pixels), out=centered)
+        scale_factor = scale_func(centered_pixels)
+    elif mode == "per_channel":
+        centered_pixels = np.subtract(
+            pixels, np.mean(pixels, axis=1, keepdims=True), out=centered
+        )
+        scale_factor = scale_func(centered_pixels, axis=1).reshape([-1, 1])
+    else:
+        raise ValueError(
+            "Supported modes are {{'all', 'per_channel'}} - '{}' "
+            "is not known".format(mode)
+        )
+    if out is None:
+        out = centered_pixels
+
+    non_zero_denom = np.asarray(scale_factor) != 0
+    if np.all(non_zero_denom):
+        return np.divide(centered_pixels, scale_factor, out=out)
+    elif error_on_divide_by_zero:
+        raise ValueError("Computed scale factor cannot be 0.0")
+    else:
+        warnings.warn(
+            "One or more the scale factors are 0.0 and thus these"
+            "entries will be skipped during normalization."
+        )
+        if out is not centered_pixels:
+            np.copyto(out, centered_pixels)
+        return np.divide(centered_pixels, scale_factor, out=out, where=non_zero_denom)
+
+
 @imgfeature
-def normalize(img, scale_func=None, mode="all", error_on_divide_by_zero=True):
+def normalize(img, scale_func=None, mode="all", error_on_divide_by_zero=True, out=None):
     r"""
     Normalize the pixel values via mean centering and an optional scaling. By
     default the scaling will be ``1.0``. The ``mode`` parameter selects
@@ -423,57 +487,75 @@ def normalize(img, scale_func=None, mode="all", error_on_divide_by_zero=True):
         If ``True``, will raise a ``ValueError`` on dividing by zero.
         If ``False``, will merely raise a warning and only those values
         with non-zero denominators will be normalized.
+    out : ``(C, X, Y, ..., Z)`` `ndarray`, optional
+        A C-contiguous floating point array, with the shape of the pixels,
+        that the normalized pixels are written into instead of allocating a
+        new array. It may be the pixel array itself, in which case the
+        pixels are normalized in place. On a :map:`MaskedImage` only the
+        masked pixels are normalized, the remaining pixels are copied
+        unchanged. If a ``ValueError`` is raised because of a zero scale
+        factor, the pixels are left unchanged.
 
     Returns
     -------
     pixels : :map:`Image` or subclass or ``(X, Y, ..., Z, C)`` `ndarray`
-        A normalized copy of the image that was passed in.
+        A normalized copy of the image that was passed in. If ``out`` is
+        given, the pixels of the returned image are ``out`` (and if ``out`` is
+        the pixel array of the image, the image itself is returned).
 
     Raises
     ------
     ValueError
         If any of the denominators are 0 and ``error_on_divide_by_zero`` is
-        ``True``.
+        ``True``, or ``out`` is not a suitable array.
     """
     if scale_func is None:
 
         def scale_func(_, axis=None):
             return np.array([1.0])
 
-    pixels = img.as_vector(keep_channels=True)
-
-    if mode == "all":
-        centered_pixels = pixels - np.mean(pixels)
-        scale_factor = scale_func(centered_pixels)
-    elif mode == "per_channel":
-        centered_pixels = pixels - np.mean(pixels, axis=1, keepdims=True)
-        scale_factor = scale_func(centered_pixels, axis=1).reshape([-1, 1])
-    else:
-        raise ValueError(
-            "Supported modes are {{'all', 'per_channel'}} - '{}' "
-            "is not known".format(mode)
+    if out is None:
+        centered_pixels = _normalize_vector(
+            img.as_vector(keep_channels=True),
+            scale_func,
+            mode,
+            error_on_divide_by_zero,
         )
+        return img.from_vector(centered_pixels)
 
-    zero_denom = (scale_factor == 0).ravel()
-    any_non_zero = np.any(zero_denom)
-    if error_on_divide_by_zero and any_non_zero:
-        raise ValueError("Computed scale factor cannot be 0.0")
-    elif any_non_zero:
-        warnings.warn(
-            "One or more the scale factors are 0.0 and thus these"
-            "entries will be skipped during normalization."
+    pixels = img.pixels
+    out_pixels = _validate_out(out, pixels.shape)
+    inplace = np.may_share_memory(out_pixels, pixels)
+    n_channels = pixels.shape[0]
+    if hasattr(img, "mask") and not img.mask.all_true():
+        # Only the masked pixels are normalized, so the normalized pixels have
+        # to be scattered back into the output
+        centered_pixels = _normalize_vector(
+            img.as_vector(keep_channels=True),
+            scale_func,
+            mode,
+            error_on_divide_by_zero,
         )
-        non_zero_denom = ~zero_denom
-        centered_pixels[non_zero_denom] = (
-            centered_pixels[non_zero_denom] / scale_factor[non_zero_denom]
-        )
-        return img.from_vector(centered_pixels)
+        if not inplace:
+            np.copyto(out_pixels, pixels)
+        out_pixels.reshape([n_channels, -1])[
+            :, img.mask.true_flat_indices()
+        ] = centered_pixels
     else:
-        return img.from_vector(centered_pixels / scale_factor)
+        _normalize_vector(
+            pixels.reshape([n_channels, -1]),
+            scale_func,
+            mode,
+            error_on_divide_by_zero,
+            out=out_pixels.reshape([n_channels, -1]),
+        )
+    if out_pixels is pixels:
+        return img
+    return rebuild_feature_image(img, out_pixels)
 
 
 @ndfeature
-def normalize_norm(pixels, mode="all", error_on_divide_by_zero=True):
+def normalize_norm(pixels, mode="all", error_on_divide_by_zero=True, out=None):
     r"""
     Normalize the pixels to be mean centred and have unit norm. The ``mode``
     parameter selects whether the normalisation is computed across all pixels in
@@ -493,6 +575,11 @@ def normalize_norm(pixels, mode="all", error_on_divide_by_zero=True):
         If ``True``, will raise a ``ValueError`` on dividing by zero.
         If ``False``, will merely raise a warning and only those values
         with non-zero denominators will be normalized.
+    out : ``(C, X, Y, ..., Z)`` `ndarray`, optional
+        A C-contiguous floating point array, with the shape of the pixels,
+        that the normalized pixels are written into instead of allocating a
+        new array. It may be the pixel array itself, in which case the
+        pixels are normalized in place.
 
     Returns
     -------
@@ -503,7 +590,7 @@ def normalize_norm(pixels, mode="all", error_on_divide_by_zero=True):
     ------
     ValueError
         If any of the denominators are 0 and ``error_on_divide_by_zero`` is
-        ``True``.
+        ``True``, or ``out`` is not a suitable array.
     """
 
     def unit_norm(x, axis=None):
@@ -514,11 +601,12 @@ def normalize_norm(pixels, mode="all", error_on_divide_by_zero=True):
         scale_func=unit_norm,
         mode=mode,
         error_on_divide_by_zero=error_on_divide_by_zero,
+        out=out,
     )
 
 
 @ndfeature
-def normalize_std(pixels, mode="all", error_on_divide_by_zero=True):
+def normalize_std(pixels, mode="all", error_on_divide_by_zero=True, out=None):
     r"""
     Normalize the pixels to be mean centred and have unit standard deviation.
     The ``mode`` parameter selects whether the normalisation is computed across
@@ -538,6 +626,11 @@ def normalize_std(pixels, mode="all", error_on_divide_by_zero=True):
         If ``True``, will raise a ``ValueError`` on dividing by zero.
         If ``False``, will merely raise a warning and only those values
         with non-zero denominators will be normalized.
+    out : ``(C, X, Y, ..., Z)`` `ndarray`, optional
+        A C-contiguous floating point array, with the shape of the pixels,
+        that the normalized pixels are written into instead of allocating a
+        new array. It may be the pixel array itself, in which case the
+        pixels are normalized in place.
 
     Returns
     -------
@@ -548,7 +641,7 @@ def normalize_std(pixels, mode="all", error_on_divide_by_zero=True):
     ------
     ValueError
         If any of the denominators are 0 and ``error_on_divide_by_zero`` is
-        ``True``.
+        ``True``, or ``out`` is not a suitable array.
     """
 
     def unit_std(x, axis=None):
@@ -559,11 +652,12 @@ def normalize_std(pixels, mode="all", error_on_divide_by_zero=True):
         scale_func=unit_std,
         mode=mode,
         error_on_divide_by_zero=error_on_divide_by_zero,
+        out=out,
     )
 
 
 @ndfeature
-def normalize_var(pixels, mode="all", error_on_divide_by_zero=True):
+def normalize_var(pixels, mode="all", error_on_divide_by_zero=True, out=None):
     r"""
     Normalize the pixels to be mean centred and normalize according
     to the variance.
@@ -584,6 +678,11 @@ def normalize_var(pixels, mode="all", error_on_divide_by_zero=True):
         If ``True``, will raise a ``ValueError`` on dividing by zero.
         If ``False``, will merely raise a warning and only those values
         with non-zero denominators will be normalized.
+    out : ``(C, X, Y, ..., Z)`` `ndarray`, optional
+        A C-contiguous floating point array, with the shape of the pixels,
+        that the normalized pixels are written into instead of allocating a
+        new array. It may be the pixel array itself, in which case the
+        pixels are normalized in place.
 
     Returns
     -------
@@ -594,7 +693,7 @@ def normalize_var(pixels, mode="all", error_on_divide_by_zero=True):
     ------
     ValueError
         If any of the denominators are 0 and ``error_on_divide_by_zero`` is
-        ``True``.
+        ``True``, or ``out`` is not a suitable array.
     """
 
     def unit_var(x, axis=None):
@@ -605,6 +704,7 @@ def normalize_var(pixels, mode="all", error_on_divide_by_zero=True):
         scale_func=unit_var,
         mode=mode,
         error_on_divide_by_zero=error_on_divide_by_zero,
+        out=out,
     )
 
 
@@ -3,7 +3,7 @@ from __future__ import division
 import warnings
 
 import numpy as np
-from numpy.testing import assert_allclose
+from numpy.testing import assert_allclose, assert_array_equal
 from pytest import raises, skip
 
 from menpo.feature import (
@@ -274,3 +274,69 @@ def test_normalize_0_variance_warning():
         )
     assert_allclose(new_image.pixels[0], [[-0.75, -0.25], [0.25, 0.75]])
     assert_allclose(new_image.pixels[1], [[-1.5, -0.5], [0.5, 1.5]])
+
+
+def test_normalize_out():
+    pixels = np.arange(27, dtype=float).reshape([3, 3, 3])
+    image = Image(pixels)
+    out = np.empty_like(pixels)
+    new_image = normalize(image, mode="per_channel", out=out)
+    assert is_same_array(new_image.pixels, out)
+    assert_allclose(new_image.pixels, normalize(image, mode="per_channel").pixels)
+    assert_allclose(image.pixels, pixels)
+
+
+def test_normalize_out_inplace():
+    pixels = np.arange(27, dtype=float).reshape([3, 3, 3])
+    image = Image(pixels, copy=False)
+    new_image = normalize_std(image, out=pixels)
+    assert is_same_array(new_image.pixels, pixels)
+    assert_allclose(np.std(pixels), 1.0)
+
+
+def test_normalize_out_ndarray():
+    pixels = np.arange(27, dtype=float).reshape([3, 3, 3])
+    expected = normalize_norm(pixels)
+    assert normalize_norm(pixels, out=pixels) is pixels
+    assert_allclose(pixels, expected)
+
+
+def test_normalize_out_masked_only_masked_pixels():
+    pixels = np.arange(27, dtype=float).reshape([3, 3, 3])
+    mask = np.ones((3, 3), dtype=bool)
+    mask[0] = False
+    image = MaskedImage(pixels, mask=mask)
+    out = np.empty_like(pixels)
+    new_image = normalize(image, out=out)
+    assert is_same_array(new_image.pixels, out)
+    assert_allclose(out[:, 0], pixels[:, 0])
+    assert_allclose(new_image.as_vector(), normalize(image).as_vector())
+
+
+def test_normalize_out_inplace_zero_scale_leaves_pixels():
+    image = Image(np.ones((1, 4, 4)) * 3.0)
+    with raises(ValueError):
+        normalize_std(image, out=image.pixels)
+    assert_array_equal(image.pixels, 3.0)
+
+
+def test_normalize_out_inplace_zero_scale_per_channel_leaves_pixels():
+    pixels = np.random.RandomState(0).randn(3, 8, 8) * 1000.0 + 7.3
+    pixels[1] = 0.3
+    expected = pixels.copy()
+    for normalize_func in [normalize_norm, normalize_std, normalize_var]:
+        with raises(ValueError):
+            normalize_func(pixels, mode="per_channel", out=pixels)
+        assert_array_equal(pixels, expected)
+
+
+def test_normalize_out_integer_raises():
+    image = Image.init_blank((2, 2))
+    with raises(ValueError):
+        normalize(image, out=np.empty((1, 2, 2), dtype=np.int64))
+
+
+def test_normalize_out_wrong_shape_raises():
+    image = Image.init_blank((2, 2))
+    with raises(ValueError):
+        normalize(image, out=np.empty((1, 2, 3)))
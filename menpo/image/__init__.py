@@ -1,3 +1,13 @@
 from .base import Image, ImageBoundaryError
 from .boolean import BooleanImage
 from .masked import MaskedImage, OutOfMaskSampleError
+from .warp import WarpPlan, warp_images
+from .pyramid import ImagePyramid
+from .tiling import iter_tiles, apply_tiled, warp_to_shape_tiled
+from .patches import extract_patches_from_images
+from .interpolation import (
+    register_interpolation_backend,
+    get_default_interpolation_backend,
+    set_default_interpolation_backend,
+    SplineCoefficients,
+)
@@ -10,7 +10,15 @@ import numpy as np
 import PIL.Image as PILImage
 
 from menpo.compatibility import basestring
-from menpo.base import Vectorizable, MenpoDeprecationWarning, copy_landmarks_and_path
+from menpo.base import (
+    Vectorizable,
+    MenpoDeprecationWarning,
+    copy_landmarks_and_path,
+    ensure_writeable,
+    memmap_region,
+    open_memmap_region,
+    pixel_float_dtype,
+)
 from menpo.shape import PointCloud, bounding_box
 from menpo.landmark import Landmarkable
 from menpo.transform import (
@@ -24,13 +32,16 @@ from menpo.transform import (
 )
 from menpo.visualize.base import ImageViewer, LandmarkableViewable, Viewable
 
-from .interpolation import scipy_interpolation
+from .interpolation import interpolate, SplineCoefficients
 
 try:
     from .interpolation import cv2_perspective_interpolation
 except ImportError:
     warn("Falling back to scipy interpolation for affine warps")
     cv2_perspective_interpolation = None
+from .warp import WarpPlan
+from .pyramid import ImagePyramid
+from .scaling import antialias_pixels, axis_aligned_scale, scale_interpolation
 from .patches import (
     extract_patches_with_slice,
     set_patches,
@@ -90,7 +101,9 @@ def normalize_pixels_range(pixels, error_on_unknown_type=True):
     r"""
     Normalize the given pixels to the Menpo valid floating point range, [0, 1].
     This is a single place to handle normalising pixels ranges. At the moment
-    the supported types are uint8 and uint16.
+    the supported types are uint8 and uint16. The normalized pixels are of the
+    floating point type of the pixel precision policy (see
+    :map:`set_pixel_precision`).
 
     Parameters
     ----------
@@ -125,9 +138,9 @@ def normalize_pixels_range(pixels, error_on_unknown_type=True):
         else:
             # Do nothing
             return pixels
-    # This multiplication is quite a bit faster than just dividing - will
-    # automatically cast it up to float64
-    return pixels * (1.0 / max_range)
+    # This multiplication is quite a bit faster than just dividing
+    dtype = pixel_float_dtype()
+    return np.multiply(pixels, dtype.type(1.0 / max_range), dtype=dtype)
 
 
 def denormalize_pixels_range(pixels, out_dtype):
@@ -268,6 +281,8 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         If the pixel array is malformed
     """
 
+    _copy_on_write_attributes = ("pixels",)
+
     def __init__(self, image_data, copy=True):
         super(Image, self).__init__()
         if not copy:
@@ -296,7 +311,7 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         self.pixels = image_data
 
     @classmethod
-    def init_blank(cls, shape, n_channels=1, fill=0, dtype=np.float):
+    def init_blank(cls, shape, n_channels=1, fill=0, dtype=None):
         r"""
         Returns a blank image.
 
@@ -309,8 +324,9 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             The number of channels to create the image with.
         fill : `int`, optional
             The value to fill all pixels with.
-        dtype : numpy data type, optional
-            The data type of the image.
+        dtype : numpy data type or ``None``, optional
+            The data type of the image. If ``None``, the floating point type
+            of the pixel precision policy.
 
         Returns
         -------
@@ -319,6 +335,8 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         """
         # Ensure that the '+' operator means concatenate tuples
         shape = tuple(np.ceil(shape).astype(np.int))
+        if dtype is None:
+            dtype = pixel_float_dtype()
         if fill == 0:
             pixels = np.zeros((n_channels,) + shape, dtype=dtype)
         else:
@@ -380,6 +398,44 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             )
         return cls(channels_to_front(pixels))
 
+    @classmethod
+    def init_from_memmap(cls, path, shape, dtype=np.uint8, offset=0):
+        r"""
+        Create an Image whose pixels are memory mapped from a raw binary file,
+        so that they are only read from disk when they are accessed. This
+        allows huge on-disk pixel arrays to be treated as images without
+        loading them.
+
+        The pixels of the returned image are read-only. Copying the image maps
+        the same region of the file again in copy-on-write mode (so the copy
+        can be modified without the changes reaching the file or the original
+        image) and cropping (or any warp that is an integer translation
+        within the image) maps just the cropped region, where it is
+        contiguous on disk, in copy-on-write mode too. Pickling the image
+        only stores the path to the file, which must therefore be accessible
+        when it is unpickled. As copies and crops may have been modified,
+        pickling them stores their pixels.
+
+        Parameters
+        ----------
+        path : `str` or `pathlib.Path`
+            The path to the binary file containing the pixels in C order, with
+            the first axis being channels.
+        shape : `tuple`
+            The shape of the pixels. If 2D, the image has a single channel.
+        dtype : numpy data type, optional
+            The data type of the pixels.
+        offset : `int`, optional
+            The offset, in bytes, of the pixels within the file.
+
+        Returns
+        -------
+        image : ``type(cls)``
+            A new image backed by the file.
+        """
+        pixels = open_memmap_region(str(path), offset, tuple(shape), dtype)
+        return cls(pixels, copy=False)
+
     @classmethod
     def init_from_pointcloud(
         cls,
@@ -388,7 +444,7 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         boundary=0,
         n_channels=1,
         fill=0,
-        dtype=np.float,
+        dtype=None,
         return_transform=False,
     ):
         r"""
@@ -416,8 +472,9 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             The number of channels to create the image with.
         fill : `int`, optional
             The value to fill all pixels with.
-        dtype : numpy data type, optional
-            The data type of the image.
+        dtype : numpy data type or ``None``, optional
+            The data type of the image. If ``None``, the floating point type
+            of the pixel precision policy.
         return_transform : `bool`, optional
             If ``True``, then the :map:`Transform` object that was used to
             adjust the PointCloud in order to build the image, is returned.
@@ -581,6 +638,21 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         """
         return np.array(self.shape, dtype=np.double) / 2
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        region = memmap_region(self.pixels)
+        if region is not None:
+            # Only store a reference to the memory mapped file
+            del state["pixels"]
+            state["_pixels_memmap_region"] = region
+        return state
+
+    def __setstate__(self, state):
+        region = state.pop("_pixels_memmap_region", None)
+        if region is not None:
+            state["pixels"] = open_memmap_region(*region)
+        self.__dict__.update(state)
+
     def _str_shape(self):
         if self.n_dims > 2:
             return " x ".join(str(dim) for dim in self.shape)
@@ -1554,6 +1626,7 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         order=0,
         mode="constant",
         cval=0.0,
+        as_views=False,
     ):
         r"""
         Extract a set of patches from an image. Given a set of patch centers
@@ -1601,6 +1674,13 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         cval : `float`, optional
             Used in conjunction with mode ``constant``, the value outside the
             image boundaries.
+        as_views : `bool`, optional
+            If ``True``, a `list` of ``n_center * n_offset`` read-only
+            ``(n_channels, patch_shape)`` `ndarray` is returned (in the same
+            order as the list of images returned if ``as_single_array=False``)
+            instead. The patches that lie inside the image are views of the
+            pixels of this image, so no pixels are copied. Only supported with
+            ``order = 0`` and ``mode = 'constant'``.
 
         Returns
         -------
@@ -1612,7 +1692,8 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         Raises
         ------
         ValueError
-            If image is not 2D
+            If image is not 2D, or ``as_views=True`` with an ``order`` other
+            than ``0`` or a ``mode`` other than ``constant``
         """
         if self.n_dims != 2:
             raise ValueError(
@@ -1627,6 +1708,14 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
                 patch_shape,
                 offsets=sample_offsets,
                 cval=cval,
+                as_views=as_views,
+            )
+            if as_views:
+                return single_array
+        elif as_views:
+            raise ValueError(
+                "Patches can only be returned as views with order=0 and "
+                "mode='constant'"
             )
         else:
             single_array = extract_patches_by_sampling(
@@ -1637,6 +1726,7 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
                 order=order,
                 mode=mode,
                 cval=cval,
+                spline_coefficients=self._cached_spline_coefficients(order, mode),
             )
 
         if as_single_array:
@@ -1650,6 +1740,7 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         patch_shape=(16, 16),
         sample_offsets=None,
         as_single_array=True,
+        as_views=False,
     ):
         r"""
         Extract patches around landmarks existing on this image. Provided the
@@ -1675,6 +1766,10 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             `ndarray`, thus a single numpy array is returned containing each
             patch. If ``False``, a `list` of ``n_center * n_offset``
             :map:`Image` objects is returned representing each patch.
+        as_views : `bool`, optional
+            If ``True``, a `list` of read-only `ndarray` patches is returned,
+            where the patches that lie inside the image are views of the
+            pixels of this image (see `extract_patches`).
 
         Returns
         -------
@@ -1693,9 +1788,12 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             patch_shape=patch_shape,
             sample_offsets=sample_offsets,
             as_single_array=as_single_array,
+            as_views=as_views,
         )
 
-    def set_patches(self, patches, patch_centers, offset=None, offset_index=None):
+    def set_patches(
+        self, patches, patch_centers, offset=None, offset_index=None, mode="replace"
+    ):
         r"""
         Set the values of a group of patches into the correct regions of a copy
         of this image. Given an array of patches and a set of patch centers,
@@ -1729,6 +1827,13 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             The offset index within the provided `patches` argument, thus the
             index of the second dimension from which to sample. If ``None``,
             then ``0`` is used.
+        mode : ``{replace, add, average}``, optional
+            How the patches are combined with the pixels. ``replace``
+            overwrites the pixels (where patches overlap, the last patch is
+            kept), ``add`` adds the patches to the pixels and ``average``
+            replaces every pixel that is covered by at least one patch with
+            the mean of the patches that cover it, so that overlapping patches
+            are blended.
 
         Raises
         ------
@@ -1736,6 +1841,8 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             If image is not 2D
         ValueError
             If offset does not have shape (1, 2)
+        ValueError
+            If the mode is unknown
         """
         # parse arguments
         if self.n_dims != 2:
@@ -1762,12 +1869,15 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             )
 
         copy = self.copy()
+        copy.pixels = ensure_writeable(copy.pixels)
         # set patches
-        set_patches(patches, copy.pixels, patch_centers.points, offset, offset_index)
+        set_patches(
+            patches, copy.pixels, patch_centers.points, offset, offset_index, mode=mode,
+        )
         return copy
 
     def set_patches_around_landmarks(
-        self, patches, group=None, offset=None, offset_index=None
+        self, patches, group=None, offset=None, offset_index=None, mode="replace"
     ):
         r"""
         Set the values of a group of patches around the landmarks existing in a
@@ -1802,6 +1912,8 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             The offset index within the provided `patches` argument, thus the
             index of the second dimension from which to sample. If ``None``,
             then ``0`` is used.
+        mode : ``{replace, add, average}``, optional
+            How the patches are combined with the pixels (see `set_patches`).
 
         Raises
         ------
@@ -1809,15 +1921,21 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             If image is not 2D
         ValueError
             If offset does not have shape (1, 2)
+        ValueError
+            If the mode is unknown
         """
         return self.set_patches(
-            patches, self.landmarks[group], offset=offset, offset_index=offset_index
+            patches,
+            self.landmarks[group],
+            offset=offset,
+            offset_index=offset_index,
+            mode=mode,
         )
 
     def warp_to_mask(
         self,
         template_mask,
-        transform,
+        transform=None,
         warp_landmarks=True,
         order=1,
         mode="constant",
@@ -1834,12 +1952,15 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
 
         Parameters
         ----------
-        template_mask : :map:`BooleanImage`
+        template_mask : :map:`BooleanImage` or :map:`WarpPlan`
             Defines the shape of the result, and what pixels should be sampled.
-        transform : :map:`Transform`
+            If a :map:`WarpPlan` is provided, the sampling locations it has
+            cached are reused and ``transform`` may be ``None``.
+        transform : :map:`Transform` or ``None``, optional
             Transform **from the template space back to this image**.
             Defines, for each pixel location on the template, which pixel
-            location should be sampled from on this image.
+            location should be sampled from on this image. Only optional if
+            ``template_mask`` is a :map:`WarpPlan`.
         warp_landmarks : `bool`, optional
             If ``True``, result will have the same landmark dictionary
             as ``self``, but with each landmark updated to the warped position.
@@ -1882,14 +2003,26 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             The transform that was used. It only applies if
             `return_transform` is ``True``.
         """
+        template_mask, transform, plan = _resolve_warp_plan(
+            template_mask, transform, as_mask=True
+        )
         if self.n_dims != transform.n_dims:
             raise ValueError(
                 "Trying to warp a {}D image with a {}D transform "
                 "(they must match)".format(self.n_dims, transform.n_dims)
             )
-        template_points = template_mask.true_indices()
-        points_to_sample = transform.apply(template_points, batch_size=batch_size)
-        sampled = self.sample(points_to_sample, order=order, mode=mode, cval=cval)
+        if plan is not None:
+            sampled = plan.sample(
+                self.pixels,
+                order=order,
+                mode=mode,
+                cval=cval,
+                spline_coefficients=self._cached_spline_coefficients(order, mode),
+            )
+        else:
+            template_points = template_mask.true_indices()
+            points_to_sample = transform.apply(template_points, batch_size=batch_size)
+            sampled = self.sample(points_to_sample, order=order, mode=mode, cval=cval)
 
         # set any nan values to 0
         sampled[np.isnan(sampled)] = 0
@@ -1928,7 +2061,9 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         warped_image._from_vector_inplace(sampled_pixel_values.ravel())
         return warped_image
 
-    def sample(self, points_to_sample, order=1, mode="constant", cval=0.0):
+    def sample(
+        self, points_to_sample, order=1, mode="constant", cval=0.0, backend=None
+    ):
         r"""
         Sample this image at the given sub-pixel accurate points. The input
         PointCloud should have the same number of dimensions as the image e.g.
@@ -1950,6 +2085,10 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         cval : `float`, optional
             Used in conjunction with mode ``constant``, the value outside
             the image boundaries.
+        backend : `str` or ``None``, optional
+            The interpolation backend to use, e.g. ``'numpy'`` or ``'scipy'``.
+            If ``None``, the default backend is used (see
+            :func:`menpo.image.set_default_interpolation_backend`).
 
         Returns
         -------
@@ -1961,14 +2100,55 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         # 'special case' and not document the ndarray ability.
         if isinstance(points_to_sample, PointCloud):
             points_to_sample = points_to_sample.points
-        return scipy_interpolation(
-            self.pixels, points_to_sample, order=order, mode=mode, cval=cval
+        return interpolate(
+            self.pixels,
+            points_to_sample,
+            order=order,
+            mode=mode,
+            cval=cval,
+            backend=backend,
+            spline_coefficients=self._cached_spline_coefficients(order, mode),
         )
 
+    def cache_spline_coefficients(self, cache=True):
+        r"""
+        Enable (or disable) caching of the B-spline coefficients of this
+        image. Interpolation with an ``order`` greater than 1 has to prefilter
+        the whole image before it can be sampled, which usually dominates the
+        cost of sampling. When caching is enabled, the prefiltered
+        coefficients are computed once per interpolation order and mode and
+        reused by :meth:`sample`, :meth:`warp_to_shape`, :meth:`warp_to_mask`
+        and :meth:`extract_patches`. The cache is invalidated automatically
+        if the pixels of the image change.
+
+        Parameters
+        ----------
+        cache : `bool`, optional
+            If ``True``, caching is enabled. If ``False``, caching is disabled
+            and any cached coefficients are discarded.
+        """
+        self._spline_coefficients = {} if cache else None
+
+    def _cached_spline_coefficients(self, order, mode):
+        r"""
+        Return the cached :map:`SplineCoefficients` of this image for the
+        given ``order`` and ``mode``, computing them if needed. ``None`` is
+        returned if caching is disabled or the order does not require
+        prefiltering.
+        """
+        cache = getattr(self, "_spline_coefficients", None)
+        if cache is None or order < 2:
+            return None
+        coefficients = cache.get((order, mode))
+        if coefficients is None or not coefficients.is_valid_for(self.pixels):
+            coefficients = SplineCoefficients(self.pixels, order=order, mode=mode)
+            cache[(order, mode)] = coefficients
+        return coefficients
+
     def warp_to_shape(
         self,
         template_shape,
-        transform,
+        transform=None,
         warp_landmarks=True,
         order=1,
         mode="constant",
@@ -1981,13 +2161,16 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
 
         Parameters
         ----------
-        template_shape : `tuple` or `ndarray`
+        template_shape : `tuple` or `ndarray` or :map:`WarpPlan`
             Defines the shape of the result, and what pixel indices should be
-            sampled (all of them).
-        transform : :map:`Transform`
+            sampled (all of them). If a :map:`WarpPlan` is provided, the
+            sampling locations it has cached are reused and ``transform`` may
+            be ``None``.
+        transform : :map:`Transform` or ``None``, optional
             Transform **from the template_shape space back to this image**.
             Defines, for each index on template_shape, which pixel location
-            should be sampled from on this image.
+            should be sampled from on this image. Only optional if
+            ``template_shape`` is a :map:`WarpPlan`.
         warp_landmarks : `bool`, optional
             If ``True``, result will have the same landmark dictionary
             as self, but with each landmark updated to the warped position.
@@ -2030,8 +2213,35 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             The transform that was used. It only applies if
             `return_transform` is ``True``.
         """
+        template_shape, transform, plan = _resolve_warp_plan(
+            template_shape, transform, as_mask=False
+        )
         template_shape = np.array(template_shape, dtype=np.int)
-        if (
+        crop_slices = None
+        if plan is None and order in range(2):
+            crop_slices = _crop_slices(transform, template_shape, self.shape)
+        if plan is not None:
+            sampled = plan.sample(
+                self.pixels,
+                order=order,
+                mode=mode,
+                cval=cval,
+                spline_coefficients=self._cached_spline_coefficients(order, mode),
+            )
+            sampled[np.isnan(sampled)] = 0
+            warped_pixels = sampled.reshape((self.n_channels,) + tuple(template_shape))
+        elif crop_slices is not None:
+            # an integer translation within the image is just a crop, so
+            # slice rather than sample (memory mapped pixels are mapped
+            # again copy-on-write rather than read, so that the warped
+            # pixels can be modified like any other copy)
+            warped_pixels = self.pixels[(slice(None),) + crop_slices]
+            region = memmap_region(warped_pixels)
+            if region is not None:
+                warped_pixels = open_memmap_region(*region, mode="c")
+            else:
+                warped_pixels = warped_pixels.copy()
+        elif (
             isinstance(transform, Homogeneous)
             and order in range(2)
             and self.n_dims == 2
@@ -2047,6 +2257,18 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
                 mode=mode,
                 cval=cval,
             )
+        elif order in range(2) and axis_aligned_scale(transform) is not None:
+            # the warp is separable, so resample one axis at a time
+            scale, offset = axis_aligned_scale(transform)
+            warped_pixels = scale_interpolation(
+                self.pixels,
+                tuple(template_shape),
+                scale,
+                offset,
+                mode=mode,
+                order=order,
+                cval=cval,
+            )
         else:
             template_points = indices_for_image_of_shape(template_shape)
             points_to_sample = transform.apply(template_points, batch_size=batch_size)
@@ -2084,7 +2306,13 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             return warped_image
 
     def rescale(
-        self, scale, round="ceil", order=1, warp_landmarks=True, return_transform=False
+        self,
+        scale,
+        round="ceil",
+        order=1,
+        warp_landmarks=True,
+        return_transform=False,
+        antialias=False,
     ):
         r"""
         Return a copy of this image, rescaled by a given factor.
@@ -2118,6 +2346,10 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         return_transform : `bool`, optional
             If ``True``, then the :map:`Transform` object that was used to
             perform the rescale is also returned.
+        antialias : `bool`, optional
+            If ``True``, the image is smoothed with a Gaussian before it is
+            downscaled, in order to avoid aliasing. Axes that are not
+            downscaled are not smoothed.
 
         Returns
         -------
@@ -2166,8 +2398,9 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         # (note that max_index = length - 1, as 0 based)
         scale_factors = (scale * shape - 1) / (shape - 1)
         inverse_transform = NonUniformScale(scale_factors).pseudoinverse()
+        image = self._antialiased(scale) if antialias else self
         # for rescaling we enforce that mode is nearest to avoid num. errors
-        return self.warp_to_shape(
+        return image.warp_to_shape(
             template_shape,
             inverse_transform,
             warp_landmarks=warp_landmarks,
@@ -2176,8 +2409,25 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             return_transform=return_transform,
         )
 
+    def _antialiased(self, scale):
+        r"""
+        Return a copy of this image smoothed so that it can be downscaled by
+        ``scale`` without aliasing. Boolean images and images that are not
+        downscaled are returned unmodified.
+        """
+        if self.pixels.dtype == bool or np.all(np.asarray(scale) >= 1):
+            return self
+        antialiased = self.copy()
+        antialiased.pixels = antialias_pixels(self.pixels, scale)
+        return antialiased
+
     def rescale_to_diagonal(
-        self, diagonal, round="ceil", warp_landmarks=True, return_transform=False
+        self,
+        diagonal,
+        round="ceil",
+        warp_landmarks=True,
+        return_transform=False,
+        antialias=False,
     ):
         r"""
         Return a copy of this image, rescaled so that the it's diagonal is a
@@ -2195,6 +2445,9 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         return_transform : `bool`, optional
             If ``True``, then the :map:`Transform` object that was used to
             perform the rescale is also returned.
+        antialias : `bool`, optional
+            If ``True``, the image is smoothed with a Gaussian before it is
+            downscaled, in order to avoid aliasing.
 
         Returns
         -------
@@ -2209,6 +2462,7 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             round=round,
             warp_landmarks=warp_landmarks,
             return_transform=return_transform,
+            antialias=antialias,
         )
 
     def rescale_to_pointcloud(
@@ -2337,7 +2591,14 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             return_transform=return_transform,
         )
 
-    def resize(self, shape, order=1, warp_landmarks=True, return_transform=False):
+    def resize(
+        self,
+        shape,
+        order=1,
+        warp_landmarks=True,
+        return_transform=False,
+        antialias=False,
+    ):
         r"""
         Return a copy of this image, resized to a particular shape.
         All image information (landmarks, and mask in the case of
@@ -2367,6 +2628,9 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         return_transform : `bool`, optional
             If ``True``, then the :map:`Transform` object that was used to
             perform the resize is also returned.
+        antialias : `bool`, optional
+            If ``True``, the image is smoothed with a Gaussian before it is
+            downscaled, in order to avoid aliasing.
 
         Returns
         -------
@@ -2401,6 +2665,7 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             order=order,
             warp_landmarks=warp_landmarks,
             return_transform=return_transform,
+            antialias=antialias,
         )
 
     def zoom(self, scale, order=1, warp_landmarks=True, return_transform=False):
@@ -2799,7 +3064,7 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             return_transform=return_transform,
         )
 
-    def pyramid(self, n_levels=3, downscale=2):
+    def pyramid(self, n_levels=3, downscale=2, antialias=False):
         r"""
         Return a rescaled pyramid of this image. The first image of the
         pyramid will be a copy of the original, unmodified, image, and counts
@@ -2812,6 +3077,9 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             unmodified image
         downscale : `float`, optional
             Downscale factor.
+        antialias : `bool`, optional
+            If ``True``, each level is smoothed with a Gaussian before it is
+            downscaled, in order to avoid aliasing.
 
         Yields
         ------
@@ -2821,7 +3089,7 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         image = self.copy()
         yield image
         for _ in range(n_levels - 1):
-            image = image.rescale(1.0 / downscale)
+            image = image.rescale(1.0 / downscale, antialias=antialias)
             yield image
 
     def gaussian_pyramid(self, n_levels=3, downscale=2, sigma=None):
@@ -2857,7 +3125,56 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             image = gaussian_filter(image, sigma).rescale(1.0 / downscale)
             yield image
 
-    def as_greyscale(self, mode="luminosity", channel=None):
+    def as_pyramid(
+        self,
+        n_levels=3,
+        downscale=2,
+        gaussian=False,
+        sigma=None,
+        antialias=False,
+        max_bytes=None,
+    ):
+        r"""
+        Return a lazily computed pyramid of this image. Unlike
+        :meth:`pyramid` and :meth:`gaussian_pyramid`, the returned
+        :map:`ImagePyramid` can be indexed and caches the levels it has
+        computed, so it can be reused (e.g. across fitting iterations).
+
+        Parameters
+        ----------
+        n_levels : `int`, optional
+            Total number of levels in the pyramid, including the original
+            unmodified image
+        downscale : `float`, optional
+            Downscale factor.
+        gaussian : `bool`, optional
+            If ``True``, the levels are the same as :meth:`gaussian_pyramid`,
+            otherwise they are the same as :meth:`pyramid`.
+        sigma : `float`, optional
+            Sigma for gaussian filter. Default is ``downscale / 3.``. Only used
+            if ``gaussian`` is ``True``.
+        antialias : `bool`, optional
+            If ``True``, each level is antialiased when it is downscaled.
+        max_bytes : `int` or ``None``, optional
+            The maximum number of bytes of pixel data that the pyramid caches.
+            If ``None``, all levels are cached.
+
+        Returns
+        -------
+        pyramid : :map:`ImagePyramid`
+            The lazy pyramid, with this image (not a copy) as level ``0``.
+        """
+        return ImagePyramid(
+            self,
+            n_levels=n_levels,
+            downscale=downscale,
+            gaussian=gaussian,
+            sigma=sigma,
+            antialias=antialias,
+            max_bytes=max_bytes,
+        )
+
+    def as_greyscale(self, mode="luminosity", channel=None, inplace=False):
         r"""
         Returns a greyscale version of the image. If the image does *not*
         represent a 2D RGB image, then the ``luminosity`` mode will fail.
@@ -2876,13 +3193,17 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
 
         channel: `int`, optional
             The channel to be taken. Only used if mode is ``channel``.
+        inplace : `bool`, optional
+            If ``True``, this image is converted to greyscale (and returned)
+            rather than a copy of it. In the ``channel`` mode the greyscale
+            pixels are then a view of the existing pixels.
 
         Returns
         -------
         greyscale_image : :map:`MaskedImage`
             A copy of this image in greyscale.
         """
-        greyscale = self.copy()
+        greyscale = self if inplace else self.copy()
         if mode == "luminosity":
             if self.n_dims != 2:
                 raise ValueError(
@@ -3108,6 +3429,7 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
 
         for l_group in self.landmarks:
             l = self.landmarks[l_group]
+            l.points = ensure_writeable(l.points)
             for k in range(l.points.shape[1]):
                 tmp = l.points[:, k]
                 tmp[tmp < 0] = 0
@@ -3115,7 +3437,7 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
                 l.points[:, k] = tmp
             self.landmarks[l_group] = l
 
-    def normalize_std(self, mode="all", **kwargs):
+    def normalize_std(self, mode="all", inplace=False, **kwargs):
         r"""
         Returns a copy of this image normalized such that its
         pixel values have zero mean and unit variance.
@@ -3126,6 +3448,9 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             If ``all``, the normalization is over all channels. If
             ``per_channel``, each channel individually is mean centred and
             normalized in variance.
+        inplace : `bool`, optional
+            If ``True``, this image is normalized (and returned) rather than a
+            copy of it. Floating point pixels are normalized in place.
 
         Returns
         -------
@@ -3138,9 +3463,9 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             "Use .normalize_std() instead (features package).",
             MenpoDeprecationWarning,
         )
-        return self._normalize(np.std, mode=mode)
+        return self._normalize(np.std, mode=mode, inplace=inplace)
 
-    def normalize_norm(self, mode="all", **kwargs):
+    def normalize_norm(self, mode="all", inplace=False, **kwargs):
         r"""
         Returns a copy of this image normalized such that its pixel values
         have zero mean and its norm equals 1.
@@ -3151,6 +3476,9 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             If ``all``, the normalization is over all channels. If
             ``per_channel``, each channel individually is mean centred and
             unit norm.
+        inplace : `bool`, optional
+            If ``True``, this image is normalized (and returned) rather than a
+            copy of it. Floating point pixels are normalized in place.
 
         Returns
         -------
@@ -3167,14 +3495,35 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         def scale_func(pixels, axis=None):
             return np.linalg.norm(pixels, axis=axis, **kwargs)
 
-        return self._normalize(scale_func, mode=mode)
+        return self._normalize(scale_func, mode=mode, inplace=inplace)
 
-    def _normalize(self, scale_func, mode="all"):
+    def _normalize(self, scale_func, mode="all", inplace=False):
         from menpo.feature import normalize
 
-        return normalize(self, scale_func=scale_func, mode=mode)
+        out = self._inplace_float_pixels() if inplace else None
+        return normalize(self, scale_func=scale_func, mode=mode, out=out)
+
+    def _inplace_float_pixels(self):
+        r"""
+        Prepare the pixels of this image to be updated in place by a floating
+        point operation. Floating point pixels are kept (copying them only if
+        they are not writeable), other pixels are converted to the floating
+        point type of the pixel precision policy.
+
+        Returns
+        -------
+        pixels : ``(C, X, Y, ..., Z)`` `ndarray`
+            The writeable, floating point pixels of this image.
+        """
+        pixels = self.pixels
+        if np.issubdtype(pixels.dtype, np.floating):
+            pixels = ensure_writeable(pixels)
+        else:
+            pixels = pixels.astype(pixel_float_dtype(pixels.dtype))
+        self.pixels = pixels
+        return pixels
 
-    def rescale_pixels(self, minimum, maximum, per_channel=True):
+    def rescale_pixels(self, minimum, maximum, per_channel=True, inplace=False):
         r"""A copy of this image with pixels linearly rescaled to fit a range.
 
         Note that the only pixels that will be considered and rescaled are those
@@ -3191,6 +3540,9 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         per_channel: `boolean`, optional
             If ``True``, each channel will be rescaled independently. If
             ``False``, the scaling will be over all channels.
+        inplace: `boolean`, optional
+            If ``True``, this image is rescaled (and returned) rather than a
+            copy of it. Floating point pixels are rescaled in place.
 
         Returns
         -------
@@ -3198,16 +3550,26 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
             A copy of this image with pixels linearly rescaled to fit in the
             range provided.
         """
-        v = self.as_vector(keep_channels=True).T
+        if inplace:
+            pixels = self._inplace_float_pixels()
+        v = self._as_vector(keep_channels=True)
         if per_channel:
-            min_, max_ = v.min(axis=0), v.max(axis=0)
+            min_ = v.min(axis=1, keepdims=True)
+            max_ = v.max(axis=1, keepdims=True)
         else:
             min_, max_ = v.min(), v.max()
         sf = ((maximum - minimum) * 1.0) / (max_ - min_)
-        v_new = ((v - min_) * sf) + minimum
-        return self.from_vector(v_new.T.ravel())
-
-    def clip_pixels(self, minimum=None, maximum=None):
+        if not inplace:
+            return self.from_vector((((v - min_) * sf) + minimum).ravel())
+        v -= min_
+        v *= sf
+        v += minimum
+        if not np.may_share_memory(v, pixels):
+            # v is a copy of the masked pixels of a masked image
+            self._from_vector_inplace(v.ravel(), copy=False)
+        return self
+
+    def clip_pixels(self, minimum=None, maximum=None, inplace=False):
         r"""A copy of this image with pixels linearly clipped to fit a range.
 
         Parameters
@@ -3218,6 +3580,10 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         maximum: `float`, optional
             The maximal value of the clipped pixels. If None is provided, the
             default value will depend on the dtype.
+        inplace: `boolean`, optional
+            If ``True``, this image is clipped (and returned) rather than a
+            copy of it. The pixels are clipped in place unless the range
+            requires a different dtype.
 
         Returns
         -------
@@ -3239,9 +3605,14 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
                 m1 = "Could not recognise the dtype ({}) to set the maximum."
                 raise ValueError(m1.format(dtype))
 
-        copy = self.copy()
-        copy.pixels = copy.pixels.clip(min=minimum, max=maximum)
-        return copy
+        clipped = self if inplace else self.copy()
+        pixels = clipped.pixels
+        if np.result_type(pixels, minimum, maximum) == pixels.dtype:
+            pixels = ensure_writeable(pixels)
+            clipped.pixels = pixels.clip(min=minimum, max=maximum, out=pixels)
+        else:
+            clipped.pixels = pixels.clip(min=minimum, max=maximum)
+        return clipped
 
     def rasterize_landmarks(
         self,
@@ -3336,6 +3707,60 @@ class Image(Vectorizable, Landmarkable, Viewable, LandmarkableViewable):
         )
 
 
+def _crop_slices(transform, template_shape, image_shape):
+    r"""
+    If warping to ``template_shape`` with ``transform`` is equivalent to
+    cropping an image of ``image_shape`` (i.e. the transform is an integer
+    translation and the template lies entirely within the image), return the
+    slices that perform the crop. Otherwise, return ``None``.
+    """
+    scale_offset = axis_aligned_scale(transform)
+    if scale_offset is None:
+        return None
+    scale, offset = scale_offset
+    if np.any(scale != 1) or np.any(offset != np.round(offset)):
+        return None
+    start = offset.astype(int)
+    stop = start + np.asarray(template_shape, dtype=int)
+    if np.any(start < 0) or np.any(stop > np.asarray(image_shape)):
+        return None
+    return tuple(slice(a, b) for a, b in zip(start, stop))
+
+
+def _resolve_warp_plan(template, transform, as_mask=False):
+    r"""
+    Unpack the template argument of the warp methods, which may be a
+    :map:`WarpPlan`. Returns the template (a shape, or a mask if ``as_mask``),
+    the transform to use and the plan (``None`` if a plan was not provided).
+    """
+    if not isinstance(template, WarpPlan):
+        if transform is None:
+            raise ValueError("A transform must be provided unless warping with a plan")
+        return template, transform, None
+    plan = template
+    if transform is not None and transform is not plan.transform:
+        raise ValueError(
+            "The provided transform does not match the transform the "
+            "warp plan was built with"
+        )
+    # The transform may have been updated in place since the plan was built
+    plan.update()
+    if as_mask:
+        template = plan.template_mask
+        if template is None:
+            from .boolean import BooleanImage
+
+            template = BooleanImage.init_blank(plan.template_shape)
+    else:
+        if plan.template_mask is not None and not plan.template_mask.all_true():
+            raise ValueError(
+                "Cannot warp to a shape with a plan built from a mask that "
+                "is not all True - use warp_to_mask instead"
+            )
+        template = plan.template_shape
+    return template, plan.transform, plan
+
+
 def round_image_shape(shape, round):
     if round not in ["ceil", "round", "floor"]:
         raise ValueError("round must be either ceil, round or floor")
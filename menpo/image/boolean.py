@@ -1,11 +1,14 @@
-from functools import partial
 from warnings import warn
 
 import numpy as np
 
+from menpo.base import copy_landmarks_and_path, ensure_writeable
 from menpo.transform import Translation
 from .base import Image
 
+binary_erosion = None  # expensive, from scipy.ndimage
+binary_dilation = None  # expensive, from scipy.ndimage
+
 
 def pwa_point_in_pointcloud(pcloud, indices, batch_size=None):
     """
@@ -80,6 +83,186 @@ def convex_hull_point_in_pointcloud(pcloud, indices):
     return Path(polygon).contains_points(indices)
 
 
+def _bounding_box_in_shape(points, shape):
+    r"""
+    The first and last pixel index along each axis of the (rounded out)
+    bounding box of the given points, clipped to the given shape.
+    """
+    lower = np.maximum(np.floor(points.min(axis=-2)), 0).astype(np.intp)
+    upper = np.minimum(np.ceil(points.max(axis=-2)), np.array(shape) - 1)
+    return lower, upper.astype(np.intp)
+
+
+def rasterize_triangles(shape, points, trilist):
+    r"""
+    Rasterize a triangulation into a 2D mask. Each triangle is only tested
+    against the pixels inside its own bounding box, rather than against every
+    pixel of the image. The containment test is identical to that of
+    :func:`pwa_point_in_pointcloud` (and therefore :map:`PiecewiseAffine`) and
+    so points on the boundary are counted as inside the triangles.
+
+    Parameters
+    ----------
+    shape : ``(2,)`` `tuple`
+        The shape of the mask.
+    points : ``(n_points, 2)`` `ndarray`
+        The vertices of the triangulation, in pixel coordinates.
+    trilist : ``(n_tris, 3)`` `ndarray`
+        The 0-based index triangulation joining the points.
+
+    Returns
+    -------
+    mask : ``shape`` `bool ndarray`
+        Whether each pixel is inside any of the triangles.
+    """
+    from menpo.transform.piecewiseaffine.base import barycentric_vectors
+
+    mask = np.zeros(shape, dtype=bool)
+    # Use exactly the same arithmetic as alpha_beta, so that the pixels on
+    # the boundary are decided in the same way
+    i, ij, ik = barycentric_vectors(points, trilist)
+    dot_jj = np.einsum("dt, dt -> t", ij, ij)
+    dot_kk = np.einsum("dt, dt -> t", ik, ik)
+    dot_jk = np.einsum("dt, dt -> t", ij, ik)
+    with np.errstate(divide="ignore"):
+        d = 1.0 / (dot_jj * dot_kk - dot_jk * dot_jk)
+    lower, upper = _bounding_box_in_shape(points[trilist], shape)
+    for t in np.flatnonzero(np.all(upper >= lower, axis=1)):
+        (r0, c0), (r1, c1) = lower[t], upper[t]
+        ip_r = np.arange(r0, r1 + 1, dtype=np.float64)[:, None] - i[0, t]
+        ip_c = np.arange(c0, c1 + 1, dtype=np.float64) - i[1, t]
+        dot_pj = ip_r * ij[0, t] + ip_c * ij[1, t]
+        dot_pk = ip_r * ik[0, t] + ip_c * ik[1, t]
+        alpha = (dot_kk[t] * dot_pj - dot_jk[t] * dot_pk) * d[t]
+        beta = (dot_jj[t] * dot_pk - dot_jk[t] * dot_pj) * d[t]
+        mask[r0 : r1 + 1, c0 : c1 + 1] |= np.logical_and(
+            np.logical_and(alpha >= 0, beta >= 0), alpha + beta <= 1
+        )
+    return mask
+
+
+def rasterize_polygon(shape, vertices):
+    r"""
+    Rasterize a (closed) polygon into a 2D mask with a scanline algorithm.
+    For each column of the polygon's bounding box, every edge toggles the
+    containment of a run of rows, which is found directly rather than by
+    testing each pixel. The containment test is identical to that of
+    matplotlib's ``Path.contains_points`` (the "Crossings Multiply" test) and
+    so it matches :func:`convex_hull_point_in_pointcloud` for the convex hull
+    of a pointcloud.
+
+    Parameters
+    ----------
+    shape : ``(2,)`` `tuple`
+        The shape of the mask.
+    vertices : ``(n_vertices, 2)`` `ndarray`
+        The vertices of the polygon, in pixel coordinates. The last vertex is
+        joined to the first.
+
+    Returns
+    -------
+    mask : ``shape`` `bool ndarray`
+        Whether each pixel is inside the polygon.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    mask = np.zeros(shape, dtype=bool)
+    (r0, c0), (r1, c1) = _bounding_box_in_shape(vertices, shape)
+    if r1 < r0 or c1 < c0:
+        return mask
+    cols = np.arange(c0, c1 + 1, dtype=np.float64)
+    # A True at (row, col) toggles the containment of that row and all the
+    # rows below it in the column
+    toggles = np.zeros((r1 - r0 + 2, cols.size), dtype=bool)
+    for (x0, y0), (x1, y1) in zip(vertices, np.roll(vertices, -1, axis=0)):
+        y_flag0 = y0 >= cols
+        y_flag1 = y1 >= cols
+        crossing = np.flatnonzero(y_flag0 != y_flag1)
+        if crossing.size == 0:
+            continue
+        y_flag1 = y_flag1[crossing]
+        a = (y1 - cols[crossing]) * (x0 - x1)
+        b = y0 - y1
+
+        def toggled(x):
+            return (a >= (x1 - x) * b) == y_flag1
+
+        # toggled is monotonic along a column, so it changes at most once
+        # inside the bounding box
+        first = toggled(np.float64(r0))
+        changes = toggled(np.float64(r1)) != first
+        flip = np.clip(np.ceil(x1 - a / b), r0 + 1, r1).astype(np.intp)
+        # Correct any rounding error in the first row that changes
+        while True:
+            early = changes & (toggled(flip.astype(np.float64)) == first)
+            late = changes & (toggled(flip - 1.0) != first) & ~early
+            if not (early.any() or late.any()):
+                break
+            flip += early
+            flip -= late
+        flip[~changes] = r1 + 1
+        toggles[0, crossing[first]] ^= True
+        # The same row may be toggled by several edges
+        np.logical_xor.at(toggles, (flip - r0, crossing), True)
+    mask[r0 : r1 + 1, c0 : c1 + 1] = np.logical_xor.accumulate(toggles[:-1], axis=0)
+    return mask
+
+
+def _valid_bits(width):
+    r"""
+    For every byte of a row of ``width`` packed pixels, the bits that hold
+    pixels (rather than padding).
+    """
+    valid = np.full((width + 7) // 8, 0xFF, dtype=np.uint8)
+    if width % 8:
+        valid[-1] = (0xFF << (8 - width % 8)) & 0xFF
+    return valid
+
+
+def _shift_packed(packed, axis, step, width):
+    r"""
+    Shift the pixels of a packed mask by ``step`` (``1`` or ``-1``) along the
+    given axis, filling in ``False``. The last axis holds the packed bits of
+    each row (most significant bit first).
+    """
+    shifted = np.zeros_like(packed)
+    if axis == packed.ndim - 1:
+        previous = np.zeros_like(packed)
+        if step == 1:
+            # Every pixel takes the value of the pixel to its left
+            previous[..., 1:] = packed[..., :-1] << 7
+            np.right_shift(packed, 1, out=shifted)
+        else:
+            previous[..., :-1] = packed[..., 1:] >> 7
+            np.left_shift(packed, 1, out=shifted)
+        shifted |= previous
+        shifted &= _valid_bits(width)
+    else:
+        index = [slice(None)] * packed.ndim
+        source = list(index)
+        if step == 1:
+            index[axis], source[axis] = slice(1, None), slice(None, -1)
+        else:
+            index[axis], source[axis] = slice(None, -1), slice(1, None)
+        shifted[tuple(index)] = packed[tuple(source)]
+    return shifted
+
+
+def _morphology_packed(packed, width, n_pixels, dilate):
+    r"""
+    Binary erosion or dilation of a packed mask with the cross shaped
+    structuring element (and the border treated as ``False``), matching
+    ``scipy.ndimage.binary_erosion`` / ``binary_dilation``.
+    """
+    combine = np.bitwise_or if dilate else np.bitwise_and
+    for _ in range(n_pixels):
+        result = packed.copy()
+        for axis in range(packed.ndim):
+            for step in (1, -1):
+                combine(result, _shift_packed(packed, axis, step, width), out=result)
+        packed = result
+    return packed
+
+
 class BooleanImage(Image):
     r"""
     A mask image made from binary pixels. The region of the image that is
@@ -114,6 +297,149 @@ class BooleanImage(Image):
                 )
         super(BooleanImage, self).__init__(mask_data, copy=copy)
 
+    @property
+    def pixels(self):
+        r"""
+        The pixels of the mask, with a single channel on the first axis. If
+        the mask is packed (see :meth:`as_packed`), accessing the pixels
+        unpacks them and the mask stops being packed.
+
+        :type: ``(1, M, N, ...)`` `bool ndarray`
+        """
+        if self.is_packed:
+            self.pixels = self._unpacked()[None]
+        pixels = self.__dict__["pixels"]
+        if pixels.flags.writeable:
+            # The pixels may now be modified in place through the returned
+            # array at any time, so the cached True indices have to be
+            # checked against them from now on
+            self.__dict__["_pixels_handed_out"] = True
+        return pixels
+
+    @pixels.setter
+    def pixels(self, value):
+        self.__dict__["pixels"] = value
+        self.__dict__["_packed_pixels"] = None
+        self.__dict__["_pixels_handed_out"] = False
+        self.__dict__.pop("_cached_true", None)
+
+    @property
+    def is_packed(self):
+        r"""
+        ``True`` if the mask is stored bit-packed (see :meth:`as_packed`).
+
+        :type: `bool`
+        """
+        return self.__dict__.get("_packed_pixels") is not None
+
+    def as_packed(self):
+        r"""
+        Return a copy of this mask in which the pixels are bit-packed along
+        the last axis, using 8 times less memory. :meth:`n_true`,
+        :meth:`bounds_true`, :meth:`invert`, :meth:`erode`, :meth:`dilate`,
+        :meth:`true_indices` and the vectorisation of :map:`MaskedImage`
+        operate on the packed pixels directly. Accessing :attr:`pixels` (or
+        :attr:`mask`) unpacks the mask, after which it is no longer packed.
+
+        Returns
+        -------
+        packed : :map:`BooleanImage`
+            A packed copy of this mask, with the same landmarks.
+        """
+        if self.is_packed:
+            return self.copy()
+        return self._init_packed(
+            np.packbits(self.__dict__["pixels"][0], axis=-1), self.shape
+        )
+
+    def _init_packed(self, packed_pixels, shape):
+        mask = BooleanImage.__new__(BooleanImage)
+        mask.__dict__.update(
+            pixels=None, _packed_pixels=packed_pixels, _packed_shape=tuple(shape)
+        )
+        mask._landmarks = None
+        return copy_landmarks_and_path(self, mask)
+
+    def _unpacked(self):
+        r"""
+        The mask (without a channel axis), unpacked if necessary. Unlike
+        :attr:`mask`, this does not change how the mask is stored.
+        """
+        if self.is_packed:
+            return np.unpackbits(
+                self.__dict__["_packed_pixels"], axis=-1, count=self.shape[-1]
+            ).view(bool)
+        return self.__dict__["pixels"][0]
+
+    def __getstate__(self):
+        if self.is_packed:
+            return self.__dict__.copy()
+        return super(BooleanImage, self).__getstate__()
+
+    @property
+    def n_channels(self):
+        r"""
+        The number of channels on each pixel in the image, always ``1``.
+
+        :type: `int`
+        """
+        return 1
+
+    @property
+    def shape(self):
+        r"""
+        The shape of the image
+        (with ``n_channel`` values at each point).
+
+        :type: `tuple`
+        """
+        if self.is_packed:
+            return self.__dict__["_packed_shape"]
+        return self.__dict__["pixels"].shape[1:]
+
+    @property
+    def width(self):
+        r"""
+        The width of the image.
+
+        This is the width according to image semantics, and is thus the size
+        of the **last** dimension.
+
+        :type: `int`
+        """
+        return self.shape[-1]
+
+    @property
+    def height(self):
+        r"""
+        The height of the image.
+
+        This is the height according to image semantics, and is thus the size
+        of the **second to last** dimension.
+
+        :type: `int`
+        """
+        return self.shape[-2]
+
+    @property
+    def n_pixels(self):
+        r"""
+        Total number of pixels in the image ``(prod(shape),)``
+
+        :type: `int`
+        """
+        return int(np.prod(self.shape))
+
+    @property
+    def n_elements(self):
+        r"""
+        Total number of data points in the image
+        ``(prod(shape), n_channels)``
+
+        :type: `int`
+        """
+        return self.n_pixels
+
     @classmethod
     def init_blank(cls, shape, fill=True, round="ceil", **kwargs):
         r"""
@@ -238,7 +564,56 @@ class BooleanImage(Image):
 
         :type: `int`
         """
-        return np.sum(self.pixels)
+        if self.is_packed:
+            # The padding bits are always unset
+            return np.count_nonzero(np.unpackbits(self.__dict__["_packed_pixels"]))
+        return np.count_nonzero(self.__dict__["pixels"])
+
+    def _true_cache(self):
+        r"""
+        The cached flat indices (and quantities derived from them) of the
+        ``True`` values of the mask. The cache is discarded whenever the
+        pixels are replaced. Once the pixels have been handed out writeable
+        by :attr:`pixels` (and so :attr:`mask`), they may be modified in
+        place at any time, so the flat indices are found again and the
+        cache is only reused (with everything derived from it) if they
+        still match.
+        """
+        cache = self.__dict__.get("_cached_true")
+        # Packed masks are checked against their packed pixels
+        pixels = (
+            self.__dict__["_packed_pixels"]
+            if self.is_packed
+            else self.__dict__["pixels"]
+        )
+        flat_indices = None
+        # A copy of the mask has the cache but (unless the pixels are shared
+        # by copy-on-write) not the pixels of the original
+        if cache is not None and cache["pixels"] is not pixels:
+            cache = None
+        if cache is not None and self.__dict__.get("_pixels_handed_out"):
+            flat_indices = np.flatnonzero(self._unpacked())
+            if not np.array_equal(flat_indices, cache["flat_indices"]):
+                cache = None
+        if cache is None:
+            if flat_indices is None:
+                flat_indices = np.flatnonzero(self._unpacked())
+            flat_indices.flags.writeable = False
+            cache = {"pixels": pixels, "flat_indices": flat_indices}
+            self._cached_true = cache
+        return cache
+
+    def true_flat_indices(self):
+        r"""
+        The indices of pixels that are ``True`` into the flattened mask. These
+        are cached, so repeatedly asking for them on the same mask is cheap
+        (as long as the pixels have not been handed out writeable, after which
+        the cache is checked against the pixels). The returned array is
+        read-only.
+
+        :type: ``(n_true,)`` `ndarray`
+        """
+        return self._true_cache()["flat_indices"]
 
     def n_false(self):
         r"""
@@ -254,7 +629,9 @@ class BooleanImage(Image):
 
         :type: `bool`
         """
-        return np.all(self.pixels)
+        if self.is_packed:
+            return self.n_true() == self.n_pixels
+        return np.all(self.__dict__["pixels"])
 
     def proportion_true(self):
         r"""
@@ -278,11 +655,14 @@ class BooleanImage(Image):
 
         :type: ``(n_dims, n_true)`` `ndarray`
         """
-        if self.all_true():
-            return self.indices()
-        else:
-            # Ignore the channel axis
-            return np.vstack(np.nonzero(self.pixels[0])).T
+        cache = self._true_cache()
+        if "true_indices" not in cache:
+            true_indices = np.column_stack(
+                np.unravel_index(cache["flat_indices"], self.shape)
+            )
+            true_indices.flags.writeable = False
+            cache["true_indices"] = true_indices
+        return cache["true_indices"].copy()
 
     def false_indices(self):
         r"""
@@ -291,7 +671,7 @@ class BooleanImage(Image):
         :type: ``(n_dims, n_false)`` `ndarray`
         """
         # Ignore the channel axis
-        return np.vstack(np.nonzero(~self.pixels[0])).T
+        return np.vstack(np.nonzero(~self._unpacked())).T
 
     def __str__(self):
         return "{} {}D mask, {:.1%} " "of which is True".format(
@@ -342,10 +722,80 @@ class BooleanImage(Image):
             A copy of this boolean mask, where all ``True`` values are ``False``
             and all ``False`` values are ``True``.
         """
+        if self.is_packed:
+            inverse = ~self.__dict__["_packed_pixels"]
+            inverse &= _valid_bits(self.shape[-1])
+            return self._init_packed(inverse, self.shape)
         inverse = self.copy()
         inverse.pixels = ~self.pixels
         return inverse
 
+    def erode(self, n_pixels=1):
+        r"""
+        Returns a copy of this mask in which the ``True`` region has been
+        shrunk by n pixels along its boundary. Packed masks are eroded
+        without being unpacked, and the result is packed.
+
+        Parameters
+        ----------
+        n_pixels : `int`, optional
+            The number of pixels by which we want to shrink the ``True``
+            region along its own boundary.
+
+        Returns
+        -------
+        eroded : :map:`BooleanImage`
+            The eroded copy of this mask.
+        """
+        if self.is_packed:
+            return self._init_packed(
+                _morphology_packed(
+                    self.__dict__["_packed_pixels"],
+                    self.shape[-1],
+                    n_pixels,
+                    dilate=False,
+                ),
+                self.shape,
+            )
+        global binary_erosion
+        if binary_erosion is None:
+            from scipy.ndimage import binary_erosion  # expensive
+        eroded = BooleanImage(binary_erosion(self.mask, iterations=n_pixels))
+        return copy_landmarks_and_path(self, eroded)
+
+    def dilate(self, n_pixels=1):
+        r"""
+        Returns a copy of this mask in which the ``True`` region has been
+        expanded by n pixels along its boundary. Packed masks are dilated
+        without being unpacked, and the result is packed.
+
+        Parameters
+        ----------
+        n_pixels : `int`, optional
+            The number of pixels by which we want to expand the ``True``
+            region along its own boundary.
+
+        Returns
+        -------
+        dilated : :map:`BooleanImage`
+            The dilated copy of this mask.
+        """
+        if self.is_packed:
+            return self._init_packed(
+                _morphology_packed(
+                    self.__dict__["_packed_pixels"],
+                    self.shape[-1],
+                    n_pixels,
+                    dilate=True,
+                ),
+                self.shape,
+            )
+        global binary_dilation
+        if binary_dilation is None:
+            from scipy.ndimage import binary_dilation  # expensive
+        dilated = BooleanImage(binary_dilation(self.mask, iterations=n_pixels))
+        return copy_landmarks_and_path(self, dilated)
+
     def bounds_true(self, boundary=0, constrain_to_bounds=True):
         r"""
         Returns the minimum to maximum indices along all dimensions that the
@@ -373,14 +823,38 @@ class BooleanImage(Image):
             along each dimension. If ``constrain_to_bounds=True``,
             is clipped to legal image bounds.
         """
-        mpi = self.true_indices()
-        maxes = np.max(mpi, axis=0) + boundary
-        mins = np.min(mpi, axis=0) - boundary
+        if self.is_packed:
+            mins, maxes = self._packed_bounds_true()
+        else:
+            cache = self._true_cache()
+            if "bounds" not in cache:
+                mpi = self.true_indices()
+                cache["bounds"] = np.min(mpi, axis=0), np.max(mpi, axis=0)
+            mins, maxes = cache["bounds"]
+        mins = mins - boundary
+        maxes = maxes + boundary
         if constrain_to_bounds:
             maxes = self.constrain_points_to_bounds(maxes)
             mins = self.constrain_points_to_bounds(mins)
         return mins, maxes
 
+    def _packed_bounds_true(self):
+        packed = self.__dict__["_packed_pixels"]
+        if not packed.any():
+            # Match the error of the unpacked mask
+            raise ValueError("The mask has no True pixels")
+        mins, maxes = [], []
+        for axis in range(packed.ndim - 1):
+            other = tuple(k for k in range(packed.ndim) if k != axis)
+            occupied = np.flatnonzero(packed.any(axis=other))
+            mins.append(occupied[0])
+            maxes.append(occupied[-1])
+        columns = np.bitwise_or.reduce(packed.reshape((-1, packed.shape[-1])), axis=0)
+        occupied = np.flatnonzero(np.unpackbits(columns, count=self.shape[-1]))
+        mins.append(occupied[0])
+        maxes.append(occupied[-1])
+        return np.array(mins), np.array(maxes)
+
     def bounds_false(self, boundary=0, constrain_to_bounds=True):
         r"""
         Returns the minimum to maximum indices along all dimensions that the
@@ -413,7 +887,9 @@ class BooleanImage(Image):
         )
 
     # noinspection PyMethodOverriding
-    def sample(self, points_to_sample, mode="constant", cval=False, **kwargs):
+    def sample(
+        self, points_to_sample, mode="constant", cval=False, backend=None, **kwargs
+    ):
         r"""
         Sample this image at the given sub-pixel accurate points. The input
         PointCloud should have the same number of dimensions as the image e.g.
@@ -432,6 +908,9 @@ class BooleanImage(Image):
         cval : `float`, optional
             Used in conjunction with mode ``constant``, the value outside
             the image boundaries.
+        backend : `str` or ``None``, optional
+            The interpolation backend to use, e.g. ``'numpy'`` or ``'scipy'``.
+            If ``None``, the default backend is used.
 
         Returns
         -------
@@ -439,13 +918,15 @@ class BooleanImage(Image):
             The interpolated values taken across every channel of the image.
         """
         # enforce the order as 0, as this is boolean data, then call super
-        return Image.sample(self, points_to_sample, order=0, mode=mode, cval=cval)
+        return Image.sample(
+            self, points_to_sample, order=0, mode=mode, cval=cval, backend=backend
+        )
 
     # noinspection PyMethodOverriding
     def warp_to_mask(
         self,
         template_mask,
-        transform,
+        transform=None,
         warp_landmarks=True,
         mode="constant",
         cval=False,
@@ -461,13 +942,15 @@ class BooleanImage(Image):
 
         Parameters
         ----------
-        template_mask : :map:`BooleanImage`
+        template_mask : :map:`BooleanImage` or :map:`WarpPlan`
             Defines the shape of the result, and what pixels should be
-            sampled.
-        transform : :map:`Transform`
+            sampled. If a :map:`WarpPlan` is provided, the sampling locations
+            it has cached are reused and ``transform`` may be ``None``.
+        transform : :map:`Transform` or ``None``, optional
             Transform **from the template space back to this image**.
             Defines, for each pixel location on the template, which pixel
-            location should be sampled from on this image.
+            location should be sampled from on this image. Only optional if
+            ``template_mask`` is a :map:`WarpPlan`.
         warp_landmarks : `bool`, optional
             If ``True``, result will have the same landmark dictionary
             as self, but with each landmark updated to the warped position.
@@ -513,7 +996,7 @@ class BooleanImage(Image):
     def warp_to_shape(
         self,
         template_shape,
-        transform,
+        transform=None,
         warp_landmarks=True,
         mode="constant",
         cval=False,
@@ -531,13 +1014,16 @@ class BooleanImage(Image):
 
         Parameters
         ----------
-        template_shape : ``(n_dims, )`` `tuple` or `ndarray`
+        template_shape : ``(n_dims, )`` `tuple` or `ndarray` or :map:`WarpPlan`
             Defines the shape of the result, and what pixel indices should be
-            sampled (all of them).
-        transform : :map:`Transform`
+            sampled (all of them). If a :map:`WarpPlan` is provided, the
+            sampling locations it has cached are reused and ``transform`` may
+            be ``None``.
+        transform : :map:`Transform` or ``None``, optional
             Transform **from the template_shape space back to this image**.
             Defines, for each index on template_shape, which pixel location
-            should be sampled from on this image.
+            should be sampled from on this image. Only optional if
+            ``template_shape`` is a :map:`WarpPlan`.
         warp_landmarks : `bool`, optional
             If ``True``, result will have the same landmark dictionary
             as self, but with each landmark updated to the warped position.
@@ -568,7 +1054,7 @@ class BooleanImage(Image):
         """
         # call the super variant and get ourselves an Image back
         # note that we force the use of order=0 for BooleanImages.
-        warped = Image.warp_to_shape(
+        warped, transform = Image.warp_to_shape(
             self,
             template_shape,
             transform,
@@ -577,10 +1063,11 @@ class BooleanImage(Image):
             mode=mode,
             cval=cval,
             batch_size=batch_size,
+            return_transform=True,
         )
         # unfortunately we can't escape copying here, let BooleanImage
         # convert us to np.bool
-        boolean_image = BooleanImage(warped.pixels.reshape(template_shape))
+        boolean_image = BooleanImage(warped.pixels.reshape(warped.shape))
         if warped.has_landmarks:
             boolean_image.landmarks = warped.landmarks
         if hasattr(warped, "path"):
@@ -602,6 +1089,7 @@ class BooleanImage(Image):
             warped_img.pixels = sampled_pixel_values.reshape((1,) + warped_img.shape)
         else:
             # we have to fill out mask with the sampled mask..
+            warped_img.pixels = ensure_writeable(warped_img.pixels)
             warped_img.pixels[:, warped_img.mask] = sampled_pixel_values
         return warped_img
 
@@ -622,11 +1110,8 @@ class BooleanImage(Image):
             The key of the landmark set that should be used. If ``None``,
             and if there is only one set of landmarks, this set will be used.
         batch_size : `int` or ``None``, optional
-            This should only be considered for large images. Setting this value
-            will cause constraining to become much slower. This size indicates
-            how many points in the image should be checked at a time, which
-            keeps memory usage low. If ``None``, no batching is used and all
-            points are checked at once.
+            Has no effect, kept for backwards compatibility. See
+            :meth:`constrain_to_pointcloud`.
 
         Returns
         -------
@@ -652,11 +1137,13 @@ class BooleanImage(Image):
         the triangulation of the Trimesh will be used to define the retained
         region.
 
-        For large images, a faster and pixel-accurate method can be used (
-        'convex_hull'). Here, there is no specialization for
-        :map:`TriMesh` instances. Alternatively, a callable can be provided to
-        override the test. By default, the provided implementations are only
-        valid for 2D images.
+        Alternatively, a pixel-accurate convex hull can be used
+        ('convex_hull'). Here, there is no specialization for
+        :map:`TriMesh` instances. Both methods rasterize the triangles (or the
+        convex hull) directly, only visiting the pixels inside the bounding box
+        of each triangle (or column of the hull). A callable can also be
+        provided to override the test. By default, the provided implementations
+        are only valid for 2D images.
 
 
         Parameters
@@ -666,12 +1153,9 @@ class BooleanImage(Image):
             `point_in_pointcloud` for how in some cases a :map:`TriMesh` may be
             used to control triangulation.
         batch_size : `int` or ``None``, optional
-            This should only be considered for large images. Setting this value
-            will cause constraining to become much slower. This size indicates
-            how many points in the image should be checked at a time, which
-            keeps memory usage low. If ``None``, no batching is used and all
-            points are checked at once. By default, this is only used for
-            the 'pwa' point_in_pointcloud choice.
+            Has no effect, as the 'pwa' point_in_pointcloud choice no longer
+            tests every pixel of the image at once. Kept for backwards
+            compatibility.
         point_in_pointcloud : {'pwa', 'convex_hull'} or `callable`
             The method used to check if pixels in the image fall inside the
             ``pointcloud`` or not. If 'pwa', Menpo's :map:`PiecewiseAffine`
@@ -698,6 +1182,7 @@ class BooleanImage(Image):
             If the chosen ``point_in_pointcloud`` is unknown.
         """
         copy = self.copy()
+        copy.pixels = ensure_writeable(copy.pixels)
         if point_in_pointcloud in {"pwa", "convex_hull"} and self.n_dims != 2:
             raise ValueError(
                 "Can only constrain mask on 2D images with the "
@@ -708,11 +1193,21 @@ class BooleanImage(Image):
             )
 
         if point_in_pointcloud == "pwa":
-            point_in_pointcloud = partial(
-                pwa_point_in_pointcloud, batch_size=batch_size
+            from menpo.shape import TriMesh
+
+            if not isinstance(pointcloud, TriMesh):
+                pointcloud = TriMesh(pointcloud.points)
+            copy.pixels[0] = rasterize_triangles(
+                self.shape, pointcloud.points, pointcloud.trilist
             )
+            return copy
         elif point_in_pointcloud == "convex_hull":
-            point_in_pointcloud = convex_hull_point_in_pointcloud
+            from scipy.spatial import ConvexHull
+
+            points = pointcloud.points
+            polygon = points[ConvexHull(points).vertices]
+            copy.pixels[0] = rasterize_polygon(self.shape, polygon)
+            return copy
         elif not callable(point_in_pointcloud):
             # Not a function, or a string, so we have an error!
             raise ValueError(
@@ -1,6 +1,10 @@
+from warnings import warn
+import zlib
+
 import numpy as np
 
 map_coordinates = None  # expensive, from scipy.ndimage
+spline_filter = None  # expensive, from scipy.ndimage
 from menpo.transform import Homogeneous
 
 # Store out a transform that simply switches the x and y axis
@@ -56,6 +60,465 @@ def scipy_interpolation(pixels, points_to_sample, mode="constant", order=1, cval
     return sampled_pixel_values
 
 
+def _pixels_fingerprint(pixels):
+    r"""
+    A cheap fingerprint of the contents of the given pixels, used to detect
+    when cached information derived from them is stale.
+    """
+    data = np.ascontiguousarray(pixels)
+    return data.shape, data.dtype.str, zlib.crc32(data.view(np.uint8))
+
+
+class SplineCoefficients(object):
+    r"""
+    The B-spline coefficients of an image for a given interpolation order and
+    boundary mode. ``map_coordinates`` re-runs the spline prefilter over the
+    whole image on every call when ``order > 1``. Computing the coefficients
+    once means that repeated sampling of the same image only pays for the
+    evaluation of the spline.
+
+    Parameters
+    ----------
+    pixels : ``(n_channels, M, N, ...)`` `ndarray`
+        The image to be prefiltered, the first axis containing channel
+        information.
+    order : `int`, optional
+        The order of the spline interpolation. The order has to be in the
+        range [2, 5].
+    mode : ``{constant, nearest, reflect, wrap}``, optional
+        The boundary mode that the coefficients will be sampled with.
+
+    Raises
+    ------
+    ValueError
+        If the order is not in the range [2, 5].
+    """
+
+    def __init__(self, pixels, order=3, mode="constant"):
+        global spline_filter
+        if spline_filter is None:
+            from scipy.ndimage import spline_filter  # expensive
+        if order not in range(2, 6):
+            raise ValueError(
+                'Unsupported order "{}", must be in the range [2, 5]'.format(order)
+            )
+        self.order = order
+        self.mode = mode
+        self.dtype = pixels.dtype
+        self.fingerprint = _pixels_fingerprint(pixels)
+        # As in map_coordinates, the nearest mode has no exact boundary
+        # condition for the prefilter so the image is padded by replication
+        self.n_pad = 12 if mode == "nearest" else 0
+        if self.n_pad:
+            pad_width = [(0, 0)] + [(self.n_pad, self.n_pad)] * (pixels.ndim - 1)
+            pixels = np.pad(pixels, pad_width, mode="edge")
+        self.coefficients = np.empty(pixels.shape, dtype=np.float64)
+        for i in range(pixels.shape[0]):
+            spline_filter(
+                pixels[i], order=order, output=self.coefficients[i], mode=mode,
+            )
+
+    def is_valid_for(self, pixels):
+        r"""
+        Whether these coefficients were computed from pixels with exactly the
+        same contents as the given pixels.
+
+        Parameters
+        ----------
+        pixels : ``(n_channels, M, N, ...)`` `ndarray`
+            The pixels to check against.
+
+        Returns
+        -------
+        is_valid : `bool`
+            ``True`` if the coefficients can be used to sample ``pixels``.
+        """
+        return self.fingerprint == _pixels_fingerprint(pixels)
+
+    def sample(self, points_to_sample, cval=0.0):
+        r"""
+        Sample the spline at the given points, without prefiltering.
+
+        Parameters
+        ----------
+        points_to_sample : ``(n_points, n_dims)`` `ndarray`
+            The points which should be sampled.
+        cval : `float`, optional
+            The value that should be used for points that are sampled from
+            outside the image bounds if mode is ``constant``.
+
+        Returns
+        -------
+        sampled_image : ``(n_channels, n_points)`` `ndarray`
+            The pixel information sampled at each of the points.
+        """
+        global map_coordinates
+        if map_coordinates is None:
+            from scipy.ndimage import map_coordinates  # expensive
+        sampled_pixel_values = np.empty(
+            (self.coefficients.shape[0], points_to_sample.shape[0]), dtype=self.dtype
+        )
+        points_to_sample_t = points_to_sample.T + self.n_pad
+        for i in range(self.coefficients.shape[0]):
+            map_coordinates(
+                self.coefficients[i],
+                points_to_sample_t,
+                mode=self.mode,
+                order=self.order,
+                cval=cval,
+                output=sampled_pixel_values[i],
+                prefilter=False,
+            )
+        return sampled_pixel_values
+
+
+def _wrap_coordinates(x, length, mode):
+    r"""
+    Map sampling coordinates along a single axis back inside ``[0, length - 1]``
+    following the boundary semantics of ``scipy.ndimage.map_coordinates`` for
+    the given ``mode``. Points that fall outside in ``constant`` mode are
+    simply clipped - the caller is responsible for masking them out.
+    """
+    if mode in {"constant", "nearest"}:
+        return np.clip(x, 0, length - 1)
+    elif mode == "reflect":
+        # Half-sample symmetric, so the period of the signal is 2 * length
+        x = np.mod(x + 0.5, 2 * length) - 0.5
+        x = np.where(x > length - 0.5, 2 * length - 1 - x, x)
+        return np.clip(x, 0, length - 1)
+    elif mode == "wrap":
+        if length == 1:
+            return np.zeros_like(x)
+        # The period is length - 1, with points on the boundary left alone
+        period = length - 1
+        x = np.where(x < 0, period - np.mod(-x, period), x)
+        x = np.where(x > period, np.mod(x, period), x)
+        return np.clip(x, 0, period)
+    else:
+        raise ValueError(
+            'Unknown mode "{}", must be one of '
+            "(constant, nearest, reflect, wrap)".format(mode)
+        )
+
+
+def sampling_indices_and_weights(points_to_sample, shape, order=1, mode="constant"):
+    r"""
+    Compute the flat pixel indices and interpolation weights required to
+    sample an image of the given ``shape`` at ``points_to_sample``. Only
+    nearest neighbour (``order=0``) and linear (``order=1``) interpolation
+    are supported. The result only depends on the sampling locations and the
+    image shape, so it can be computed once and reused to sample many images
+    with :func:`sample_with_indices_and_weights`. Boundaries are handled
+    identically to :func:`scipy_interpolation`.
+
+    For linear interpolation only the index of the lowest corner of the
+    enclosing pixel cell is stored, along with the fractional position inside
+    the cell along each axis - the remaining ``2 ** n_dims - 1`` corners are
+    at fixed offsets from it.
+
+    Parameters
+    ----------
+    points_to_sample : ``(n_points, n_dims)`` `ndarray`
+        The points which should be sampled.
+    shape : `tuple`
+        The shape of the image to sample (without channel information).
+    order : ``{0, 1}``, optional
+        The order of the interpolation.
+    mode : ``{constant, nearest, reflect, wrap}``, optional
+        Points outside the boundaries of the input are filled according to the
+        given mode.
+
+    Returns
+    -------
+    indices : ``(n_points,)`` `ndarray`
+        The flat pixel index of the nearest pixel (``order=0``) or of the
+        lowest corner of the enclosing pixel cell (``order=1``).
+    weights : ``(n_dims, n_points)`` `ndarray` or ``None``
+        The fractional position of each point inside its pixel cell along
+        each axis. ``None`` for ``order=0``.
+    outside : ``(n_points,)`` `bool ndarray` or ``None``
+        ``True`` for points that lie outside of the image and should be filled
+        with the constant value. ``None`` unless ``mode='constant'``.
+
+    Raises
+    ------
+    ValueError
+        If the order is not 0 or 1, or the mode is unknown.
+    """
+    if order not in {0, 1}:
+        raise ValueError('Unsupported order "{}", must be one of (0, 1)'.format(order))
+    shape = tuple(int(s) for s in shape)
+    n_points = points_to_sample.shape[0]
+    # Row major strides of the image (in elements), used to flatten indices
+    strides = np.cumprod((shape[1:] + (1,))[::-1])[::-1]
+
+    outside = np.zeros(n_points, dtype=bool) if mode == "constant" else None
+    indices = np.zeros(n_points, dtype=np.intp)
+    weights = np.empty((len(shape), n_points)) if order == 1 else None
+    for k, length in enumerate(shape):
+        x = np.array(points_to_sample[:, k], dtype=np.float64)
+        if mode == "constant":
+            outside |= x < 0
+            outside |= x > length - 1
+        x = _wrap_coordinates(x, length, mode)
+        if order == 0:
+            # Match map_coordinates, which rounds half up
+            x += 0.5
+            lo = np.floor(x, out=x)
+        else:
+            # Clamp so that the upper neighbour is always inside the image
+            lo = np.minimum(np.floor(x), max(length - 2, 0))
+            np.subtract(x, lo, out=weights[k])
+        indices += lo.astype(np.intp) * strides[k]
+    return indices, weights, outside
+
+
+def _blend_cell_corners(flat_pixels, indices, weights, steps, dtype, axis=0, offset=0):
+    r"""
+    Linearly interpolate inside the pixel cells whose lowest corners are at
+    ``indices``. The cell is split in two along ``axis``, each half is
+    recursively reduced to a single value and the two are then blended with
+    the fractional position along ``axis``, so that at most ``n_dims + 1``
+    temporaries are alive at any time.
+    """
+    if axis == len(steps):
+        corner = indices + offset if offset else indices
+        return np.take(flat_pixels, corner, axis=1, mode="clip").astype(
+            dtype, copy=False
+        )
+    lo = _blend_cell_corners(
+        flat_pixels, indices, weights, steps, dtype, axis + 1, offset
+    )
+    hi = _blend_cell_corners(
+        flat_pixels, indices, weights, steps, dtype, axis + 1, offset + steps[axis]
+    )
+    hi -= lo
+    hi *= weights[axis]
+    lo += hi
+    return lo
+
+
+def sample_with_indices_and_weights(pixels, indices, weights, outside, cval=0.0):
+    r"""
+    Sample the given pixels using the precomputed output of
+    :func:`sampling_indices_and_weights`. All channels are sampled at once
+    via a gather per pixel cell corner and a separable linear blend.
+
+    Parameters
+    ----------
+    pixels : ``(n_channels, M, N, ...)`` `ndarray`
+        The image to be sampled from, the first axis containing channel
+        information.
+    indices : ``(n_points,)`` `ndarray`
+        The flat pixel index of the nearest pixel or lowest cell corner.
+    weights : ``(n_dims, n_points)`` `ndarray` or ``None``
+        The fractional position inside each pixel cell along each axis.
+        ``None`` for nearest neighbour sampling.
+    outside : ``(n_points,)`` `bool ndarray` or ``None``
+        Points that should be set to ``cval``.
+    cval : `float`, optional
+        The value that should be used for points that are sampled from
+        outside the image bounds.
+
+    Returns
+    -------
+    sampled_image : ``(n_channels, n_points)`` `ndarray`
+        The pixel information sampled at each of the points.
+    """
+    flat_pixels = pixels.reshape([pixels.shape[0], -1])
+    if weights is None:
+        sampled = np.take(flat_pixels, indices, axis=1, mode="clip")
+    else:
+        shape = pixels.shape[1:]
+        strides = np.cumprod((shape[1:] + (1,))[::-1])[::-1]
+        # Offset to the upper neighbour along each axis (none for an axis of
+        # length 1, where map_coordinates just repeats the only pixel)
+        steps = [st if length > 1 else 0 for st, length in zip(strides, shape)]
+        acc_dtype = (
+            pixels.dtype if np.issubdtype(pixels.dtype, np.floating) else np.float64
+        )
+        sampled = _blend_cell_corners(flat_pixels, indices, weights, steps, acc_dtype)
+        if not np.issubdtype(pixels.dtype, np.floating):
+            if np.issubdtype(pixels.dtype, np.integer):
+                # map_coordinates rounds half up when the output is integral
+                sampled += 0.5
+                np.floor(sampled, out=sampled)
+            sampled = sampled.astype(pixels.dtype)
+    if outside is not None:
+        sampled[:, outside] = cval
+    return sampled
+
+
+def numpy_interpolation(pixels, points_to_sample, mode="constant", order=1, cval=0.0):
+    r"""
+    Interpolation implemented as a vectorized gather and weighted sum in pure
+    NumPy. All channels are sampled at once, which is considerably faster than
+    :func:`scipy_interpolation` for nearest neighbour and linear
+    interpolation. Higher orders are delegated to :func:`scipy_interpolation`.
+
+    Parameters
+    ----------
+    pixels : ``(n_channels, M, N, ...)`` `ndarray`
+        The image to be sampled from, the first axis containing channel
+        information
+    points_to_sample : ``(n_points, n_dims)`` `ndarray`
+        The points which should be sampled from pixels
+    mode : ``{constant, nearest, reflect, wrap}``, optional
+        Points outside the boundaries of the input are filled according to the
+        given mode
+    order : `int,` optional
+        The order of the spline interpolation. The order has to be in the
+        range [0, 5].
+    cval : `float`, optional
+        The value that should be used for points that are sampled from
+        outside the image bounds if mode is ``constant``.
+
+    Returns
+    -------
+    sampled_image : `ndarray`
+        The pixel information sampled at each of the points.
+    """
+    if order not in {0, 1}:
+        return scipy_interpolation(
+            pixels, points_to_sample, mode=mode, order=order, cval=cval
+        )
+    indices, weights, outside = sampling_indices_and_weights(
+        points_to_sample, pixels.shape[1:], order=order, mode=mode
+    )
+    return sample_with_indices_and_weights(pixels, indices, weights, outside, cval=cval)
+
+
+_INTERPOLATION_BACKENDS = {"scipy": scipy_interpolation, "numpy": numpy_interpolation}
+_default_interpolation_backend = "numpy"
+
+
+def register_interpolation_backend(name, interpolation):
+    r"""
+    Register a new interpolation backend that can then be selected by name,
+    either per call (e.g. :meth:`Image.sample`) or globally via
+    :func:`set_default_interpolation_backend`.
+
+    Parameters
+    ----------
+    name : `str`
+        The name of the backend.
+    interpolation : `callable`
+        The interpolation function. Must have the same signature as
+        :func:`scipy_interpolation`, that is
+        ``f(pixels, points_to_sample, mode='constant', order=1, cval=0.0)``
+        and return a ``(n_channels, n_points)`` `ndarray`.
+    """
+    if name in _INTERPOLATION_BACKENDS:
+        warn("Replacing the existing '{}' interpolation backend.".format(name))
+    _INTERPOLATION_BACKENDS[name] = interpolation
+
+
+def set_default_interpolation_backend(name):
+    r"""
+    Set the interpolation backend that is used when none is explicitly
+    requested. The default is ``'numpy'``, which falls back to ``'scipy'``
+    for interpolation orders greater than 1. Before ``'numpy'`` was added,
+    ``'scipy'`` was the default - the two produce the same results up to
+    floating point tolerance. If OpenCV is installed, the ``'opencv'``
+    backend is also available. It is faster, in particular for
+    non-homogeneous warps (e.g. piecewise affine or thin plate splines), but
+    OpenCV quantizes the sampling locations to 1/32 of a pixel, so the
+    results differ slightly from the other backends.
+
+    Parameters
+    ----------
+    name : `str`
+        The name of a registered backend, e.g. ``'numpy'`` or ``'scipy'``.
+
+    Raises
+    ------
+    ValueError
+        If no backend is registered with the given name.
+    """
+    global _default_interpolation_backend
+    _interpolation_backend(name)
+    _default_interpolation_backend = name
+
+
+def get_default_interpolation_backend():
+    r"""
+    The name of the interpolation backend that is used when none is
+    explicitly requested (see :func:`set_default_interpolation_backend`).
+
+    Returns
+    -------
+    name : `str`
+        The name of the default backend.
+    """
+    return _default_interpolation_backend
+
+
+def _interpolation_backend(name):
+    if name is None:
+        name = _default_interpolation_backend
+    try:
+        return _INTERPOLATION_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            "Unknown interpolation backend '{}', must be one of "
+            "({})".format(name, ", ".join(sorted(_INTERPOLATION_BACKENDS)))
+        )
+
+
+def interpolate(
+    pixels,
+    points_to_sample,
+    mode="constant",
+    order=1,
+    cval=0.0,
+    backend=None,
+    spline_coefficients=None,
+):
+    r"""
+    Sample the given pixels at the given points using an interpolation
+    backend.
+
+    Parameters
+    ----------
+    pixels : ``(n_channels, M, N, ...)`` `ndarray`
+        The image to be sampled from, the first axis containing channel
+        information
+    points_to_sample : ``(n_points, n_dims)`` `ndarray`
+        The points which should be sampled from pixels
+    mode : ``{constant, nearest, reflect, wrap}``, optional
+        Points outside the boundaries of the input are filled according to the
+        given mode
+    order : `int,` optional
+        The order of the spline interpolation. The order has to be in the
+        range [0, 5].
+    cval : `float`, optional
+        The value that should be used for points that are sampled from
+        outside the image bounds if mode is ``constant``.
+    backend : `str` or ``None``, optional
+        The name of the interpolation backend to use. If ``None``, the
+        default backend is used (see
+        :func:`set_default_interpolation_backend`).
+    spline_coefficients : :map:`SplineCoefficients` or ``None``, optional
+        Precomputed spline coefficients of ``pixels``. If they match the
+        requested ``order`` and ``mode``, they are sampled directly (without
+        prefiltering) instead of calling the backend.
+
+    Returns
+    -------
+    sampled_image : `ndarray`
+        The pixel information sampled at each of the points.
+    """
+    if (
+        spline_coefficients is not None
+        and spline_coefficients.order == order
+        and spline_coefficients.mode == mode
+    ):
+        return spline_coefficients.sample(points_to_sample, cval=cval)
+    return _interpolation_backend(backend)(
+        pixels, points_to_sample, mode=mode, order=order, cval=cval
+    )
+
+
 try:
     import cv2
 
@@ -142,6 +605,198 @@ try:
             warped_image = warped_image.astype(np.bool)
         return warped_image
 
+    # OpenCV only supports maps with fewer than SHRT_MAX rows and columns, so
+    # arbitrary sets of points are packed into rows of this width
+    _CV2_REMAP_WIDTH = 1024
+    _CV2_REMAP_DTYPES = {
+        np.dtype(bool),
+        np.dtype(np.uint8),
+        np.dtype(np.uint16),
+        np.dtype(np.int16),
+        np.dtype(np.float32),
+        np.dtype(np.float64),
+    }
+
+    def can_cv2_remap(pixels, order, mode):
+        r"""
+        Whether :func:`cv2_remap_with_maps` supports sampling the given pixels
+        with the given interpolation order and boundary mode.
+
+        Parameters
+        ----------
+        pixels : ``(n_channels, M, N, ...)`` `ndarray`
+            The image to be sampled from.
+        order : `int`
+            The order of the interpolation.
+        mode : `str`
+            The boundary mode.
+
+        Returns
+        -------
+        supported : `bool`
+            ``True`` if OpenCV can be used to sample the pixels.
+        """
+        return (
+            pixels.ndim == 3
+            and order in {0, 1}
+            and mode in {"constant", "nearest"}
+            and pixels.dtype in _CV2_REMAP_DTYPES
+        )
+
+    def cv2_remap_maps(points_to_sample, shape, order=1, mode="constant"):
+        r"""
+        Build the fixed-point maps that :func:`cv2_remap_with_maps` uses to
+        sample an image of the given ``shape`` at ``points_to_sample``. The
+        maps only depend on the points and the image shape, so they can be
+        computed once and reused to sample many images.
+
+        Parameters
+        ----------
+        points_to_sample : ``(n_points, 2)`` `ndarray`
+            The points which should be sampled. Points containing ``NaN`` are
+            sampled as ``0``.
+        shape : `tuple`
+            The shape of the image to sample (without channel information).
+        order : ``{0, 1}``, optional
+            The order of the interpolation the maps are built for.
+        mode : ``{constant, nearest}``, optional
+            The boundary mode the maps are built for.
+
+        Returns
+        -------
+        maps : `tuple`
+            The two OpenCV maps, the number of points, a `bool ndarray`
+            marking the points that contain ``NaN`` and a `bool ndarray`
+            marking the points that lie outside of the image in ``constant``
+            mode (either mask is ``None`` if no points are marked).
+        """
+        n_points = points_to_sample.shape[0]
+        n_rows = max(-(-n_points // _CV2_REMAP_WIDTH), 1)
+        # Padding points are placed outside of the image and discarded
+        packed = np.full((n_rows * _CV2_REMAP_WIDTH, 2), -2, dtype=np.float32)
+        packed[:n_points] = points_to_sample
+        invalid = np.isnan(packed[:n_points]).any(axis=1)
+        packed[:n_points][invalid] = -2
+        outside = None
+        if mode == "constant":
+            # OpenCV blends with the border value within a pixel of the
+            # image, whereas map_coordinates treats anything outside of
+            # the image as cval
+            points = packed[:n_points]
+            outside = np.any((points < 0) | (points > np.array(shape) - 1), axis=1)
+            outside &= ~invalid
+            if not outside.any():
+                outside = None
+        if not invalid.any():
+            invalid = None
+        # Points are (y, x), OpenCV requires separate x and y maps
+        map_x = packed[:, 1].reshape([n_rows, _CV2_REMAP_WIDTH])
+        map_y = packed[:, 0].reshape([n_rows, _CV2_REMAP_WIDTH])
+        map1, map2 = cv2.convertMaps(
+            map_x, map_y, cv2.CV_16SC2, nninterpolation=order == 0
+        )
+        return map1, map2, n_points, invalid, outside
+
+    def cv2_remap_with_maps(pixels, maps, mode="constant", order=1, cval=0.0):
+        r"""
+        Sample the given pixels using OpenCV remapping with maps that were
+        built by :func:`cv2_remap_maps`. As OpenCV uses fixed-point
+        arithmetic, the results may differ very slightly from
+        :func:`scipy_interpolation`.
+
+        Parameters
+        ----------
+        pixels : ``(n_channels, M, N)`` `ndarray`
+            The image to be sampled from, the first axis containing channel
+            information.
+        maps : `tuple`
+            The output of :func:`cv2_remap_maps`.
+        mode : ``{constant, nearest}``, optional
+            Points outside the boundaries of the input are filled according to
+            the given mode. Must match the mode the maps were built for.
+        order : ``{0, 1}``, optional
+            The order of the interpolation. Must match the order the maps
+            were built for.
+        cval : `float`, optional
+            The value that should be used for points that are sampled from
+            outside the image bounds if mode is ``constant``.
+
+        Returns
+        -------
+        sampled_image : ``(n_channels, n_points)`` `ndarray`
+            The pixel information sampled at each of the points.
+        """
+        map1, map2, n_points, invalid, outside = maps
+        # OpenCV does not support the boolean numpy type
+        if pixels.dtype == bool:
+            in_pixels = pixels.astype(np.uint8)
+        else:
+            in_pixels = pixels
+        sampled = np.empty((pixels.shape[0],) + map1.shape[:2], dtype=in_pixels.dtype)
+        for i in range(pixels.shape[0]):
+            cv2.remap(
+                in_pixels[i],
+                map1,
+                map2,
+                interpolation=_order_to_opencv(order),
+                dst=sampled[i],
+                borderMode=_mode_to_opencv(mode),
+                borderValue=cval,
+            )
+        sampled = np.require(
+            sampled.reshape([pixels.shape[0], -1])[:, :n_points], requirements=["C"],
+        )
+        if outside is not None:
+            sampled[:, outside] = cval
+        if invalid is not None:
+            sampled[:, invalid] = 0
+        if pixels.dtype == bool:
+            sampled = sampled.astype(bool)
+        return sampled
+
+    def cv2_remap_interpolation(
+        pixels, points_to_sample, mode="constant", order=1, cval=0.0
+    ):
+        r"""
+        Interpolation utilizing OpenCV remapping, which supports arbitrary
+        (non-homogeneous) sampling locations. Only 2D images, nearest
+        neighbour and linear interpolation and the ``constant`` and
+        ``nearest`` modes are supported - anything else is delegated to
+        :func:`numpy_interpolation`.
+
+        Parameters
+        ----------
+        pixels : ``(n_channels, M, N, ...)`` `ndarray`
+            The image to be sampled from, the first axis containing channel
+            information
+        points_to_sample : ``(n_points, n_dims)`` `ndarray`
+            The points which should be sampled from pixels
+        mode : ``{constant, nearest, reflect, wrap}``, optional
+            Points outside the boundaries of the input are filled according to
+            the given mode
+        order : `int,` optional
+            The order of the spline interpolation. The order has to be in the
+            range [0, 5].
+        cval : `float`, optional
+            The value that should be used for points that are sampled from
+            outside the image bounds if mode is ``constant``.
+
+        Returns
+        -------
+        sampled_image : `ndarray`
+            The pixel information sampled at each of the points.
+        """
+        if not can_cv2_remap(pixels, order, mode):
+            return numpy_interpolation(
+                pixels, points_to_sample, mode=mode, order=order, cval=cval
+            )
+        maps = cv2_remap_maps(
+            points_to_sample, pixels.shape[1:], order=order, mode=mode
+        )
+        return cv2_remap_with_maps(pixels, maps, mode=mode, order=order, cval=cval)
+
+    _INTERPOLATION_BACKENDS["opencv"] = cv2_remap_interpolation
+
 
 except ImportError:
     pass
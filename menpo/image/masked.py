@@ -3,14 +3,20 @@ from warnings import warn
 import numpy as np
 
 binary_erosion = None  # expensive, from scipy.ndimage
-binary_dilation = None  # expensive, from scipy.ndimage
 
-from menpo.base import MenpoDeprecationWarning, copy_landmarks_and_path
-from menpo.transform import Translation
+from menpo.base import (
+    MenpoDeprecationWarning,
+    copy_landmarks_and_path,
+    ensure_writeable,
+    open_memmap_region,
+    pixel_float_dtype,
+)
+from menpo.transform import Homogeneous, Translation
 from menpo.visualize.base import ImageViewer
 
 from .base import Image
 from .boolean import BooleanImage
+from .warp import WarpPlan
 
 
 class OutOfMaskSampleError(ValueError):
@@ -84,8 +90,163 @@ class MaskedImage(Image):
             # no mask provided - make the default.
             self.mask = BooleanImage.init_blank(self.shape, fill=True)
 
+    @property
+    def pixels(self):
+        r"""
+        The pixels of the image, with the channels on the first axis. If the
+        image is compact (see :meth:`as_compact`), accessing the pixels
+        rebuilds the full pixel array (filling the ``False`` region of the
+        mask with zeros) and the image stops being compact.
+
+        :type: ``(n_channels, M, N, ...)`` `ndarray`
+        """
+        if self.is_compact:
+            self._expand_compact()
+        return self.__dict__["pixels"]
+
+    @pixels.setter
+    def pixels(self, value):
+        self.__dict__["pixels"] = value
+        self.__dict__["_compact_pixels"] = None
+
+    @property
+    def is_compact(self):
+        r"""
+        ``True`` if only the pixels in the ``True`` region of the mask are
+        stored (see :meth:`as_compact`).
+
+        :type: `bool`
+        """
+        return self.__dict__.get("_compact_pixels") is not None
+
+    def as_compact(self, copy=True):
+        r"""
+        Return a compact version of this image, which only stores the pixels
+        in the ``True`` region of the mask as a ``(n_channels, n_true)``
+        array, along with a reference to the mask of this image (which is not
+        copied). Converting a compact image to and from a vector does not copy
+        any pixels, which is useful when the same mask is vectorised
+        repeatedly (e.g. in every iteration of a fitting).
+
+        The mask of a compact image must not be modified. Accessing
+        :attr:`pixels` (or any method that uses them) rebuilds the full
+        image, after which it is no longer compact.
+
+        Parameters
+        ----------
+        copy : `bool`, optional
+            If ``False``, the compact pixels may share memory with the pixels
+            of this image (only possible if the mask is all ``True``).
+
+        Returns
+        -------
+        compact_image : :map:`MaskedImage`
+            A compact image with the same masked pixels, mask and landmarks as
+            this one.
+        """
+        compact_pixels = self._as_vector(keep_channels=True)
+        if copy and np.may_share_memory(compact_pixels, self.__dict__["pixels"]):
+            compact_pixels = compact_pixels.copy()
+        return self._init_compact(compact_pixels)
+
+    def _init_compact(self, compact_pixels):
+        image = self.__class__.__new__(self.__class__)
+        image.__dict__.update(
+            pixels=None, _compact_pixels=compact_pixels, mask=self.mask
+        )
+        image._landmarks = None
+        return copy_landmarks_and_path(self, image)
+
+    def _expand_compact(self):
+        compact_pixels = self.__dict__["_compact_pixels"]
+        if compact_pixels.shape[1] != self.mask.n_true():
+            raise ValueError(
+                "The mask of a compact image has been modified - it has {} "
+                "True pixels but {} pixels are stored".format(
+                    self.mask.n_true(), compact_pixels.shape[1]
+                )
+            )
+        pixels = np.zeros(
+            (compact_pixels.shape[0],) + self.mask.shape, dtype=compact_pixels.dtype
+        )
+        pixels.reshape((pixels.shape[0], -1))[
+            :, self.mask.true_flat_indices()
+        ] = compact_pixels
+        self.pixels = pixels
+
+    def __getstate__(self):
+        if self.is_compact:
+            return self.__dict__.copy()
+        return super(MaskedImage, self).__getstate__()
+
+    @property
+    def n_channels(self):
+        r"""
+        The number of channels on each pixel in the image.
+
+        :type: `int`
+        """
+        if self.is_compact:
+            return self.__dict__["_compact_pixels"].shape[0]
+        return self.pixels.shape[0]
+
+    @property
+    def shape(self):
+        r"""
+        The shape of the image
+        (with ``n_channel`` values at each point).
+
+        :type: `tuple`
+        """
+        if self.is_compact:
+            return self.mask.shape
+        return self.pixels.shape[1:]
+
+    @property
+    def width(self):
+        r"""
+        The width of the image.
+
+        This is the width according to image semantics, and is thus the size
+        of the **last** dimension.
+
+        :type: `int`
+        """
+        return self.shape[-1]
+
+    @property
+    def height(self):
+        r"""
+        The height of the image.
+
+        This is the height according to image semantics, and is thus the size
+        of the **second to last** dimension.
+
+        :type: `int`
+        """
+        return self.shape[-2]
+
+    @property
+    def n_pixels(self):
+        r"""
+        Total number of pixels in the image ``(prod(shape),)``
+
+        :type: `int`
+        """
+        return int(np.prod(self.shape))
+
+    @property
+    def n_elements(self):
+        r"""
+        Total number of data points in the image
+        ``(prod(shape), n_channels)``
+
+        :type: `int`
+        """
+        return self.n_pixels * self.n_channels
+
     @classmethod
-    def init_blank(cls, shape, n_channels=1, fill=0, dtype=np.float, mask=None):
+    def init_blank(cls, shape, n_channels=1, fill=0, dtype=None, mask=None):
         r"""Generate a blank masked image
 
         Parameters
@@ -97,8 +258,9 @@ class MaskedImage(Image):
             The number of channels to create the image with.
         fill : `int`, optional
             The value to fill all pixels with.
-        dtype: `numpy datatype`, optional
-            The datatype of the image.
+        dtype: `numpy datatype` or ``None``, optional
+            The datatype of the image. If ``None``, the floating point type
+            of the pixel precision policy.
         mask: ``(M, N)`` `bool ndarray` or :map:`BooleanImage`
             An optional mask that can be applied to the image. Has to have a
             shape equal to that of the image.
@@ -121,6 +283,8 @@ class MaskedImage(Image):
         """
         # Ensure that the '+' operator means concatenate tuples
         shape = tuple(np.ceil(shape).astype(np.int))
+        if dtype is None:
+            dtype = pixel_float_dtype()
         if fill == 0:
             pixels = np.zeros((n_channels,) + shape, dtype=dtype)
         else:
@@ -157,6 +321,37 @@ class MaskedImage(Image):
             mask = mask.copy()
         return MaskedImage(im.pixels, mask=mask, copy=False)
 
+    @classmethod
+    def init_from_memmap(cls, path, shape, dtype=np.uint8, offset=0, mask=None):
+        r"""
+        Create a MaskedImage whose pixels are memory mapped from a raw binary
+        file, so that they are only read from disk when they are accessed.
+        See :meth:`Image.init_from_memmap` for details. The mask is held in
+        memory.
+
+        Parameters
+        ----------
+        path : `str` or `pathlib.Path`
+            The path to the binary file containing the pixels in C order, with
+            the first axis being channels.
+        shape : `tuple`
+            The shape of the pixels. If 2D, the image has a single channel.
+        dtype : numpy data type, optional
+            The data type of the pixels.
+        offset : `int`, optional
+            The offset, in bytes, of the pixels within the file.
+        mask : ``(M, N)`` `bool ndarray` or :map:`BooleanImage`, optional
+            A binary array representing the mask. Must be the same shape as
+            the image. If ``None``, the mask is all ``True``.
+
+        Returns
+        -------
+        image : ``type(cls)``
+            A new image backed by the file.
+        """
+        pixels = open_memmap_region(str(path), offset, tuple(shape), dtype)
+        return cls(pixels, mask=mask, copy=False)
+
     @classmethod
     def init_from_pointcloud(
         cls,
@@ -166,7 +361,7 @@ class MaskedImage(Image):
         constrain_mask=True,
         n_channels=1,
         fill=0,
-        dtype=np.float,
+        dtype=None,
     ):
         r"""
         Create an Image that is big enough to contain the given pointcloud.
@@ -196,8 +391,9 @@ class MaskedImage(Image):
             The number of channels to create the image with.
         fill : `int`, optional
             The value to fill all pixels with.
-        dtype : numpy data type, optional
-            The data type of the image.
+        dtype : numpy data type or ``None``, optional
+            The data type of the image. If ``None``, the floating point type
+            of the pixel precision policy.
         constrain_mask : `bool`, optional
             If ``True``, the mask will be constrained to the convex hull
             of the provided pointcloud. If ``False``, the mask will be all
@@ -253,6 +449,7 @@ class MaskedImage(Image):
         """
         img = Image(self.pixels, copy=copy)
         if fill is not None:
+            img.pixels = ensure_writeable(img.pixels)
             if not np.isscalar(fill):
                 fill = np.array(fill).reshape(self.n_channels, -1)
             img.pixels[..., ~self.mask.mask] = fill
@@ -300,13 +497,19 @@ class MaskedImage(Image):
 
     def masked_pixels(self):
         r"""
-        Get the pixels covered by the `True` values in the mask.
+        Get the pixels covered by the `True` values in the mask. For a compact
+        image (see :meth:`as_compact`), the stored pixels are returned without
+        a copy.
 
         :type: ``(n_channels, mask.n_true)`` `ndarray`
         """
+        if self.is_compact:
+            return self.__dict__["_compact_pixels"]
         if self.mask.all_true():
             return self.pixels
-        return self.pixels[..., self.mask.mask]
+        return self.pixels.reshape((self.n_channels, -1)).take(
+            self.mask.true_flat_indices(), axis=1
+        )
 
     def set_masked_pixels(self, pixels, copy=True):
         r"""
@@ -339,7 +542,12 @@ class MaskedImage(Image):
         Warning
             If the ``copy=False`` flag cannot be honored.
         """
-        if self.mask.all_true():
+        if self.is_compact:
+            pixels = pixels.reshape((self.n_channels, -1))
+            if copy:
+                pixels = pixels.copy()
+            self.__dict__["_compact_pixels"] = pixels
+        elif self.mask.all_true():
             # reshape the vector into the image again
             pixels = pixels.reshape((self.n_channels,) + self.shape)
             if not copy:
@@ -355,7 +563,12 @@ class MaskedImage(Image):
                 pixels = pixels.copy()
             self.pixels = pixels
         else:
-            self.pixels[..., self.mask.mask] = pixels
+            self.pixels = ensure_writeable(self.pixels)
+            if self.pixels.flags.c_contiguous:
+                flat_pixels = self.pixels.reshape((self.n_channels, -1))
+                flat_pixels[:, self.mask.true_flat_indices()] = pixels
+            else:
+                self.pixels[..., self.mask.mask] = pixels
             # oh dear, couldn't avoid a copy. Did the user try to?
             if not copy:
                 warn(
@@ -407,7 +620,9 @@ class MaskedImage(Image):
         the vector to the correct pixels and channels. Note that the only
         region of the image that will be filled is the masked region.
 
-        On masked images, the vector is always copied.
+        On masked images, the vector is always copied, unless the image is
+        compact (see :meth:`as_compact`), in which case the new compact image
+        is a view of the vector.
 
         The ``n_channels`` argument is useful for when we want to add an extra
         channel to an image but maintain the shape. For example, when
@@ -432,6 +647,8 @@ class MaskedImage(Image):
         # This is useful for when we want to add an extra channel to an image
         # but maintain the shape. For example, when calculating the gradient
         n_channels = self.n_channels if n_channels is None else n_channels
+        if self.is_compact:
+            return self._init_compact(vector.reshape((n_channels, -1)))
         # Creates zeros of size (n_channels x M x N x ...)
         if self.mask.all_true():
             # we can just reshape the array!
@@ -439,7 +656,9 @@ class MaskedImage(Image):
         else:
             image_data = np.zeros((n_channels,) + self.shape, dtype=vector.dtype)
             pixels_per_channel = vector.reshape((n_channels, -1))
-            image_data[..., self.mask.mask] = pixels_per_channel
+            image_data.reshape((n_channels, -1))[
+                :, self.mask.true_flat_indices()
+            ] = pixels_per_channel
         new_image = MaskedImage(image_data, mask=self.mask)
         return copy_landmarks_and_path(self, new_image)
 
@@ -956,7 +1175,13 @@ class MaskedImage(Image):
         )
 
     def sample(
-        self, points_to_sample, order=1, mode="constant", cval=0.0, verify_mask=False
+        self,
+        points_to_sample,
+        order=1,
+        mode="constant",
+        cval=0.0,
+        verify_mask=False,
+        backend=None,
     ):
         r"""
         Sample this image at the given sub-pixel accurate points. The input
@@ -992,6 +1217,10 @@ class MaskedImage(Image):
             order splines may cause interpolated mask values that are rounded
             to zero and thus cause false positives.
 
+        backend : `str` or ``None``, optional
+            The interpolation backend to use, e.g. ``'numpy'`` or ``'scipy'``.
+            If ``None``, the default backend is used.
+
         Returns
         -------
         sampled_pixels : (`n_points`, `n_channels`) `ndarray`
@@ -1007,10 +1236,12 @@ class MaskedImage(Image):
             if verify_mask is True.
         """
         sampled_values = Image.sample(
-            self, points_to_sample, order=order, mode=mode, cval=cval
+            self, points_to_sample, order=order, mode=mode, cval=cval, backend=backend
         )
         if verify_mask:
-            sampled_mask = self.mask.sample(points_to_sample, mode=mode, cval=cval)
+            sampled_mask = self.mask.sample(
+                points_to_sample, mode=mode, cval=cval, backend=backend
+            )
             if not np.all(sampled_mask):
                 raise OutOfMaskSampleError(sampled_mask, sampled_values)
         return sampled_values
@@ -1019,7 +1250,7 @@ class MaskedImage(Image):
     def warp_to_mask(
         self,
         template_mask,
-        transform,
+        transform=None,
         warp_landmarks=False,
         order=1,
         mode="constant",
@@ -1032,12 +1263,15 @@ class MaskedImage(Image):
 
         Parameters
         ----------
-        template_mask : :map:`BooleanImage`
+        template_mask : :map:`BooleanImage` or :map:`WarpPlan`
             Defines the shape of the result, and what pixels should be sampled.
-        transform : :map:`Transform`
+            If a :map:`WarpPlan` is provided, the sampling locations it has
+            cached are reused and ``transform`` may be ``None``.
+        transform : :map:`Transform` or ``None``, optional
             Transform **from the template space back to this image**.
             Defines, for each pixel location on the template, which pixel
-            location should be sampled from on this image.
+            location should be sampled from on this image. Only optional if
+            ``template_mask`` is a :map:`WarpPlan`.
         warp_landmarks : `bool`, optional
             If ``True``, result will have the same landmark dictionary
             as ``self``, but with each landmark updated to the warped position.
@@ -1080,9 +1314,9 @@ class MaskedImage(Image):
             The transform that was used. It only applies if
             `return_transform` is ``True``.
         """
-        # call the super variant and get ourselves a MaskedImage back
-        # with a blank mask
-        warped_image = Image.warp_to_mask(
+        # call the super variant and get ourselves a MaskedImage back, which
+        # already has the template mask (resolved from any warp plan) attached
+        warped_image, transform = Image.warp_to_mask(
             self,
             template_mask,
             transform,
@@ -1091,9 +1325,8 @@ class MaskedImage(Image):
             mode=mode,
             cval=cval,
             batch_size=batch_size,
+            return_transform=True,
         )
-        # Set the template mask as our mask
-        warped_image.mask = template_mask
         # optionally return the transform
         if return_transform:
             return warped_image, transform
@@ -1104,7 +1337,7 @@ class MaskedImage(Image):
     def warp_to_shape(
         self,
         template_shape,
-        transform,
+        transform=None,
         warp_landmarks=False,
         order=1,
         mode="constant",
@@ -1118,13 +1351,16 @@ class MaskedImage(Image):
 
         Parameters
         ----------
-        template_shape : `tuple` or `ndarray`
+        template_shape : `tuple` or `ndarray` or :map:`WarpPlan`
             Defines the shape of the result, and what pixel indices should be
-            sampled (all of them).
-        transform : :map:`Transform`
+            sampled (all of them). If a :map:`WarpPlan` is provided, the
+            sampling locations it has cached are reused and ``transform`` may
+            be ``None``.
+        transform : :map:`Transform` or ``None``, optional
             Transform **from the template_shape space back to this image**.
             Defines, for each index on template_shape, which pixel location
-            should be sampled from on this image.
+            should be sampled from on this image. Only optional if
+            ``template_shape`` is a :map:`WarpPlan`.
         warp_landmarks : `bool`, optional
             If ``True``, result will have the same landmark dictionary
             as self, but with each landmark updated to the warped position.
@@ -1167,8 +1403,17 @@ class MaskedImage(Image):
             The transform that was used. It only applies if
             `return_transform` is ``True``.
         """
+        if (
+            transform is not None
+            and not isinstance(template_shape, WarpPlan)
+            and not isinstance(transform, Homogeneous)
+        ):
+            # The pixels and the mask are sampled at the same locations, so
+            # only apply the (potentially expensive) transform once
+            template_shape = WarpPlan(template_shape, transform, batch_size=batch_size)
+            transform = None
         # call the super variant and get ourselves an Image back
-        warped_image = Image.warp_to_shape(
+        warped_image, transform_used = Image.warp_to_shape(
             self,
             template_shape,
             transform,
@@ -1177,6 +1422,7 @@ class MaskedImage(Image):
             mode=mode,
             cval=cval,
             batch_size=batch_size,
+            return_transform=True,
         )
         # Warp the mask separately and reattach
         mask = self.mask.warp_to_shape(
@@ -1193,11 +1439,11 @@ class MaskedImage(Image):
             masked_warped_image.path = warped_image.path
         # optionally return the transform
         if return_transform:
-            return masked_warped_image, transform
+            return masked_warped_image, transform_used
         else:
             return masked_warped_image
 
-    def normalize_std(self, mode="all", limit_to_mask=True):
+    def normalize_std(self, mode="all", limit_to_mask=True, inplace=False):
         r"""
         Returns a copy of this image normalized such that it's pixel values
         have zero mean and unit variance.
@@ -1213,6 +1459,9 @@ class MaskedImage(Image):
             pixels.
             If ``False``, the normalization is wrt all pixels, regardless of
             their masking value.
+        inplace : `bool`, optional
+            If ``True``, this image is normalized (and returned) rather than a
+            copy of it. Floating point pixels are normalized in place.
 
         Returns
         -------
@@ -1226,9 +1475,11 @@ class MaskedImage(Image):
             MenpoDeprecationWarning,
         )
 
-        return self._normalize(np.std, mode=mode, limit_to_mask=limit_to_mask)
+        return self._normalize(
+            np.std, mode=mode, limit_to_mask=limit_to_mask, inplace=inplace
+        )
 
-    def normalize_norm(self, mode="all", limit_to_mask=True, **kwargs):
+    def normalize_norm(self, mode="all", limit_to_mask=True, inplace=False, **kwargs):
         r"""
         Returns a copy of this image normalized such that it's pixel values
         have zero mean and its norm equals 1.
@@ -1244,6 +1495,9 @@ class MaskedImage(Image):
             pixels.
             If ``False``, the normalization is wrt all pixels, regardless of
             their masking value.
+        inplace : `bool`, optional
+            If ``True``, this image is normalized (and returned) rather than a
+            copy of it. Floating point pixels are normalized in place.
 
         Returns
         -------
@@ -1260,19 +1514,25 @@ class MaskedImage(Image):
         def scale_func(pixels, axis=None):
             return np.linalg.norm(pixels, axis=axis, **kwargs)
 
-        return self._normalize(scale_func, mode=mode, limit_to_mask=limit_to_mask)
+        return self._normalize(
+            scale_func, mode=mode, limit_to_mask=limit_to_mask, inplace=inplace
+        )
 
-    def _normalize(self, scale_func, mode="all", limit_to_mask=True):
+    def _normalize(self, scale_func, mode="all", limit_to_mask=True, inplace=False):
         from menpo.feature import normalize
 
+        out = self._inplace_float_pixels() if inplace else None
+
         if limit_to_mask:
             pixels = self
         else:
             pixels = self.as_unmasked(copy=False)
 
-        new_img = normalize(pixels, scale_func=scale_func, mode=mode)
+        new_img = normalize(pixels, scale_func=scale_func, mode=mode, out=out)
 
-        if limit_to_mask:
+        if inplace:
+            return self
+        elif limit_to_mask:
             return new_img
         else:
             return new_img.as_masked(copy=False, mask=self.mask.copy())
@@ -1287,10 +1547,11 @@ class MaskedImage(Image):
         The choice of whether a pixel is inside or outside of the pointcloud
         is determined by the ``point_in_pointcloud`` parameter. By default
         a Piecewise Affine transform is used to test for containment, which
-        is useful when building efficiently aligning images. For large images,
-        a faster and pixel-accurate method can be used ('convex_hull').
-        Alternatively, a callable can be provided to override the test. By
-        default, the provided implementations are only valid for 2D images.
+        is useful when building efficiently aligning images. Alternatively,
+        a pixel-accurate convex hull can be used ('convex_hull'). Both are
+        rasterized directly (see :meth:`BooleanImage.constrain_to_pointcloud`).
+        A callable can also be provided to override the test. By default, the
+        provided implementations are only valid for 2D images.
 
         Parameters
         ----------
@@ -1303,12 +1564,8 @@ class MaskedImage(Image):
             :map:`PointCloud`, Delaunay triangulation will be used to
             create a triangulation.
         batch_size : `int` or ``None``, optional
-            This should only be considered for large images. Setting this value
-            will cause constraining to become much slower. This size indicates
-            how many points in the image should be checked at a time, which
-            keeps memory usage low. If ``None``, no batching is used and all
-            points are checked at once. By default, this is only used for
-            the 'pwa' point_in_pointcloud choice.
+            Has no effect, kept for backwards compatibility. See
+            :meth:`BooleanImage.constrain_to_pointcloud`.
         point_in_pointcloud : {'pwa', 'convex_hull'} or `callable`
             The method used to check if pixels in the image fall inside the
             pointcloud or not. Can be accurate to a Piecewise Affine transform,
@@ -1373,7 +1630,7 @@ class MaskedImage(Image):
         # get the selected pointcloud
         pc = copy.landmarks[group]
         # temporarily set all mask values to False
-        copy.mask.pixels[:] = False
+        copy.mask.pixels = np.zeros_like(copy.mask.pixels)
         # create a patches array of the correct size, full of True values
         patches = np.ones(
             (pc.n_points, 1, 1, int(patch_shape[0]), int(patch_shape[1])), dtype=np.bool
@@ -1412,6 +1669,7 @@ class MaskedImage(Image):
         # masks. This is only true in the region we want to nullify.
         np.logical_and(~eroded_mask, copy.mask.mask, out=eroded_mask)
         # set all the boundary pixels to a particular value
+        copy.pixels = ensure_writeable(copy.pixels)
         copy.pixels[..., eroded_mask] = value
         return copy
 
@@ -1432,14 +1690,8 @@ class MaskedImage(Image):
             The copy of the masked image in which the mask has been shrunk
             by n pixels along its boundary.
         """
-        global binary_erosion
-        if binary_erosion is None:
-            from scipy.ndimage import binary_erosion  # expensive
-        # Erode the edge of the mask in by one pixel
-        eroded_mask = binary_erosion(self.mask.mask, iterations=n_pixels)
-
         image = self.copy()
-        image.mask = BooleanImage(eroded_mask)
+        image.mask = self.mask.erode(n_pixels=n_pixels)
         return image
 
     def dilate(self, n_pixels=1):
@@ -1459,14 +1711,8 @@ class MaskedImage(Image):
             The copy of the masked image in which the mask has been expanded
             by n pixels along its boundary.
         """
-        global binary_dilation
-        if binary_dilation is None:
-            from scipy.ndimage import binary_dilation  # expensive
-        # Erode the edge of the mask in by one pixel
-        dilated_mask = binary_dilation(self.mask.mask, iterations=n_pixels)
-
         image = self.copy()
-        image.mask = BooleanImage(dilated_mask)
+        image.mask = self.mask.dilate(n_pixels=n_pixels)
         return image
 
     def rasterize_landmarks(
@@ -1,6 +1,15 @@
+from itertools import islice
+
+try:
+    import collections.abc as collections_abc
+except ImportError:
+    import collections as collections_abc
+
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
 
-from .interpolation import scipy_interpolation
+from .interpolation import interpolate
+from .tiling import _map_in_threads
 
 
 def _centered_patch(patch_shape):
@@ -44,7 +53,14 @@ def _centered_patch(patch_shape):
 
 
 def extract_patches_by_sampling(
-    pixels, patch_centers, patch_shape, offsets=None, order=0, mode="constant", cval=0.0
+    pixels,
+    patch_centers,
+    patch_shape,
+    offsets=None,
+    order=0,
+    mode="constant",
+    cval=0.0,
+    spline_coefficients=None,
 ):
     r"""
     Extract a set of patches from the given pixels. Given a set of patch centers
@@ -74,6 +90,9 @@ def extract_patches_by_sampling(
     cval : `float`, optional
         Used in conjunction with mode ``constant``, the value outside
         the image boundaries.
+    spline_coefficients : :map:`SplineCoefficients` or ``None``, optional
+        Precomputed spline coefficients of ``pixels``, used instead of
+        prefiltering the pixels when ``order`` is greater than 1.
 
     Returns
     -------
@@ -100,16 +119,66 @@ def extract_patches_by_sampling(
         points_to_sample = points_to_sample[:, :, None, :] + offsets
     points_to_sample = points_to_sample.reshape([-1, 2])
 
-    patches = scipy_interpolation(
-        pixels, points_to_sample, order=order, mode=mode, cval=cval
+    patches = interpolate(
+        pixels,
+        points_to_sample,
+        order=order,
+        mode=mode,
+        cval=cval,
+        spline_coefficients=spline_coefficients,
+    )
+    patches = patches.reshape(
+        pixels.shape[0], patch_shape[0], patch_shape[1], n_points, n_offsets
     )
-    patches = patches.reshape(3, patch_shape[0], patch_shape[1], n_points, n_offsets)
     patches = np.transpose(patches, [3, 4, 0, 1, 2])
     return np.require(patches, requirements=["C"])
 
 
+def _patch_windows(pixels, patch_shape):
+    r"""
+    A read-only ``(height - patch_height + 1, width - patch_width + 1,
+    n_channels, patch_height, patch_width)`` view of every patch that lies
+    inside the given pixels, indexed by the top left corner of the patch, or
+    ``None`` if the patch is larger than the pixels.
+    """
+    n_channels, height, width = pixels.shape
+    if patch_shape[0] > height or patch_shape[1] > width:
+        return None
+    s_c, s_r, s_w = pixels.strides
+    return as_strided(
+        pixels,
+        shape=(
+            height - patch_shape[0] + 1,
+            width - patch_shape[1] + 1,
+            n_channels,
+            patch_shape[0],
+            patch_shape[1],
+        ),
+        strides=(s_r, s_w, s_c, s_r, s_w),
+        writeable=False,
+    )
+
+
+def _boundary_patches(pixels, corners, patch_shape, cval):
+    r"""
+    Gather the ``(n_patches, n_channels, patch_height, patch_width)`` patches
+    with the given top left corners that (partially) lie outside the given
+    pixels, filling the outside with ``cval``.
+    """
+    rows = corners[:, :1] + np.arange(patch_shape[0])
+    cols = corners[:, 1:] + np.arange(patch_shape[1])
+    valid_rows = (rows >= 0) & (rows < pixels.shape[1])
+    valid_cols = (cols >= 0) & (cols < pixels.shape[2])
+    rows = np.clip(rows, 0, pixels.shape[1] - 1)
+    cols = np.clip(cols, 0, pixels.shape[2] - 1)
+    patches = pixels[:, rows[:, :, None], cols[:, None, :]]
+    patches = np.moveaxis(patches, 0, 1)
+    valid = valid_rows[:, None, :, None] & valid_cols[:, None, None, :]
+    return np.where(valid, patches, np.array(cval, dtype=pixels.dtype))
+
+
 def extract_patches_with_slice(
-    pixels, patch_centers, patch_shape, offsets=None, cval=0.0
+    pixels, patch_centers, patch_shape, offsets=None, cval=0.0, as_views=False
 ):
     r"""
     Extract a set of patches from the given pixels. Given a set of patch centers
@@ -117,6 +186,9 @@ def extract_patches_with_slice(
     on the given coordinates. Note that only 2D images are currently supported.
     This is equivalent to sampling with ``order=0`` and ``mode='constant'``.
 
+    The patches that lie inside the image are gathered at once from a strided
+    view of the pixels, so no Python loop over the patches is required.
+
     Parameters
     ----------
     pixels : ``(n_channels, height, width)`` `ndarray``
@@ -132,10 +204,15 @@ def extract_patches_with_slice(
         If ``None``, then no offsets are applied.
     cval : `float`, optional
         The value outside the image boundaries.
+    as_views : `bool`, optional
+        If ``True``, a `list` of ``n_center * n_offset`` read-only
+        ``(n_channels, patch_shape)`` `ndarray` is returned (ordered as the
+        flattened single array). Patches that lie inside the image are views
+        of ``pixels``, so no pixels are copied.
 
     Returns
     -------
-    patches : ``(n_center, n_offset, n_channels, patch_shape)`` `ndarray
+    patches : ``(n_center, n_offset, n_channels, patch_shape)`` `ndarray` or `list`
         The extracted patches including any offsets if they were requested.
 
     Raises
@@ -148,58 +225,182 @@ def extract_patches_with_slice(
             "Only 2D images are supported but " "found {}".format(pixels.shape)
         )
 
-    n_offsets = offsets.shape[0] if offsets is not None else 1
-    half_r, half_c = (patch_shape[0] / 2, patch_shape[1] / 2)
-    # These are the offsets to the corners of the patches (hence the negative)
-    corners = np.array([[-half_r, -half_c], [half_r, half_c]])
+    patch_shape = (int(patch_shape[0]), int(patch_shape[1]))
     if offsets is None:
         offsets = np.zeros([1, 2])
-
-    patches = np.full(
-        [
-            patch_centers.shape[0],
-            n_offsets,
-            pixels.shape[0],
-            patch_shape[0],
-            patch_shape[1],
-        ],
-        fill_value=cval,
-        dtype=pixels.dtype,
-    )
+    n_centers, n_offsets = patch_centers.shape[0], offsets.shape[0]
     # This is equivalent to nearest neighbour sampling per offset
     half_pixel = (np.array([patch_shape]) % 2) / 2
-    patch_centers = patch_centers + half_pixel
-    bounds = np.round(
-        patch_centers[:, None, None, :] + offsets[:, None, :] + corners
+    half_shape = np.array([patch_shape]) / 2
+    corners = np.round(
+        patch_centers[:, None, :] + half_pixel + offsets[None, :, :] - half_shape
     ).astype(int)
-    # Limit the points to exist inside the image boundaries
-    pixel_bounds = np.clip(bounds, [0, 0], [pixels.shape[1:]])
-    # Then compute the regions inside the patches that need to be filled
-    patch_bounds = pixel_bounds - bounds
-
-    # pixel_bounds will have shape (n_points, n_offsets, 2, 2)
-    # Loop over the patches
-    for i, (pix_off, patch_off) in enumerate(zip(pixel_bounds, patch_bounds)):
-        # Loop over the offsets
-        for j, (pix_b, patch_b) in enumerate(zip(pix_off, patch_off)):
-            pix_slice = (
-                slice(pix_b[0, 0], pix_b[1, 0]),
-                slice(pix_b[0, 1], pix_b[1, 1]),
-            )
-            patch_slice = (
-                slice(patch_b[0, 0], patch_shape[0] + patch_b[1, 0]),
-                slice(patch_b[0, 1], patch_shape[1] + patch_b[1, 1]),
-            )
+    corners = corners.reshape([-1, 2])
+    inside = np.all((corners >= 0) & (corners + patch_shape <= pixels.shape[1:]), 1)
+    windows = _patch_windows(pixels, patch_shape)
 
-            # Set only the pixels that were inside the image bounds
-            patches[i, j, :, patch_slice[0], patch_slice[1]] = pixels[
-                :, pix_slice[0], pix_slice[1]
-            ]
+    if as_views:
+        patches = [None] * corners.shape[0]
+        inside_indices = np.nonzero(inside)[0]
+        for i, (r, c) in zip(inside_indices, corners[inside_indices].tolist()):
+            patches[i] = windows[r, c]
+        if not np.all(inside):
+            boundary = np.nonzero(~inside)[0]
+            copies = _boundary_patches(pixels, corners[boundary], patch_shape, cval)
+            copies.flags.writeable = False
+            for i, patch in zip(boundary, copies):
+                patches[i] = patch
+        return patches
 
-    return patches
+    if np.all(inside):
+        # A single gather of every patch, already in the output layout
+        patches = windows[corners[:, 0], corners[:, 1]]
+    else:
+        patches = np.empty(
+            (corners.shape[0], pixels.shape[0]) + patch_shape, dtype=pixels.dtype
+        )
+        if np.any(inside):
+            patches[inside] = windows[corners[inside, 0], corners[inside, 1]]
+        patches[~inside] = _boundary_patches(
+            pixels, corners[~inside], patch_shape, cval
+        )
+    return patches.reshape((n_centers, n_offsets, pixels.shape[0]) + patch_shape)
 
 
-def set_patches(patches, pixels, patch_centers, offset, offset_index):
+def extract_patches_from_images(
+    images,
+    group=None,
+    patch_shape=(16, 16),
+    sample_offsets=None,
+    order=0,
+    mode="constant",
+    cval=0.0,
+    n_images=None,
+    out=None,
+    n_workers=None,
+    verbose=False,
+):
+    r"""
+    Extract patches around the landmarks of many images, writing them
+    directly into a single ``(n_images, n_center, n_offset, n_channels,
+    patch_shape)`` array, e.g. to build a training set. The patches of each
+    image are extracted as a single array (see :meth:`Image.extract_patches`),
+    so no :map:`Image` is created per patch.
+
+    Parameters
+    ----------
+    images : `list` or :map:`LazyList` or `iterable` of :map:`Image`
+        The images to extract patches from. They must all have the same
+        number of channels and number of landmarks in ``group``.
+    group : `str` or ``None``, optional
+        The landmark group to use as patch centres.
+    patch_shape : `tuple` or `ndarray`, optional
+        The size of the patch to extract
+    sample_offsets : ``(n_offsets, n_dims)`` `ndarray` or ``None``, optional
+        The offsets to sample from within a patch. So ``(0, 0)`` is the
+        centre of the patch (no offset) and ``(1, 0)`` would be sampling the
+        patch from 1 pixel up the first axis away from the centre.
+        If ``None``, then no offsets are applied.
+    order : `int`, optional
+        The order of interpolation. The order has to be in the range [0,5].
+        See warp_to_shape for more information.
+    mode : ``{constant, nearest, reflect, wrap}``, optional
+        Points outside the boundaries of the input are filled according to
+        the given mode.
+    cval : `float`, optional
+        Used in conjunction with mode ``constant``, the value outside the
+        image boundaries.
+    n_images : `int` or ``None``, optional
+        The number of images. Only required if ``images`` is an iterable
+        without a length (e.g. a generator).
+    out : `ndarray` or ``None``, optional
+        The array that the patches are written into (e.g. a writeable
+        :class:`numpy.memmap` for training sets that don't fit in memory).
+        If ``None``, a new array is allocated, with the type of the pixels of
+        the first image.
+    n_workers : `int` or ``None``, optional
+        If greater than ``1``, the images are processed by a pool of this
+        many threads. If ``images`` can be indexed (e.g. a :map:`LazyList`),
+        the images are also loaded by the threads.
+    verbose : `bool`, optional
+        If ``True``, print the progress of the extraction.
+
+    Returns
+    -------
+    patches : ``(n_images, n_center, n_offset, n_channels, patch_shape)`` `ndarray`
+        The patches of every image (``out``, if it was provided).
+
+    Raises
+    ------
+    ValueError
+        If the images do not all have the same number of channels and
+        landmarks, ``out`` does not have the shape of the result, or
+        ``images`` terminates in fewer than ``n_images`` iterations
+    """
+    from menpo.visualize import print_progress
+
+    indexable = isinstance(images, collections_abc.Sequence)
+    if n_images is None:
+        n_images = len(images)
+    if n_images == 0:
+        raise ValueError("At least one image must be provided")
+    if indexable:
+        items = range(n_images)
+    else:
+        items = enumerate(islice(images, n_images))
+
+    def image_patches(item):
+        index, image = (item, images[item]) if indexable else item
+        patches = image.extract_patches(
+            image.landmarks[group],
+            patch_shape=patch_shape,
+            sample_offsets=sample_offsets,
+            order=order,
+            mode=mode,
+            cval=cval,
+        )
+        return index, patches
+
+    def write_patches(item):
+        index, patches = image_patches(item)
+        if patches.shape != result["out"].shape[1:]:
+            raise ValueError(
+                "The patches of image {} have shape {} but the patches of the "
+                "first image have shape {} - all images must have the same "
+                "number of channels and landmarks".format(
+                    index, patches.shape, result["out"].shape[1:]
+                )
+            )
+        result["out"][index] = patches
+        result["count"] += 1
+
+    items = iter(items)
+    if verbose:
+        items = print_progress(
+            items, n_items=n_images, prefix="Extracting patches", end_with_newline=False
+        )
+    # The patches of the first image define the shape and type of the output
+    _, first_patches = image_patches(next(items))
+    out_shape = (n_images,) + first_patches.shape
+    if out is None:
+        out = np.empty(out_shape, dtype=first_patches.dtype)
+    elif out.shape != out_shape:
+        raise ValueError(
+            "The output must have shape {} (not {})".format(out_shape, out.shape)
+        )
+    out[0] = first_patches
+    del first_patches
+    result = {"out": out, "count": 1}
+    _map_in_threads(write_patches, items, n_workers)
+    if result["count"] != n_images:
+        raise ValueError(
+            "Incomplete patches due to early iterator termination (expected "
+            "{} images, got {})".format(n_images, result["count"])
+        )
+    return out
+
+
+def set_patches(patches, pixels, patch_centers, offset, offset_index, mode="replace"):
     r"""
     Set the values of a group of patches into the correct regions of a copy
     of this image. Given an array of patches and a set of patch centers,
@@ -213,6 +414,9 @@ def set_patches(patches, pixels, patch_centers, offset, offset_index):
         1. ``(n_center, n_offset, self.n_channels, patch_shape)`` `ndarray`
         2. `list` of ``n_center * n_offset`` :map:`Image` objects
 
+    All of the patches are scattered into the pixels at once. The parts of
+    the patches that lie outside the pixels are ignored.
+
     Currently only 2D images are supported.
 
     Parameters
@@ -229,26 +433,106 @@ def set_patches(patches, pixels, patch_centers, offset, offset_index):
     offset_index : `int`
         The offset index within the provided `patches` argument, thus the
         index of the second dimension from which to sample.
+    mode : ``{replace, add, average}``, optional
+        How the patches are combined with the pixels. ``replace`` overwrites
+        the pixels (where patches overlap, the last patch is kept), ``add``
+        adds the patches to the pixels and ``average`` replaces every pixel
+        that is covered by at least one patch with the mean of the patches
+        that cover it, so that overlapping patches are blended. On boolean
+        pixels, ``add`` sets the pixels that are set in any patch and
+        ``average`` the pixels that are set in at least half of the patches
+        that cover them.
 
     Raises
     ------
     ValueError
-        If pixels array is not 2D
+        If pixels array is not 2D or the mode is unknown
     """
     if pixels.ndim != 3:
         raise ValueError(
             "Only 2D images are supported but " "found {}".format(pixels.shape)
         )
+    if mode not in {"replace", "add", "average"}:
+        raise ValueError(
+            'Unknown mode "{}", must be one of (replace, add, ' "average)".format(mode)
+        )
 
+    n_channels, height, width = pixels.shape
     patch_shape = patches.shape[-2:]
+    p_h, p_w = patch_shape
     # the [L]ow offset is the floor of half the patch shape
-    l_r, l_c = (int(patch_shape[0] // 2), int(patch_shape[1] // 2))
-    # the [H]igh offset needs to be one pixel larger if the original
-    # patch was odd
-    h_r, h_c = (int(l_r + patch_shape[0] % 2), int(l_c + patch_shape[1] % 2))
-    for patches_with_offsets, point in zip(patches, patch_centers):
-        patch = patches_with_offsets[offset_index]
-        p = point + offset[0]
-        p_r = int(p[0])
-        p_c = int(p[1])
-        pixels[:, p_r - l_r : p_r + h_r, p_c - l_c : p_c + h_c] = patch
+    l_r, l_c = (int(p_h // 2), int(p_w // 2))
+    centers = np.trunc(np.asarray(patch_centers) + offset[0]).astype(np.intp)
+    top = centers[:, 0] - l_r
+    left = centers[:, 1] - l_c
+    values = patches[:, offset_index]
+    # Discard the patches that lie entirely outside of the pixels
+    inside = (top > -p_h) & (top < height) & (left > -p_w) & (left < width)
+    if not inside.all():
+        top, left, values = top[inside], left[inside], values[inside]
+    if top.size == 0:
+        return
+
+    # Patches that cross the boundary are written to a padded canvas, which
+    # is then cropped back to the pixels
+    padded = (
+        top.min() < 0
+        or left.min() < 0
+        or top.max() + p_h > height
+        or left.max() + p_w > width
+    )
+    if padded:
+        canvas_shape = (n_channels, height + 2 * p_h, width + 2 * p_w)
+        crop = (slice(None), slice(p_h, p_h + height), slice(p_w, p_w + width))
+        top = top + p_h
+        left = left + p_w
+    else:
+        canvas_shape = pixels.shape
+        crop = (slice(None),) * 3
+
+    # The flat index into the canvas of every pixel of every patch
+    c_h, c_w = canvas_shape[1:]
+    indices = (
+        (top * c_w + left)[:, None, None]
+        + (np.arange(p_h) * c_w)[:, None]
+        + np.arange(p_w)
+    ).ravel()
+    channel_values = np.moveaxis(values, 1, 0).reshape(n_channels, -1)
+
+    if mode == "replace":
+        if padded or not pixels.flags.c_contiguous:
+            canvas = np.zeros(canvas_shape, dtype=pixels.dtype)
+            canvas[crop] = pixels
+        else:
+            canvas = pixels
+        # Keep only the last write of every index, so that the last of any
+        # overlapping patches is kept (the order in which a fancy assignment
+        # writes repeated indices is not guaranteed)
+        last = indices.size - 1 - np.unique(indices[::-1], return_index=True)[1]
+        canvas.reshape(n_channels, -1)[:, indices[last]] = channel_values[:, last]
+        if canvas is not pixels:
+            pixels[...] = canvas[crop]
+        return
+
+    # Accumulate the patches (and for averaging, how many patches cover each
+    # pixel) in floating point with a bincount, which sums the values of
+    # repeated indices
+    sums = np.array(
+        [np.bincount(indices, weights=v, minlength=c_h * c_w) for v in channel_values]
+    ).reshape(canvas_shape)[crop]
+    if mode == "add":
+        result = pixels + sums
+        covered = True
+    else:
+        counts = np.bincount(indices, minlength=c_h * c_w).reshape(c_h, c_w)
+        counts = counts[crop[1:]]
+        result = sums / np.maximum(counts, 1)
+        covered = counts > 0
+    if pixels.dtype == bool:
+        # A pixel is set if it is set in (on average, at least half of) the
+        # patches that cover it
+        result = result >= 0.5
+    elif not np.issubdtype(pixels.dtype, np.floating):
+        info = np.iinfo(pixels.dtype)
+        result = np.clip(np.round(result), info.min, info.max)
+    np.copyto(pixels, result, casting="unsafe", where=covered)
@@ -0,0 +1,175 @@
+from collections import OrderedDict
+
+try:
+    import collections.abc as collections_abc
+except ImportError:
+    import collections as collections_abc
+
+from menpo.base import LazyList
+
+
+class ImagePyramid(collections_abc.Sequence):
+    r"""
+    A lazily computed, memoized pyramid of an image. Level ``0`` is the
+    original image and every further level is built from the level directly
+    above it, downscaled by ``downscale`` (and optionally smoothed). Levels
+    are only computed when they are first accessed and are then cached, so
+    that accessing the same level again (e.g. in every iteration of a
+    multi-scale fitting) is free. The landmarks of each level are scaled
+    along with the pixels.
+
+    Parameters
+    ----------
+    image : :map:`Image`
+        The image at the base of the pyramid. Note that it is returned as
+        level ``0`` as is, without being copied.
+    n_levels : `int`, optional
+        Total number of levels in the pyramid, including the original image.
+    downscale : `float`, optional
+        Downscale factor between consecutive levels.
+    gaussian : `bool`, optional
+        If ``True``, each level is smoothed with a Gaussian filter of the given
+        ``sigma`` before it is downscaled, giving the same levels as
+        :meth:`Image.gaussian_pyramid`. Otherwise the levels are the same as
+        :meth:`Image.pyramid`.
+    sigma : `float` or ``None``, optional
+        Sigma for the Gaussian filter. Default is ``downscale / 3.``. Only used
+        if ``gaussian`` is ``True``.
+    antialias : `bool`, optional
+        If ``True`` (and ``gaussian`` is ``False``), each level is antialiased
+        when it is downscaled (see :meth:`Image.rescale`).
+    max_bytes : `int` or ``None``, optional
+        The maximum number of bytes of pixel data that is cached across all
+        levels (other than the base image). When the limit is exceeded, the
+        least recently used levels are discarded and will be recomputed if
+        they are accessed again. If ``None``, all levels are cached.
+
+    Raises
+    ------
+    ValueError
+        If ``n_levels`` is less than 1.
+    """
+
+    def __init__(
+        self,
+        image,
+        n_levels=3,
+        downscale=2,
+        gaussian=False,
+        sigma=None,
+        antialias=False,
+        max_bytes=None,
+    ):
+        if n_levels < 1:
+            raise ValueError("A pyramid must have at least one level")
+        if sigma is None:
+            sigma = downscale / 3.0
+        self.image = image
+        self.n_levels = n_levels
+        self.downscale = downscale
+        self.gaussian = gaussian
+        self.sigma = sigma
+        self.antialias = antialias
+        self.max_bytes = max_bytes
+        self._levels = OrderedDict()
+
+    @classmethod
+    def init_from_images(cls, images, **kwargs):
+        r"""
+        Build a pyramid for each of the given images. If the images are a
+        :map:`LazyList` (e.g. the frames of a video), the pyramids are also
+        built lazily, so that each image is only loaded when its pyramid is
+        accessed.
+
+        Parameters
+        ----------
+        images : `list` or :map:`LazyList` of :map:`Image`
+            The images to build pyramids for.
+        kwargs : `dict`, optional
+            Passed through to the constructor of each pyramid.
+
+        Returns
+        -------
+        pyramids : `list` or :map:`LazyList` of :map:`ImagePyramid`
+            A pyramid per image, lazily built if ``images`` is a
+            :map:`LazyList`.
+        """
+
+        def build(image):
+            return cls(image, **kwargs)
+
+        if isinstance(images, LazyList):
+            return images.map(build)
+        return [build(image) for image in images]
+
+    @property
+    def n_cached_bytes(self):
+        r"""
+        The number of bytes of pixel data currently cached by this pyramid
+        (excluding the base image).
+
+        :type: `int`
+        """
+        return sum(level.pixels.nbytes for level in self._levels.values())
+
+    def _downscale_level(self, image):
+        if self.gaussian:
+            from menpo.feature import gaussian_filter
+
+            image = gaussian_filter(image, self.sigma)
+        return image.rescale(1.0 / self.downscale, antialias=self.antialias)
+
+    def _cache_level(self, index, level):
+        if self.max_bytes is not None:
+            if level.pixels.nbytes > self.max_bytes:
+                return
+            while self._levels and (
+                self.n_cached_bytes + level.pixels.nbytes > self.max_bytes
+            ):
+                self._levels.popitem(last=False)
+        self._levels[index] = level
+
+    def _level(self, index):
+        if index == 0:
+            return self.image
+        if index in self._levels:
+            # Mark as the most recently used level
+            level = self._levels.pop(index)
+            self._levels[index] = level
+            return level
+        # Start from the closest level above that is available
+        start = max([i for i in self._levels if i < index] + [0])
+        level = self._level(start)
+        for i in range(start + 1, index + 1):
+            level = self._downscale_level(level)
+            self._cache_level(i, level)
+        return level
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._level(i) for i in range(*index.indices(self.n_levels))]
+        if index < 0:
+            index += self.n_levels
+        if not 0 <= index < self.n_levels:
+            raise IndexError(
+                "Level {} is out of range for a pyramid of {} "
+                "levels".format(index, self.n_levels)
+            )
+        return self._level(index)
+
+    def __len__(self):
+        return self.n_levels
+
+    def clear_cache(self):
+        r"""
+        Discard all of the cached levels.
+        """
+        self._levels.clear()
+
+    def __str__(self):
+        return "{}-level {}pyramid of {} ({} levels cached)".format(
+            self.n_levels,
+            "gaussian " if self.gaussian else "",
+            self.image._str_shape(),
+            len(self._levels),
+        )
@@ -0,0 +1,147 @@
+import numpy as np
+
+from menpo.transform import Homogeneous
+
+from .interpolation import _wrap_coordinates
+
+gaussian_filter1d = None  # expensive, from scipy.ndimage
+
+
+def axis_aligned_scale(transform):
+    r"""
+    If the given transform only scales and translates each axis independently
+    (i.e. it is separable), return the scale and offset along each axis.
+
+    Parameters
+    ----------
+    transform : :map:`Transform`
+        The transform to inspect.
+
+    Returns
+    -------
+    scale_offset : `tuple` of ``(n_dims,)`` `ndarray` or ``None``
+        The scale and offset along each axis, so that every point ``x`` is
+        mapped to ``scale * x + offset``. ``None`` if the transform is not an
+        axis aligned scale.
+    """
+    if not isinstance(transform, Homogeneous):
+        return None
+    h_matrix = transform.h_matrix
+    linear = h_matrix[:-1, :-1]
+    if np.count_nonzero(linear - np.diag(np.diag(linear))) or np.any(
+        h_matrix[-1] != np.eye(h_matrix.shape[0])[-1]
+    ):
+        return None
+    return np.diag(linear).copy(), h_matrix[:-1, -1].copy()
+
+
+def scale_interpolation(
+    pixels, template_shape, scale, offset, mode="constant", order=1, cval=0.0
+):
+    r"""
+    Resample the given pixels onto a grid of ``template_shape``, where each
+    index ``i`` of the grid is sampled at ``scale * i + offset`` in the image.
+    As the sampling locations are separable, the image is resampled along one
+    axis at a time, which is much cheaper than sampling every output pixel
+    independently. The result is identical to sampling the full grid with
+    :func:`scipy_interpolation`. Only nearest neighbour and linear
+    interpolation are supported.
+
+    Parameters
+    ----------
+    pixels : ``(n_channels, M, N, ...)`` `ndarray`
+        The image to be resampled, the first axis containing channel
+        information.
+    template_shape : `tuple`
+        The shape of the resampled image (without channel information).
+    scale : ``(n_dims,)`` `ndarray`
+        The spacing of the samples along each axis of the image.
+    offset : ``(n_dims,)`` `ndarray`
+        The location of the first sample along each axis of the image.
+    mode : ``{constant, nearest, reflect, wrap}``, optional
+        Points outside the boundaries of the input are filled according to the
+        given mode.
+    order : ``{0, 1}``, optional
+        The order of the interpolation.
+    cval : `float`, optional
+        The value that should be used for points that are sampled from
+        outside the image bounds if mode is ``constant``.
+
+    Returns
+    -------
+    resampled_pixels : ``(n_channels,) + template_shape`` `ndarray`
+        The resampled pixels.
+
+    Raises
+    ------
+    ValueError
+        If the order is not 0 or 1.
+    """
+    if order not in {0, 1}:
+        raise ValueError('Unsupported order "{}", must be one of (0, 1)'.format(order))
+    dtype = pixels.dtype
+    if order == 1 and not np.issubdtype(dtype, np.floating):
+        pixels = pixels.astype(np.float64)
+    # Resample the axes that shrink the most first, so that the later passes
+    # have less data to process
+    ratios = [t / float(s) for t, s in zip(template_shape, pixels.shape[1:])]
+    for k in np.argsort(ratios):
+        axis = k + 1
+        length = pixels.shape[axis]
+        x = np.arange(template_shape[k]) * scale[k] + offset[k]
+        outside = (x < 0) | (x > length - 1) if mode == "constant" else None
+        x = _wrap_coordinates(x, length, mode)
+        if order == 0:
+            # Match map_coordinates, which rounds half up
+            pixels = np.take(pixels, np.floor(x + 0.5).astype(np.intp), axis=axis)
+        else:
+            lo = np.minimum(np.floor(x), max(length - 2, 0))
+            weights = (x - lo).reshape([-1] + [1] * (pixels.ndim - axis - 1))
+            lo = lo.astype(np.intp)
+            upper = np.take(pixels, np.minimum(lo + 1, length - 1), axis=axis)
+            pixels = np.take(pixels, lo, axis=axis)
+            upper -= pixels
+            upper *= weights
+            pixels += upper
+        if outside is not None and outside.any():
+            index = [slice(None)] * pixels.ndim
+            index[axis] = outside
+            pixels[tuple(index)] = cval
+    if pixels.dtype != dtype:
+        if np.issubdtype(dtype, np.integer):
+            # map_coordinates rounds half up when the output is integral
+            pixels += 0.5
+            np.floor(pixels, out=pixels)
+        pixels = pixels.astype(dtype)
+    return pixels
+
+
+def antialias_pixels(pixels, scale):
+    r"""
+    Smooth the given pixels with a Gaussian before they are downscaled, in
+    order to avoid aliasing. Each axis is filtered separately with a standard
+    deviation of ``(1 / scale - 1) / 2``, so axes that are not downscaled are
+    left untouched.
+
+    Parameters
+    ----------
+    pixels : ``(n_channels, M, N, ...)`` `ndarray`
+        The image to be smoothed, the first axis containing channel
+        information.
+    scale : ``(n_dims,)`` `ndarray`
+        The scale factor that will be applied along each axis.
+
+    Returns
+    -------
+    smoothed_pixels : ``(n_channels, M, N, ...)`` `ndarray`
+        The smoothed pixels. If no axis is downscaled, ``pixels`` is returned
+        unmodified.
+    """
+    global gaussian_filter1d
+    if gaussian_filter1d is None:
+        from scipy.ndimage import gaussian_filter1d  # expensive
+    sigmas = np.maximum(0, (1.0 / np.asarray(scale, dtype=float) - 1) / 2)
+    for k, sigma in enumerate(sigmas):
+        if sigma > 0:
+            pixels = gaussian_filter1d(pixels, sigma, axis=k + 1, mode="nearest")
+    return pixels
@@ -1,7 +1,12 @@
 import numpy as np
-from numpy.testing import assert_allclose
+from numpy.testing import assert_allclose, assert_equal
 from menpo.image import BooleanImage
-from menpo.shape import PointCloud
+from menpo.image.boolean import (
+    convex_hull_point_in_pointcloud,
+    pwa_point_in_pointcloud,
+    rasterize_triangles,
+)
+from menpo.shape import PointCloud, TriMesh
 
 
 def test_boolean_image_constrain_landmarks():
@@ -48,3 +53,41 @@ def test_boolean_image_init_from_pointcloud_constrain_all_true():
     im = BooleanImage.init_from_pointcloud(pc, fill=True, constrain=True)
     assert im.n_true() == 120
     assert im.shape == (15, 15)
+
+
+def test_rasterize_triangles_matches_pwa():
+    rs = np.random.RandomState(0)
+    indices = np.indices((30, 40)).reshape([2, -1]).T
+    for points in [
+        rs.randint(-5, 45, (8, 2)).astype(float),
+        rs.rand(8, 2) * 50 - 5,
+        np.round(rs.rand(8, 2) * 80) / 2,
+    ]:
+        trimesh = TriMesh(points)
+        expected = pwa_point_in_pointcloud(trimesh, indices).reshape((30, 40))
+        mask = rasterize_triangles((30, 40), trimesh.points, trimesh.trilist)
+        assert_equal(mask, expected)
+
+
+def test_rasterize_polygon_matches_convex_hull():
+    rs = np.random.RandomState(1)
+    indices = np.indices((30, 40)).reshape([2, -1]).T
+    for points in [
+        rs.randint(-5, 45, (8, 2)).astype(float),
+        rs.rand(8, 2) * 50 - 5,
+        np.round(rs.rand(8, 2) * 80) / 2,
+    ]:
+        pc = PointCloud(points)
+        expected = convex_hull_point_in_pointcloud(pc, indices).reshape((30, 40))
+        mask = BooleanImage.init_blank((30, 40)).constrain_to_pointcloud(
+            pc, point_in_pointcloud="convex_hull"
+        )
+        assert_equal(mask.mask, expected)
+
+
+def test_boolean_image_constrain_pointcloud_outside_image():
+    mask = BooleanImage.init_blank((10, 10))
+    pc = PointCloud(np.array([[-5, -5], [15, -5], [15, 15], [-5, 15]]))
+    assert mask.constrain_to_pointcloud(pc).all_true()
+    pc = PointCloud(np.array([[20, 20], [30, 20], [30, 30]]))
+    assert mask.constrain_to_pointcloud(pc).n_true() == 0
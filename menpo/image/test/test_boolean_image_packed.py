@@ -0,0 +1,84 @@
+import pickle
+
+import numpy as np
+import pytest
+from numpy.testing import assert_equal
+
+from menpo.image import BooleanImage, MaskedImage
+
+
+@pytest.fixture(params=[(13, 21), (16, 8), (7, 9, 11)])
+def mask(request):
+    rs = np.random.RandomState(0)
+    pixels = rs.rand(*request.param) > 0.6
+    # Make sure the edges are exercised
+    pixels[..., -1] = True
+    return BooleanImage(pixels)
+
+
+def test_as_packed(mask):
+    packed = mask.as_packed()
+    assert packed.is_packed
+    assert packed.shape == mask.shape
+    assert packed.n_pixels == mask.n_pixels
+    assert packed.__dict__["_packed_pixels"].nbytes < mask.pixels.nbytes / 4
+
+
+def test_packed_n_true(mask):
+    packed = mask.as_packed()
+    assert packed.n_true() == mask.n_true()
+    assert packed.n_false() == mask.n_false()
+    assert not packed.all_true()
+    assert BooleanImage.init_blank((5, 11)).as_packed().all_true()
+    assert packed.is_packed
+
+
+def test_packed_indices(mask):
+    packed = mask.as_packed()
+    assert_equal(packed.true_indices(), mask.true_indices())
+    assert_equal(packed.false_indices(), mask.false_indices())
+    assert_equal(packed.bounds_true(), mask.bounds_true())
+    assert_equal(packed.bounds_false(), mask.bounds_false())
+    assert packed.is_packed
+
+
+def test_packed_invert(mask):
+    inverse = mask.as_packed().invert()
+    assert inverse.is_packed
+    assert_equal(inverse.pixels, mask.invert().pixels)
+
+
+@pytest.mark.parametrize("n_pixels", [1, 2])
+def test_packed_erode_dilate(mask, n_pixels):
+    packed = mask.as_packed()
+    eroded = packed.erode(n_pixels)
+    dilated = packed.dilate(n_pixels)
+    assert eroded.is_packed and dilated.is_packed
+    assert_equal(eroded.pixels, mask.erode(n_pixels).pixels)
+    assert_equal(dilated.pixels, mask.dilate(n_pixels).pixels)
+
+
+def test_packed_unpacks_on_pixel_access(mask):
+    packed = mask.as_packed()
+    assert_equal(packed.mask, mask.mask)
+    assert not packed.is_packed
+    packed.pixels.flat[0] = True
+    assert packed.n_true() == mask.n_true() + (not mask.pixels.flat[0])
+
+
+def test_packed_copy_and_pickle(mask):
+    packed = mask.as_packed()
+    for restored in [packed.copy(), pickle.loads(pickle.dumps(packed))]:
+        assert restored.is_packed
+        assert_equal(restored.pixels, mask.pixels)
+
+
+def test_masked_image_with_packed_mask():
+    mask = BooleanImage(np.random.RandomState(1).rand(10, 13) > 0.5)
+    image = MaskedImage(np.random.RandomState(2).rand(2, 10, 13), mask=mask)
+    packed_image = MaskedImage(image.pixels, mask=mask.as_packed())
+    assert_equal(packed_image.as_vector(), image.as_vector())
+    new_image = packed_image.from_vector(image.as_vector())
+    assert packed_image.mask.is_packed
+    assert_equal(new_image.pixels, image.from_vector(image.as_vector()).pixels)
+    assert packed_image.erode().mask.is_packed
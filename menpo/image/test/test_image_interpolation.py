@@ -0,0 +1,179 @@
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+from pytest import raises
+
+import menpo.io as mio
+from menpo.image import (
+    register_interpolation_backend,
+    set_default_interpolation_backend,
+    SplineCoefficients,
+)
+from menpo.image import interpolation
+from menpo.image.interpolation import (
+    interpolate,
+    numpy_interpolation,
+    scipy_interpolation,
+)
+from menpo.shape import PointCloud
+from menpo.transform import Affine, ThinPlateSplines
+
+
+@pytest.fixture()
+def restore_backends():
+    backends = dict(interpolation._INTERPOLATION_BACKENDS)
+    default = interpolation._default_interpolation_backend
+    yield
+    interpolation._INTERPOLATION_BACKENDS.clear()
+    interpolation._INTERPOLATION_BACKENDS.update(backends)
+    interpolation._default_interpolation_backend = default
+
+
+@pytest.mark.parametrize("order", [0, 1, 2, 3])
+def test_numpy_interpolation_matches_scipy(order):
+    pixels = np.random.RandomState(0).rand(3, 48, 64)
+    points = np.random.RandomState(1).uniform(-5, 70, size=(1000, 2))
+    assert_allclose(
+        numpy_interpolation(pixels, points, order=order),
+        scipy_interpolation(pixels, points, order=order),
+    )
+
+
+def test_numpy_interpolation_produces_no_nans():
+    pixels = np.random.RandomState(0).rand(1, 10, 10)
+    points = np.array([[-100.0, 4.0], [4.5, 1e10], [5.5, 5.5]])
+    assert not np.any(np.isnan(numpy_interpolation(pixels, points)))
+
+
+def test_image_sample_backend():
+    image = mio.import_builtin_asset("takeo.ppm")
+    points = image.landmarks["PTS"].points
+    assert_allclose(
+        image.sample(points, backend="numpy"), image.sample(points, backend="scipy")
+    )
+
+
+def test_interpolate_unknown_backend():
+    with raises(ValueError):
+        interpolate(np.zeros([1, 3, 3]), np.zeros([1, 2]), backend="foo")
+
+
+@pytest.mark.usefixtures("restore_backends")
+def test_set_default_interpolation_backend():
+    calls = []
+
+    def foo_interpolation(pixels, points_to_sample, **kwargs):
+        calls.append(kwargs)
+        return np.zeros([pixels.shape[0], points_to_sample.shape[0]])
+
+    register_interpolation_backend("foo", foo_interpolation)
+    set_default_interpolation_backend("foo")
+    image = mio.import_builtin_asset("takeo.ppm")
+    sampled = image.sample(np.array([[1.0, 2.0]]), order=3)
+    assert sampled.shape == (3, 1)
+    assert calls == [{"mode": "constant", "order": 3, "cval": 0.0}]
+
+
+@pytest.mark.usefixtures("restore_backends")
+def test_default_interpolation_backend_used_by_masked_image_warp():
+    calls = []
+
+    def foo_interpolation(pixels, points_to_sample, **kwargs):
+        calls.append(kwargs)
+        return scipy_interpolation(pixels, points_to_sample, **kwargs)
+
+    register_interpolation_backend("foo", foo_interpolation)
+    image = mio.import_builtin_asset("breakingbad.jpg").as_masked().rescale(0.5)
+    source = image.landmarks[None]
+    target = PointCloud(source.points + 1.5)
+    transform = ThinPlateSplines(target, source)
+    shape = image.shape
+    expected = image.warp_to_shape(shape, transform, warp_landmarks=False)
+    set_default_interpolation_backend("foo")
+    warped = image.warp_to_shape(shape, transform, warp_landmarks=False)
+    # both the pixels and the mask are sampled through the backend
+    assert len(calls) == 2
+    assert_allclose(warped.pixels, expected.pixels)
+    assert_allclose(warped.mask.pixels, expected.mask.pixels)
+
+
+@pytest.mark.usefixtures("restore_backends")
+def test_set_default_interpolation_backend_unknown():
+    with raises(ValueError):
+        set_default_interpolation_backend("foo")
+
+
+@pytest.mark.usefixtures("restore_backends")
+def test_register_interpolation_backend_replace_warns():
+    with pytest.warns(UserWarning):
+        register_interpolation_backend("scipy", scipy_interpolation)
+
+
+@pytest.mark.parametrize("mode", ["constant", "nearest", "reflect", "wrap"])
+@pytest.mark.parametrize("order", [2, 3, 5])
+def test_spline_coefficients_match_scipy(order, mode):
+    pixels = np.random.RandomState(0).rand(2, 20, 30)
+    points = np.random.RandomState(1).uniform(-15, 45, size=(1000, 2))
+    coefficients = SplineCoefficients(pixels, order=order, mode=mode)
+    assert_allclose(
+        coefficients.sample(points, cval=0.3),
+        scipy_interpolation(pixels, points, order=order, mode=mode, cval=0.3),
+    )
+
+
+def test_spline_coefficients_unsupported_order():
+    with raises(ValueError):
+        SplineCoefficients(np.zeros([1, 5, 5]), order=1)
+
+
+def test_image_cached_spline_coefficients_reused():
+    image = mio.import_builtin_asset("takeo.ppm")
+    points = np.random.RandomState(0).uniform(0, 100, size=(50, 2))
+    expected = image.sample(points, order=3)
+    image.cache_spline_coefficients()
+    assert_allclose(image.sample(points, order=3), expected)
+    coefficients = image._spline_coefficients[(3, "constant")]
+    image.sample(points, order=3)
+    assert image._spline_coefficients[(3, "constant")] is coefficients
+
+
+def test_image_cached_spline_coefficients_not_used_for_low_orders():
+    image = mio.import_builtin_asset("takeo.ppm")
+    image.cache_spline_coefficients()
+    image.sample(np.array([[10.5, 20.5]]), order=1)
+    assert len(image._spline_coefficients) == 0
+
+
+def test_image_cached_spline_coefficients_invalidated():
+    image = mio.import_builtin_asset("takeo.ppm")
+    image.cache_spline_coefficients()
+    points = np.array([[10.5, 20.5], [100.25, 3.75]])
+    image.sample(points, order=3)
+    image.pixels[:, :50] = 0.5
+    assert_allclose(
+        image.sample(points, order=3),
+        scipy_interpolation(image.pixels, points, order=3),
+    )
+
+
+def test_image_cache_spline_coefficients_disable():
+    image = mio.import_builtin_asset("takeo.ppm")
+    image.cache_spline_coefficients()
+    image.sample(np.array([[10.5, 20.5]]), order=3)
+    image.cache_spline_coefficients(False)
+    assert image._cached_spline_coefficients(3, "constant") is None
+
+
+def test_image_cached_spline_coefficients_warp_and_patches():
+    image = mio.import_builtin_asset("takeo.ppm").as_greyscale()
+    cached = image.copy()
+    cached.cache_spline_coefficients()
+    transform = Affine.init_from_2d_shear(10, 5)
+    assert_allclose(
+        cached.warp_to_shape((40, 50), transform, order=3).pixels,
+        image.warp_to_shape((40, 50), transform, order=3).pixels,
+    )
+    assert_allclose(
+        cached.extract_patches(image.landmarks["PTS"], order=3),
+        image.extract_patches(image.landmarks["PTS"], order=3),
+    )
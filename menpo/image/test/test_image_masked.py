@@ -165,3 +165,112 @@ def test_init_from_rolled_channels_masked():
     assert im.height == 50
     assert im.width == 60
     assert im.mask.n_true() == 36
+
+
+def test_true_indices_cache_invalidated_in_place():
+    mask = BooleanImage.init_blank((6, 7), fill=False)
+    mask.pixels[0, 1:3, 2:5] = True
+    assert_allclose(mask.true_flat_indices(), [9, 10, 11, 16, 17, 18])
+    assert_allclose(mask.bounds_true()[1], [2, 4])
+    mask.pixels[0, 4, 6] = True
+    assert mask.n_true() == 7
+    assert_allclose(mask.true_indices()[-1], [4, 6])
+    assert_allclose(mask.bounds_true()[1], [4, 6])
+    mask.pixels = np.zeros_like(mask.pixels)
+    assert mask.true_flat_indices().size == 0
+
+
+def test_true_indices_cache_invalidated_through_mask():
+    mask = BooleanImage.init_blank((6, 7), fill=False)
+    mask.mask[1, 2] = True
+    assert_allclose(mask.true_flat_indices(), [9])
+    mask.mask[2, 3] = True
+    assert_allclose(mask.true_flat_indices(), [9, 17])
+
+
+def test_true_indices_cache_checked_after_pixels_handed_out():
+    image = _partially_masked_image()
+    mask_pixels = image.mask.mask
+    assert image.as_vector().size == 3 * 36
+    bounds = image.mask.bounds_true()
+    # modified through an array that was taken before the cache was built
+    mask_pixels[2:4] = False
+    assert image.mask.n_true() == 24
+    assert image.mask.true_flat_indices().size == 24
+    assert image.as_vector().size == 3 * 24
+    assert_allclose(image.mask.bounds_true()[0], [4, 3])
+    assert_allclose(bounds[0], [2, 3])
+
+
+def test_true_indices_cache_kept_by_queries():
+    mask = BooleanImage.init_blank((6, 7))
+    indices = mask.true_flat_indices()
+    assert mask.all_true()
+    assert mask.n_true() == 42
+    mask.bounds_true()
+    assert mask.true_flat_indices() is indices
+    # no copy of the pixels is kept to detect changes
+    assert "snapshot" not in mask.__dict__["_cached_true"]
+
+
+def test_true_indices_returns_copy():
+    mask = BooleanImage.init_blank((4, 4))
+    mask.true_indices()[:] = -1
+    assert_allclose(mask.true_indices().min(), 0)
+
+
+def _partially_masked_image():
+    mask = BooleanImage.init_blank((10, 12), fill=False)
+    mask.pixels[0, 2:8, 3:9] = True
+    pixels = np.random.RandomState(0).rand(3, 10, 12)
+    return MaskedImage(pixels, mask=mask)
+
+
+def test_as_compact():
+    image = _partially_masked_image()
+    compact = image.as_compact()
+    assert compact.is_compact
+    assert compact.mask is image.mask
+    assert compact.shape == (10, 12)
+    assert compact.n_channels == 3
+    assert compact.n_elements == 360
+    assert_allclose(compact.as_vector(), image.as_vector())
+    # Vectorisation is zero-copy
+    vector = compact.as_vector()
+    assert np.may_share_memory(vector, compact.masked_pixels())
+    new_compact = compact.from_vector(vector * 2)
+    assert new_compact.is_compact
+    assert_allclose(new_compact.as_vector(), image.as_vector() * 2)
+
+
+def test_compact_expands_on_pixel_access():
+    image = _partially_masked_image()
+    compact = image.as_compact()
+    expected = image.pixels * image.mask.mask
+    assert_allclose(compact.pixels, expected)
+    assert not compact.is_compact
+
+
+def test_compact_from_vector_inplace():
+    image = _partially_masked_image()
+    compact = image.as_compact()
+    compact._from_vector_inplace(np.ones(compact.n_true_elements()))
+    assert compact.is_compact
+    assert_allclose(compact.masked_pixels(), 1)
+
+
+def test_compact_mask_modified_raises():
+    image = _partially_masked_image()
+    compact = image.as_compact()
+    compact.mask.pixels[0, 0, 0] = True
+    with raises(ValueError):
+        compact.pixels
+
+
+def test_compact_copy():
+    image = _partially_masked_image()
+    image.landmarks["a"] = PointCloud(np.ones((2, 2)))
+    compact = image.as_compact().copy()
+    assert compact.is_compact
+    assert compact.landmarks["a"].n_points == 2
+    assert_allclose(compact.as_vector(), image.as_vector())
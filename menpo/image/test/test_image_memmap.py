@@ -0,0 +1,119 @@
+import pickle
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose, assert_equal
+
+from menpo.image import Image, MaskedImage
+from menpo.transform import Translation
+
+
+@pytest.fixture()
+def pixels():
+    return np.random.RandomState(0).randint(0, 255, size=(3, 40, 50)).astype(np.uint8)
+
+
+@pytest.fixture()
+def pixels_path(tmpdir, pixels):
+    path = str(tmpdir.join("pixels.bin"))
+    # Write a header to check the offset is respected
+    with open(path, "wb") as f:
+        f.write(b"\x01" * 16)
+        f.write(pixels.tobytes())
+    return path
+
+
+@pytest.fixture()
+def image(pixels_path, pixels):
+    return Image.init_from_memmap(pixels_path, pixels.shape, offset=16)
+
+
+def test_init_from_memmap(image, pixels):
+    assert isinstance(image.pixels, np.memmap)
+    assert not image.pixels.flags.writeable
+    assert image.shape == (40, 50)
+    assert_equal(image.pixels, pixels)
+
+
+def test_init_from_memmap_2d(pixels_path, pixels):
+    image = Image.init_from_memmap(pixels_path, (40, 50), offset=16)
+    assert image.n_channels == 1
+    assert isinstance(image.pixels, np.memmap)
+    assert_equal(image.pixels[0], pixels[0])
+
+
+def test_memmap_image_copy_is_copy_on_write(image, pixels, pixels_path):
+    copied = image.copy()
+    assert isinstance(copied.pixels, np.memmap)
+    assert copied.pixels.flags.writeable
+    copied.pixels[:] = 0
+    assert_equal(image.pixels, pixels)
+    assert_equal(
+        Image.init_from_memmap(pixels_path, pixels.shape, offset=16).pixels, pixels
+    )
+
+
+def test_memmap_image_contiguous_crop(image, pixels):
+    cropped = image.crop((10, 0), (20, 50))
+    assert isinstance(cropped.pixels, np.memmap)
+    assert_equal(cropped.pixels, pixels[:, 10:20])
+
+
+def test_memmap_image_crop_is_copy_on_write(image, pixels, pixels_path):
+    cropped = image.crop((10, 0), (20, 50))
+    assert cropped.pixels.flags.writeable
+    cropped.pixels[:] = 0
+    assert_equal(image.pixels, pixels)
+    assert_equal(
+        Image.init_from_memmap(pixels_path, pixels.shape, offset=16).pixels, pixels
+    )
+
+
+def test_memmap_image_integer_translation_warp_writeable(image, pixels):
+    warped = image.warp_to_shape((20, 30), Translation([5, 10]), order=1)
+    assert warped.pixels.flags.writeable
+    warped.pixels[0, 0, 0] = 0
+    assert_equal(image.pixels, pixels)
+
+
+def test_memmap_image_crop(image, pixels):
+    cropped = image.crop((10, 5), (20, 25))
+    assert_equal(cropped.pixels, pixels[:, 10:20, 5:25])
+
+
+def test_memmap_image_pickle(image, pixels):
+    data = pickle.dumps(image)
+    assert len(data) < pixels.nbytes
+    unpickled = pickle.loads(data)
+    assert isinstance(unpickled.pixels, np.memmap)
+    assert_equal(unpickled.pixels, pixels)
+
+
+def test_memmap_image_pickle_of_cropped(image, pixels):
+    cropped = image.crop((10, 0), (20, 50))
+    cropped.pixels[0, 0, 0] = 0
+    expected = pixels[:, 10:20].copy()
+    expected[0, 0, 0] = 0
+    # the crop may have been modified, so its pixels are stored
+    assert_equal(pickle.loads(pickle.dumps(cropped)).pixels, expected)
+
+
+def test_memmap_image_operations(image, pixels):
+    assert_allclose(image.rescale(0.5).pixels, Image(pixels).rescale(0.5).pixels)
+    assert_allclose(image.as_greyscale().pixels, Image(pixels).as_greyscale().pixels)
+
+
+def test_masked_image_init_from_memmap(pixels_path, pixels):
+    mask = np.zeros((40, 50), dtype=bool)
+    mask[5:30, 10:40] = True
+    image = MaskedImage.init_from_memmap(
+        pixels_path, pixels.shape, offset=16, mask=mask
+    )
+    assert isinstance(image.pixels, np.memmap)
+    assert image.mask.n_true() == mask.sum()
+    copied = image.copy()
+    assert isinstance(copied.pixels, np.memmap)
+    assert_equal(copied.mask.mask, mask)
+    unpickled = pickle.loads(pickle.dumps(image))
+    assert isinstance(unpickled.pixels, np.memmap)
+    assert_equal(unpickled.mask.mask, mask)
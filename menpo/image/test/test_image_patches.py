@@ -3,12 +3,18 @@ import pytest
 from numpy.testing import assert_array_equal, assert_allclose
 
 import menpo.io as mio
+from menpo.base import LazyList
+from menpo.image import extract_patches_from_images
 from menpo.image.base import (
     Image,
     _convert_patches_list_to_single_array,
     _create_patches_image,
 )
-from menpo.image.patches import extract_patches_with_slice, extract_patches_by_sampling
+from menpo.image.patches import (
+    extract_patches_with_slice,
+    extract_patches_by_sampling,
+    set_patches,
+)
 from menpo.shape import PointCloud
 
 
@@ -213,6 +219,111 @@ def test_slicing_equals_sampling(patch_shape):
     assert_allclose(sliced_patches[-1, 0, 0, 0, 0], -100)
 
 
+@pytest.mark.parametrize("patch_shape", [(15, 13), (16, 12), (120, 5)], ids=str)
+@pytest.mark.parametrize("dtype", [np.float64, np.uint8], ids=str)
+def test_slicing_equals_sampling_random_boundary(patch_shape, dtype):
+    pixels = (np.random.RandomState(0).rand(3, 100, 80) * 255).astype(dtype)
+    points = np.random.RandomState(1).randint(-20, 120, size=(50, 2)).astype(float)
+    sample_offsets = np.array([[0, 0], [-3, 2], [1, 1]])
+    sliced_patches = extract_patches_with_slice(
+        pixels, points, patch_shape, sample_offsets, cval=7
+    )
+    sampled_patches = extract_patches_by_sampling(
+        pixels, points, patch_shape, sample_offsets, order=0, cval=7
+    )
+    assert sliced_patches.dtype == dtype
+    assert_array_equal(sliced_patches, sampled_patches)
+
+
+def test_slicing_as_views():
+    image = mio.import_builtin_asset("breakingbad.jpg")
+    sample_offsets = np.array([[0, 0], [1, 0]])
+    points = np.concatenate([image.landmarks["PTS"].points, [[0, 0]]])
+    patches = extract_patches_with_slice(
+        image.pixels, points, (15, 13), sample_offsets, cval=-100
+    )
+    views = extract_patches_with_slice(
+        image.pixels, points, (15, 13), sample_offsets, cval=-100, as_views=True
+    )
+    assert len(views) == points.shape[0] * 2
+    for view, patch in zip(views, patches.reshape((-1,) + patches.shape[2:])):
+        assert not view.flags.writeable
+        assert_array_equal(view, patch)
+    # Only the patches that lie outside the image are copied
+    assert all(np.shares_memory(v, image.pixels) for v in views[:-2])
+    assert not np.shares_memory(views[-1], image.pixels)
+
+
+def test_extract_patches_around_landmarks_as_views():
+    image = mio.import_builtin_asset("breakingbad.jpg")
+    patches = image.extract_patches_around_landmarks(patch_shape=(8, 8))
+    views = image.extract_patches_around_landmarks(patch_shape=(8, 8), as_views=True)
+    assert len(views) == 68
+    assert_array_equal(np.array(views), patches[:, 0])
+
+
+def test_extract_patches_as_views_with_sampling_raises():
+    image = mio.import_builtin_asset("breakingbad.jpg")
+    with pytest.raises(ValueError):
+        image.extract_patches(image.landmarks["PTS"], order=1, as_views=True)
+
+
+@pytest.fixture()
+def patch_images():
+    image = mio.import_builtin_asset("breakingbad.jpg")
+    return [image, image.rescale(0.8), image.as_greyscale().as_masked()]
+
+
+@pytest.mark.parametrize("n_workers", [None, 2])
+def test_extract_patches_from_images(patch_images, n_workers):
+    images = patch_images[:2]
+    sample_offsets = np.array([[0, 0], [1, -2]])
+    patches = extract_patches_from_images(
+        images, patch_shape=(9, 8), sample_offsets=sample_offsets, n_workers=n_workers
+    )
+    assert patches.shape == (2, 68, 2, 3, 9, 8)
+    for p, image in zip(patches, images):
+        expected = image.extract_patches_around_landmarks(
+            patch_shape=(9, 8), sample_offsets=sample_offsets
+        )
+        assert_array_equal(p, expected)
+
+
+def test_extract_patches_from_images_lazy_sampling(patch_images):
+    images = LazyList.init_from_iterable(patch_images[:2])
+    patches = extract_patches_from_images(images, order=1, mode="nearest", n_workers=2)
+    expected = patch_images[1].extract_patches(
+        patch_images[1].landmarks["PTS"], order=1, mode="nearest"
+    )
+    assert_allclose(patches[1], expected)
+
+
+def test_extract_patches_from_images_generator_out(patch_images):
+    out = np.empty((2, 68, 1, 3, 16, 16), dtype=np.float32)
+    patches = extract_patches_from_images(
+        (i for i in patch_images[:2]), n_images=2, out=out
+    )
+    assert patches is out
+    assert_allclose(
+        out[0], patch_images[0].extract_patches_around_landmarks(), rtol=1e-6
+    )
+
+
+def test_extract_patches_from_images_generator_too_short(patch_images):
+    with pytest.raises(ValueError):
+        extract_patches_from_images((i for i in patch_images[:2]), n_images=3)
+
+
+def test_extract_patches_from_images_channel_mismatch(patch_images):
+    with pytest.raises(ValueError):
+        extract_patches_from_images(patch_images)
+
+
+def test_extract_patches_from_images_out_shape(patch_images):
+    with pytest.raises(ValueError):
+        extract_patches_from_images(patch_images[:2], out=np.empty((2, 68, 1, 3)))
+
+
 #######################
 # SET PATCHES TESTS
 #######################
@@ -265,6 +376,90 @@ def test_offset_argument():
         assert_array_equal(image.pixels[:, 48:53, 38:44], patch[1, 0, ...])
 
 
+def test_set_patches_overlap_replace_keeps_last():
+    pixels = np.zeros((2, 10, 10))
+    patches = np.stack([np.full((1, 2, 4, 4), v) for v in [1.0, 2.0]])
+    set_patches(patches, pixels, np.array([[4.0, 4.0], [5.0, 5.0]]), [[0, 0]], 0)
+    assert_array_equal(pixels[:, 2:6, 2:6][:, :1], 1)
+    assert_array_equal(pixels[:, 3:7, 3:7], 2)
+
+
+def test_set_patches_add_and_average():
+    pixels = np.full((1, 10, 10), 5.0)
+    patches = np.stack([np.full((1, 1, 4, 4), v) for v in [1.0, 3.0]])
+    centers = np.array([[4.0, 4.0], [5.0, 5.0]])
+    added = pixels.copy()
+    set_patches(patches, added, centers, [[0, 0]], 0, mode="add")
+    assert added.sum() == 500 + 16 * 4
+    assert added[0, 4, 4] == 9
+    assert added[0, 2, 2] == 6
+    averaged = pixels.copy()
+    set_patches(patches, averaged, centers, [[0, 0]], 0, mode="average")
+    assert averaged[0, 4, 4] == 2
+    assert averaged[0, 2, 2] == 1
+    assert averaged[0, 6, 6] == 3
+    assert averaged[0, 0, 0] == 5
+
+
+def test_set_patches_average_reconstructs_image():
+    image = mio.import_builtin_asset("breakingbad.jpg").resize((60, 50))
+    centers = PointCloud(np.indices((60, 50)).reshape([2, -1]).T[::7])
+    patches = image.extract_patches(centers, patch_shape=(9, 9))
+    blank = Image.init_blank(image.shape, n_channels=image.n_channels)
+    reconstructed = blank.set_patches(patches, centers, mode="average")
+    assert_allclose(reconstructed.pixels, image.pixels)
+
+
+def test_set_patches_outside_image_clipped():
+    pixels = np.zeros((1, 10, 10), dtype=np.uint8)
+    patches = np.full((1, 1, 1, 6, 6), 3, dtype=np.uint8)
+    set_patches(patches, pixels, np.array([[1.0, 9.0]]), [[0, 0]], 0, mode="add")
+    expected = np.zeros((10, 10), dtype=np.uint8)
+    expected[:4, 6:] = 3
+    assert_array_equal(pixels[0], expected)
+
+
+def test_set_patches_bool_add_and_average():
+    pixels = np.zeros((1, 10, 10), dtype=bool)
+    patches = np.zeros((4, 1, 1, 4, 4), dtype=bool)
+    patches[:2] = True
+    centers = np.array([[4.0, 4.0], [5.0, 5.0], [6.0, 6.0], [6.0, 6.0]])
+    added = pixels.copy()
+    set_patches(patches, added, centers, [[0, 0]], 0, mode="add")
+    assert added.dtype == bool
+    assert added.sum() == 16 + 7
+    averaged = pixels.copy()
+    set_patches(patches, averaged, centers, [[0, 0]], 0, mode="average")
+    assert averaged.dtype == bool
+    assert averaged[0, 2, 2]
+    # covered by two set and two unset patches
+    assert averaged[0, 5, 5]
+    # covered by one set and two unset patches
+    assert not averaged[0, 6, 6]
+    assert not averaged[0, 7, 7]
+
+
+def test_set_patches_replace_non_contiguous():
+    pixels = np.zeros((10, 10, 2)).transpose(2, 0, 1)
+    patches = np.stack([np.full((1, 2, 4, 4), v) for v in [1.0, 2.0]])
+    set_patches(patches, pixels, np.array([[4.0, 4.0], [5.0, 5.0]]), [[0, 0]], 0)
+    assert_array_equal(pixels[:, 2, 2:6], 1)
+    assert_array_equal(pixels[:, 3:7, 3:7], 2)
+    assert pixels.sum() == 2 * (16 * 2 + 7)
+
+
+def test_set_patches_unknown_mode():
+    with pytest.raises(ValueError):
+        set_patches(
+            np.zeros((1, 1, 1, 2, 2)),
+            np.zeros((1, 5, 5)),
+            np.ones((1, 2)),
+            [[0, 0]],
+            0,
+            mode="max",
+        )
+
+
 def test_convert_patches_list_to_single_array():
     patch_shape = (7, 2)
     n_channels = 10
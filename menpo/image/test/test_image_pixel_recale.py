@@ -1,3 +1,5 @@
+import warnings
+
 from menpo.image import Image, MaskedImage
 import numpy as np
 
@@ -48,3 +50,69 @@ def test_rescale_pixels_only_masked():
     assert img_rescaled.pixels[0, 0, 0] == 0
     assert img_rescaled.pixels[0, 1, 1] == 100
     assert np.all(img_rescaled.mask.pixels == img.mask.pixels)
+
+
+def test_rescale_pixels_inplace():
+    img = Image.init_blank((10, 10), n_channels=2)
+    img.pixels[0, 6:, 6:] = 2
+    img.pixels[1, 6:, 6:] = 4
+    expected = img.rescale_pixels(0, 100, per_channel=False)
+    pixels = img.pixels
+
+    assert img.rescale_pixels(0, 100, per_channel=False, inplace=True) is img
+    assert img.pixels is pixels
+    assert np.all(img.pixels == expected.pixels)
+
+
+def test_rescale_pixels_inplace_only_masked():
+    img = MaskedImage.init_blank((10, 10), n_channels=1, fill=1)
+    img.pixels[0, 0, 0] = 0
+    img.pixels[0, 6:, 6:] = 2
+    img.mask.pixels[:, 6:, 6:] = False
+
+    img.rescale_pixels(0, 100, inplace=True)
+    assert img.pixels[0, 0, 0] == 0
+    assert img.pixels[0, 1, 1] == 100
+    assert np.all(img.pixels[0, 6:, 6:] == 2)
+
+
+def test_rescale_pixels_inplace_uint8():
+    img = Image(np.arange(100, dtype=np.uint8).reshape(10, 10))
+
+    img.rescale_pixels(0, 1, inplace=True)
+    assert img.pixels.dtype == np.float64
+    assert img.pixels.min() == 0
+    assert img.pixels.max() == 1
+
+
+def test_clip_pixels_inplace():
+    img = Image(np.linspace(-1, 2, 100).reshape(10, 10))
+    expected = img.clip_pixels()
+    pixels = img.pixels
+
+    assert img.clip_pixels(inplace=True) is img
+    assert img.pixels is pixels
+    assert np.all(img.pixels == expected.pixels)
+
+
+def test_as_greyscale_inplace():
+    img = Image(np.random.rand(3, 10, 10))
+    expected = img.as_greyscale(mode="average")
+
+    assert img.as_greyscale(mode="average", inplace=True) is img
+    assert img.n_channels == 1
+    assert np.all(img.pixels == expected.pixels)
+
+
+def test_normalize_std_inplace_masked():
+    img = MaskedImage(np.random.rand(3, 10, 10))
+    img.mask.pixels[:, :2] = False
+    unmasked = img.pixels[:, :2].copy()
+    pixels = img.pixels
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = img.normalize_std(mode="per_channel")
+        assert img.normalize_std(mode="per_channel", inplace=True) is img
+    assert img.pixels is pixels
+    assert np.allclose(img.as_vector(), expected.as_vector())
+    assert np.all(img.pixels[:, :2] == unmasked)
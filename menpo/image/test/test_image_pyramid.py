@@ -0,0 +1,105 @@
+import pytest
+from numpy.testing import assert_allclose
+from pytest import raises
+
+import menpo.io as mio
+from menpo.base import LazyList
+from menpo.image import ImagePyramid
+
+
+@pytest.fixture()
+def image():
+    return mio.import_builtin_asset("takeo.ppm")
+
+
+@pytest.mark.parametrize("gaussian", [False, True])
+def test_image_pyramid_matches_generators(image, gaussian):
+    pyramid = image.as_pyramid(n_levels=4, gaussian=gaussian)
+    if gaussian:
+        expected = list(image.gaussian_pyramid(n_levels=4))
+    else:
+        expected = list(image.pyramid(n_levels=4))
+    assert len(pyramid) == 4
+    for level, e in zip(pyramid, expected):
+        assert level.shape == e.shape
+        assert_allclose(level.pixels, e.pixels)
+        assert_allclose(level.landmarks["PTS"].points, e.landmarks["PTS"].points)
+
+
+def test_image_pyramid_base_level_is_image(image):
+    pyramid = ImagePyramid(image)
+    assert pyramid[0] is image
+
+
+def test_image_pyramid_levels_cached(image, mocker):
+    pyramid = ImagePyramid(image, n_levels=3)
+    level = pyramid[2]
+    spy = mocker.spy(pyramid, "_downscale_level")
+    assert pyramid[2] is level
+    assert pyramid[1] is pyramid[-2]
+    assert spy.call_count == 0
+
+
+def test_image_pyramid_built_from_previous_level(image, mocker):
+    pyramid = ImagePyramid(image, n_levels=4)
+    pyramid[1]
+    spy = mocker.spy(pyramid, "_downscale_level")
+    pyramid[3]
+    assert spy.call_count == 2
+    assert spy.call_args_list[0][0][0] is pyramid[1]
+
+
+def test_image_pyramid_max_bytes(image):
+    level_1_bytes = image.rescale(0.5).pixels.nbytes
+    pyramid = ImagePyramid(image, n_levels=4, max_bytes=level_1_bytes)
+    expected = list(image.pyramid(n_levels=4))
+    pyramid[3]
+    assert pyramid.n_cached_bytes <= level_1_bytes
+    assert 1 not in pyramid._levels
+    assert_allclose(pyramid[1].pixels, expected[1].pixels)
+
+
+def test_image_pyramid_slice(image):
+    pyramid = ImagePyramid(image, n_levels=3)
+    levels = pyramid[1:]
+    assert len(levels) == 2
+    assert levels[1] is pyramid[2]
+
+
+def test_image_pyramid_index_error(image):
+    pyramid = ImagePyramid(image, n_levels=3)
+    with raises(IndexError):
+        pyramid[3]
+
+
+def test_image_pyramid_invalid_n_levels(image):
+    with raises(ValueError):
+        ImagePyramid(image, n_levels=0)
+
+
+def test_image_pyramid_clear_cache(image):
+    pyramid = ImagePyramid(image)
+    pyramid[2]
+    pyramid.clear_cache()
+    assert pyramid.n_cached_bytes == 0
+
+
+def test_image_pyramid_init_from_lazylist(image):
+    loaded = []
+
+    def load(i):
+        loaded.append(i)
+        return image
+
+    images = LazyList.init_from_index_callable(load, 3)
+    pyramids = ImagePyramid.init_from_images(images, n_levels=2)
+    assert isinstance(pyramids, LazyList)
+    assert loaded == []
+    assert pyramids[1][1].shape == image.rescale(0.5).shape
+    assert loaded == [1]
+
+
+def test_image_pyramid_init_from_list(image):
+    pyramids = ImagePyramid.init_from_images([image, image], n_levels=2)
+    assert len(pyramids) == 2
+    assert all(isinstance(p, ImagePyramid) for p in pyramids)
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose, assert_equal
+from pytest import raises
+
+import menpo.io as mio
+from menpo.image import BooleanImage, Image
+from menpo.image.interpolation import scipy_interpolation
+from menpo.image.scaling import (
+    antialias_pixels,
+    axis_aligned_scale,
+    scale_interpolation,
+)
+from menpo.transform import NonUniformScale, Rotation, Translation
+
+
+@pytest.fixture()
+def no_opencv(mocker):
+    mocker.patch("menpo.image.base.cv2_perspective_interpolation", None)
+
+
+def _expected_scaling(pixels, template_shape, scale, offset, **kwargs):
+    grid = np.indices(template_shape).reshape([len(template_shape), -1]).T
+    sampled = scipy_interpolation(pixels, grid * scale + offset, **kwargs)
+    return sampled.reshape((pixels.shape[0],) + template_shape)
+
+
+@pytest.mark.parametrize("mode", ["constant", "nearest", "reflect", "wrap"])
+@pytest.mark.parametrize("order", [0, 1])
+def test_scale_interpolation_matches_scipy(order, mode):
+    pixels = np.random.RandomState(0).rand(3, 23, 31)
+    scale, offset = np.array([0.7, 2.3]), np.array([-3.1, 1.6])
+    assert_allclose(
+        scale_interpolation(pixels, (40, 17), scale, offset, mode=mode, order=order),
+        _expected_scaling(pixels, (40, 17), scale, offset, mode=mode, order=order),
+    )
+
+
+def test_scale_interpolation_3d():
+    pixels = np.random.RandomState(0).rand(2, 8, 9, 10)
+    scale, offset = np.array([0.5, 1.3, 2.0]), np.array([0.25, 0.0, -1.0])
+    assert_allclose(
+        scale_interpolation(pixels, (15, 7, 6), scale, offset, cval=0.5),
+        _expected_scaling(pixels, (15, 7, 6), scale, offset, cval=0.5),
+    )
+
+
+def test_scale_interpolation_preserves_dtype():
+    pixels = (np.random.RandomState(0).rand(1, 20, 20) * 255).astype(np.uint8)
+    scale, offset = np.array([0.45, 0.6]), np.array([0.0, 0.0])
+    result = scale_interpolation(pixels, (30, 31), scale, offset)
+    expected = _expected_scaling(pixels, (30, 31), scale, offset)
+    assert result.dtype == np.uint8
+    # Values exactly half way between integers may round either way
+    assert_allclose(result.astype(int), expected.astype(int), atol=1)
+
+
+def test_scale_interpolation_unsupported_order():
+    with raises(ValueError):
+        scale_interpolation(np.zeros([1, 5, 5]), (3, 3), [1, 1], [0, 0], order=3)
+
+
+def test_axis_aligned_scale():
+    transform = NonUniformScale([2.0, 3.0]).compose_before(Translation([1.0, -2.0]))
+    scale, offset = axis_aligned_scale(transform)
+    assert_allclose(scale, [2.0, 3.0])
+    assert_allclose(offset, [1.0, -2.0])
+    assert axis_aligned_scale(Rotation.init_from_2d_ccw_angle(30)) is None
+
+
+@pytest.mark.usefixtures("no_opencv")
+def test_rescale_separable_matches_generic(mocker):
+    image = mio.import_builtin_asset("takeo.ppm")
+    rescaled = image.rescale(0.6)
+    mocker.patch("menpo.image.base.scale_interpolation", None)
+    mocker.patch("menpo.image.base.axis_aligned_scale", lambda t: None)
+    expected = image.rescale(0.6)
+    assert_allclose(rescaled.pixels, expected.pixels)
+    assert_allclose(rescaled.landmarks["PTS"].points, expected.landmarks["PTS"].points)
+
+
+def test_antialias_pixels_untouched_when_upscaling():
+    pixels = np.random.RandomState(0).rand(1, 10, 10)
+    assert antialias_pixels(pixels, [1.0, 2.0]) is pixels
+
+
+def test_rescale_antialias_removes_aliasing():
+    pixels = np.indices((64, 64)).sum(axis=0) % 2
+    image = Image(pixels.astype(float))
+    aliased = image.rescale(0.25)
+    antialiased = image.rescale(0.25, antialias=True)
+    assert np.std(antialiased.pixels) < 0.1 * np.std(aliased.pixels)
+    assert_allclose(antialiased.pixels.mean(), 0.5, atol=0.05)
+
+
+def test_rescale_antialias_landmarks_identical():
+    image = mio.import_builtin_asset("takeo.ppm")
+    rescaled = image.rescale(0.5, antialias=True)
+    expected = image.rescale(0.5)
+    assert rescaled.shape == expected.shape
+    assert_allclose(rescaled.landmarks["PTS"].points, expected.landmarks["PTS"].points)
+
+
+def test_resize_antialias():
+    image = mio.import_builtin_asset("takeo.ppm")
+    resized = image.resize((50, 40), antialias=True)
+    assert resized.shape == (50, 40)
+
+
+def test_pyramid_antialias():
+    image = mio.import_builtin_asset("takeo.ppm")
+    levels = list(image.pyramid(n_levels=3, antialias=True))
+    expected = list(image.pyramid(n_levels=3))
+    for level, e in zip(levels, expected):
+        assert level.shape == e.shape
+
+
+def test_boolean_image_rescale_antialias_ignored():
+    image = BooleanImage.init_blank((20, 20))
+    image.pixels[0, :10] = False
+    rescaled = image.rescale(0.5, antialias=True)
+    assert rescaled.pixels.dtype == bool
+    assert_equal(rescaled.pixels, image.rescale(0.5).pixels)
@@ -0,0 +1,179 @@
+from functools import partial
+
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose, assert_equal
+from pytest import raises
+
+import menpo.io as mio
+from menpo.feature import gaussian_filter, gradient, igo
+from menpo.image import (
+    BooleanImage,
+    Image,
+    MaskedImage,
+    apply_tiled,
+    iter_tiles,
+    warp_to_shape_tiled,
+)
+from menpo.transform import Affine, ThinPlateSplines
+
+
+@pytest.fixture()
+def rgb_image():
+    return mio.import_builtin_asset("takeo.ppm")
+
+
+@pytest.fixture()
+def scipy_warps(mocker):
+    # OpenCV quantizes the sampling locations, so nearest neighbour samples
+    # may differ between the tiles and the whole image
+    mocker.patch("menpo.image.base.cv2_perspective_interpolation", None)
+
+
+@pytest.fixture()
+def affine_transform():
+    # Avoid coefficients that place samples exactly half way between pixels,
+    # where rounding differs between the tiles and the whole image
+    return Affine(
+        np.array(
+            [
+                [1.09137, np.sqrt(2) / 13, 12.3718],
+                [-np.pi / 59, 0.91371, 20.7129],
+                [0, 0, 1],
+            ]
+        )
+    )
+
+
+def test_iter_tiles_cover_image():
+    covered = np.zeros((23, 17), dtype=int)
+    for _, write_slices, _ in iter_tiles((23, 17), (5, 8)):
+        covered[write_slices] += 1
+    assert_equal(covered, 1)
+
+
+def test_iter_tiles_halo():
+    pixels = np.random.RandomState(0).rand(23, 17)
+    for read_slices, write_slices, crop_slices in iter_tiles((23, 17), 6, halo=2):
+        assert_equal(pixels[read_slices][crop_slices], pixels[write_slices])
+        for r, w, s in zip(read_slices, write_slices, pixels.shape):
+            assert r.start == max(w.start - 2, 0)
+            assert r.stop == min(w.stop + 2, s)
+
+
+def test_iter_tiles_invalid():
+    with raises(ValueError):
+        list(iter_tiles((10, 10), (0, 5)))
+    with raises(ValueError):
+        list(iter_tiles((10, 10), 5, halo=-1))
+    with raises(ValueError):
+        list(iter_tiles((10, 10), (5, 5, 5)))
+
+
+@pytest.mark.parametrize("n_workers", [None, 3])
+def test_apply_tiled_gaussian_filter(rgb_image, n_workers):
+    expected = gaussian_filter(rgb_image, 2)
+    result = apply_tiled(
+        rgb_image,
+        partial(gaussian_filter, sigma=2),
+        tile_shape=(64, 50),
+        halo=8,
+        n_workers=n_workers,
+    )
+    assert type(result) == Image
+    assert_allclose(result.pixels, expected.pixels)
+    assert_allclose(result.landmarks["PTS"].points, rgb_image.landmarks["PTS"].points)
+
+
+def test_apply_tiled_changes_channels(rgb_image):
+    result = apply_tiled(rgb_image.pixels, igo, tile_shape=64, halo=1)
+    assert_allclose(result, igo(rgb_image.pixels))
+
+
+def test_apply_tiled_masked_image(rgb_image):
+    masked = rgb_image.as_masked()
+    masked.mask.pixels[0, :50] = False
+    result = apply_tiled(masked, gradient, tile_shape=70, halo=1)
+    assert isinstance(result, MaskedImage)
+    assert_allclose(result.pixels, gradient(masked).pixels)
+    assert_equal(result.mask.pixels, masked.mask.pixels)
+
+
+def test_apply_tiled_out(rgb_image):
+    out = np.empty((6,) + rgb_image.shape)
+    result = apply_tiled(rgb_image.pixels, gradient, tile_shape=64, halo=1, out=out)
+    assert result is out
+    with raises(ValueError):
+        apply_tiled(rgb_image.pixels, gradient, tile_shape=64, out=out[:3])
+
+
+def test_apply_tiled_shape_change_raises(rgb_image):
+    with raises(ValueError):
+        apply_tiled(rgb_image, lambda p: p[:, ::2], tile_shape=64)
+
+
+@pytest.mark.parametrize("mode", ["constant", "nearest"])
+@pytest.mark.parametrize("order", [0, 1])
+@pytest.mark.usefixtures("scipy_warps")
+def test_warp_to_shape_tiled(rgb_image, affine_transform, order, mode):
+    expected = rgb_image.warp_to_shape(
+        (300, 250), affine_transform, order=order, mode=mode
+    )
+    warped = warp_to_shape_tiled(
+        rgb_image, (300, 250), affine_transform, tile_shape=64, order=order, mode=mode
+    )
+    assert type(warped) == Image
+    assert_allclose(warped.pixels, expected.pixels)
+    assert_allclose(warped.landmarks["PTS"].points, expected.landmarks["PTS"].points)
+
+
+def test_warp_to_shape_tiled_opencv(rgb_image, affine_transform):
+    expected = rgb_image.warp_to_shape((300, 250), affine_transform)
+    warped = warp_to_shape_tiled(rgb_image, (300, 250), affine_transform, tile_shape=64)
+    assert_allclose(warped.pixels, expected.pixels)
+
+
+def test_warp_to_shape_tiled_higher_order_halo(rgb_image, affine_transform):
+    expected = rgb_image.warp_to_shape((300, 250), affine_transform, order=3)
+    warped = warp_to_shape_tiled(
+        rgb_image, (300, 250), affine_transform, tile_shape=64, order=3
+    )
+    assert_allclose(warped.pixels, expected.pixels, atol=1e-6)
+
+
+def test_warp_to_shape_tiled_tps(rgb_image):
+    src = rgb_image.landmarks["PTS"]
+    noise = np.random.RandomState(0).randn(src.n_points, 2) * 2
+    tps = ThinPlateSplines(src, src.copy().from_vector(src.as_vector() + noise.ravel()))
+    expected = rgb_image.warp_to_shape((300, 250), tps)
+    warped = warp_to_shape_tiled(rgb_image, (300, 250), tps, tile_shape=64, n_workers=2)
+    assert_allclose(warped.pixels, expected.pixels)
+
+
+def test_warp_to_shape_tiled_masked_image(rgb_image, affine_transform):
+    masked = rgb_image.as_masked()
+    masked.mask.pixels[0, :100] = False
+    expected = masked.warp_to_shape((300, 250), affine_transform)
+    warped = warp_to_shape_tiled(masked, (300, 250), affine_transform, tile_shape=64)
+    assert isinstance(warped, MaskedImage)
+    assert_allclose(warped.pixels, expected.pixels)
+    assert_equal(warped.mask.pixels, expected.mask.pixels)
+
+
+def test_warp_to_shape_tiled_boolean_image(affine_transform):
+    image = BooleanImage.init_blank((200, 200))
+    image.pixels[0, 80:, 50:] = False
+    expected = image.warp_to_shape((150, 160), affine_transform)
+    warped = warp_to_shape_tiled(image, (150, 160), affine_transform, tile_shape=40)
+    assert isinstance(warped, BooleanImage)
+    assert_equal(warped.pixels, expected.pixels)
+
+
+def test_warp_to_shape_tiled_out(rgb_image, affine_transform):
+    out = np.empty((3, 40, 50), dtype=rgb_image.pixels.dtype)
+    warped = warp_to_shape_tiled(
+        rgb_image, (40, 50), affine_transform, tile_shape=16, out=out
+    )
+    assert warped.pixels is out
+    with raises(ValueError):
+        warp_to_shape_tiled(rgb_image, (40, 60), affine_transform, out=out)
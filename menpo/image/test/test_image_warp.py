@@ -3,13 +3,31 @@ import pytest
 from mock import PropertyMock
 from numpy.testing import assert_allclose, assert_almost_equal
 from pytest import raises
+from scipy.ndimage import map_coordinates
 
 import menpo
 import menpo.io as mio
-from menpo.image import BooleanImage, Image, MaskedImage, OutOfMaskSampleError
-from menpo.image.interpolation import cv2_perspective_interpolation
+from menpo.image import (
+    BooleanImage,
+    Image,
+    MaskedImage,
+    OutOfMaskSampleError,
+    get_default_interpolation_backend,
+    set_default_interpolation_backend,
+)
+from menpo.image.interpolation import (
+    cv2_perspective_interpolation,
+    cv2_remap_interpolation,
+    scipy_interpolation,
+)
 from menpo.shape import PointCloud, bounding_box
-from menpo.transform import Affine, Rotation, UniformScale
+from menpo.transform import (
+    Affine,
+    PiecewiseAffine,
+    Rotation,
+    ThinPlateSplines,
+    UniformScale,
+)
 
 CROP_COORDS = (np.array([70, 30]), np.array([169, 129]))
 
@@ -416,3 +434,139 @@ def test_maskedimage_retain_shape():
     rotated_img = image.rotate_ccw_about_centre(theta=77, retain_shape=True)
     assert image.shape == rotated_img.shape
     assert type(rotated_img) == MaskedImage
+
+
+@pytest.fixture()
+def target_landmarks(rgb_image):
+    src = rgb_image.landmarks["PTS"]
+    target = PointCloud(src.points - src.bounds()[0] + 5)
+    return target, np.ceil(target.range() + 10).astype(int)
+
+
+@pytest.fixture()
+def pwa_warp(rgb_image, target_landmarks):
+    target, shape = target_landmarks
+    return PiecewiseAffine(target, rgb_image.landmarks["PTS"]), shape
+
+
+@pytest.fixture()
+def tps_warp(rgb_image, target_landmarks):
+    target, shape = target_landmarks
+    return ThinPlateSplines(target, rgb_image.landmarks["PTS"]), shape
+
+
+@pytest.mark.parametrize("mode", ["constant", "nearest"])
+@pytest.mark.parametrize("order", [0, 1])
+def test_cv2_remap_interpolation(order, mode):
+    pixels = np.random.RandomState(0).rand(3, 30, 40)
+    points = np.random.RandomState(1).uniform(-5, 45, size=(3000, 2))
+    expected = scipy_interpolation(pixels, points, order=order, mode=mode, cval=0.2)
+    # OpenCV uses 1/32 pixel fixed-point precision for linear interpolation
+    assert_allclose(
+        cv2_remap_interpolation(pixels, points, order=order, mode=mode, cval=0.2),
+        expected,
+        atol=0.05 * order,
+    )
+
+
+def test_cv2_remap_interpolation_nan_points():
+    pixels = np.random.RandomState(0).rand(2, 10, 10)
+    points = np.array([[1.5, 2.5], [np.nan, 3.0]])
+    sampled = cv2_remap_interpolation(pixels, points, cval=0.5)
+    assert_allclose(sampled[:, 1], 0)
+
+
+def test_cv2_remap_interpolation_unsupported_mode_falls_back():
+    pixels = np.random.RandomState(0).rand(2, 10, 10)
+    points = np.random.RandomState(1).uniform(-5, 15, size=(100, 2))
+    assert_allclose(
+        cv2_remap_interpolation(pixels, points, mode="reflect"),
+        scipy_interpolation(pixels, points, mode="reflect"),
+    )
+
+
+@pytest.fixture()
+def opencv_backend():
+    previous = get_default_interpolation_backend()
+    set_default_interpolation_backend("opencv")
+    yield
+    set_default_interpolation_backend(previous)
+
+
+def _map_coordinates(pixels, points, order):
+    return np.array(
+        [
+            map_coordinates(p, points.T, order=order, mode="constant", cval=0.0)
+            for p in pixels
+        ]
+    )
+
+
+@pytest.mark.parametrize("order", [0, 1])
+def test_warp_to_mask_pwa_matches_map_coordinates(rgb_image, pwa_warp, order):
+    # The default path must not quantize the sampling locations
+    transform, shape = pwa_warp
+    mask = BooleanImage.init_blank(shape).constrain_to_pointcloud(transform.source)
+    warped = rgb_image.warp_to_mask(mask, transform, order=order)
+    points = transform.apply(mask.true_indices())
+    expected = _map_coordinates(rgb_image.pixels, points, order)
+    assert_allclose(warped.pixels[:, mask.pixels[0]], expected)
+
+
+@pytest.mark.parametrize("order", [0, 1])
+def test_warp_to_shape_tps_matches_map_coordinates(rgb_image, tps_warp, order):
+    transform, shape = tps_warp
+    warped = rgb_image.warp_to_shape(shape, transform, order=order)
+    points = transform.apply(np.indices(shape).reshape([2, -1]).T)
+    expected = _map_coordinates(rgb_image.pixels, points, order)
+    assert_allclose(warped.pixels.reshape([3, -1]), expected)
+
+
+@pytest.mark.usefixtures("opencv_backend")
+@pytest.mark.parametrize("order", [0, 1])
+def test_warp_to_shape_tps_opencv_remap(rgb_image, tps_warp, order):
+    transform, shape = tps_warp
+    warped = rgb_image.warp_to_shape(shape, transform, order=order)
+    set_default_interpolation_backend("numpy")
+    expected = rgb_image.warp_to_shape(shape, transform, order=order)
+    assert_allclose(warped.pixels, expected.pixels, atol=0.05 * order)
+
+
+@pytest.mark.usefixtures("opencv_backend")
+def test_warp_to_mask_pwa_opencv_remap(rgb_image, pwa_warp):
+    transform, shape = pwa_warp
+    mask = BooleanImage.init_blank(shape).constrain_to_pointcloud(transform.source)
+    warped = rgb_image.warp_to_mask(mask, transform, order=0)
+    points = transform.apply(mask.true_indices())
+    expected = _map_coordinates(rgb_image.pixels, points, 0)
+    # OpenCV quantizes the sampling locations, so only compare pixels that
+    # are not close to half way between two pixels
+    fraction = np.abs(points - np.round(points))
+    safe = np.all(fraction < 0.45, axis=1)
+    assert_allclose(warped.pixels[:, mask.pixels[0]][:, safe], expected[:, safe])
+
+
+@pytest.mark.usefixtures("opencv_backend")
+def test_masked_image_warp_to_shape_tps_opencv_remap(rgb_image, tps_warp):
+    transform, shape = tps_warp
+    masked = rgb_image.as_masked()
+    masked.mask.pixels[0, :150] = False
+    warped = masked.warp_to_shape(shape, transform, order=0)
+    set_default_interpolation_backend("numpy")
+    expected = masked.warp_to_shape(shape, transform, order=0)
+    mismatched = np.any(warped.pixels != expected.pixels, axis=0)
+    # Only samples close to half way between two pixels may differ
+    assert mismatched.mean() < 0.01
+    assert (warped.mask.pixels != expected.mask.pixels).mean() < 0.01
+
+
+@pytest.mark.usefixtures("opencv_backend")
+def test_boolean_image_warp_to_shape_tps_opencv_remap(rgb_image, tps_warp):
+    transform, shape = tps_warp
+    image = BooleanImage.init_blank(rgb_image.shape)
+    image.pixels[0, 100:] = False
+    warped = image.warp_to_shape(shape, transform)
+    set_default_interpolation_backend("numpy")
+    expected = image.warp_to_shape(shape, transform)
+    assert warped.pixels.dtype == bool
+    assert (warped.pixels != expected.pixels).mean() < 0.01
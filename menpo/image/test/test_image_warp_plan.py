@@ -0,0 +1,229 @@
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose, assert_equal
+from pytest import raises
+
+import menpo.io as mio
+from menpo.image import BooleanImage, Image, MaskedImage, WarpPlan, warp_images
+from menpo.image.interpolation import (
+    scipy_interpolation,
+    sampling_indices_and_weights,
+    sample_with_indices_and_weights,
+)
+from menpo.shape import PointCloud
+from menpo.transform import Affine, PiecewiseAffine, TransformChain
+
+
+@pytest.fixture()
+def rgb_image():
+    return mio.import_builtin_asset("takeo.ppm")
+
+
+@pytest.fixture()
+def scipy_warps(mocker):
+    # Compare against the generic sampling path rather than OpenCV
+    mocker.patch("menpo.image.base.cv2_perspective_interpolation", None)
+
+
+@pytest.fixture()
+def affine_transform():
+    return Affine(np.array([[1.1, 0.1, 12.3], [-0.05, 0.9, 20.7], [0, 0, 1]]))
+
+
+@pytest.mark.parametrize("mode", ["constant", "nearest", "reflect", "wrap"])
+@pytest.mark.parametrize("order", [0, 1])
+def test_sampling_indices_and_weights_matches_scipy(mode, order):
+    pixels = np.random.RandomState(0).rand(3, 7, 9)
+    points = np.random.RandomState(1).uniform(-12, 20, size=(500, 2))
+    points[:12] = [[0, 0], [6, 8], [-0.5, 2], [3, 8.5], [2.5, 4.5], [-6, 16]] * 2
+    iwo = sampling_indices_and_weights(points, pixels.shape[1:], order=order, mode=mode)
+    sampled = sample_with_indices_and_weights(pixels, *iwo, cval=0.3)
+    expected = scipy_interpolation(pixels, points, order=order, mode=mode, cval=0.3)
+    assert_allclose(sampled, expected)
+
+
+def test_sampling_indices_and_weights_preserves_dtype():
+    pixels = np.arange(20, dtype=np.uint8).reshape([1, 4, 5]) * 10
+    points = np.array([[0.5, 0.5], [1.25, 3.75], [3, 4]])
+    iwo = sampling_indices_and_weights(points, pixels.shape[1:])
+    sampled = sample_with_indices_and_weights(pixels, *iwo)
+    assert sampled.dtype == np.uint8
+    assert_equal(sampled, scipy_interpolation(pixels, points))
+
+
+def test_sampling_indices_and_weights_unsupported_order():
+    with raises(ValueError):
+        sampling_indices_and_weights(np.zeros([1, 2]), (5, 5), order=3)
+
+
+@pytest.mark.parametrize("order", [0, 1, 3])
+@pytest.mark.usefixtures("scipy_warps")
+def test_warp_to_shape_with_plan(rgb_image, affine_transform, order):
+    plan = WarpPlan((120, 110), affine_transform)
+    expected = rgb_image.warp_to_shape((120, 110), affine_transform, order=order)
+    warped = rgb_image.warp_to_shape(plan, order=order)
+    assert warped.shape == (120, 110)
+    assert_allclose(warped.pixels, expected.pixels)
+
+
+@pytest.mark.usefixtures("scipy_warps")
+def test_warp_to_shape_with_plan_reused(rgb_image, affine_transform):
+    plan = WarpPlan((50, 60), affine_transform)
+    grey = rgb_image.as_greyscale()
+    warped_rgb = rgb_image.warp_to_shape(plan)
+    warped_grey = grey.warp_to_shape(plan)
+    assert len(plan._sampling_cache) == 1
+    assert_allclose(
+        warped_grey.pixels, grey.warp_to_shape((50, 60), affine_transform).pixels
+    )
+    assert warped_rgb.n_channels == 3
+
+
+def test_warp_to_shape_with_plan_warps_landmarks(rgb_image, affine_transform):
+    plan = WarpPlan((50, 60), affine_transform)
+    warped = rgb_image.warp_to_shape(plan)
+    expected = rgb_image.warp_to_shape((50, 60), affine_transform)
+    assert_allclose(warped.landmarks["PTS"].points, expected.landmarks["PTS"].points)
+
+
+def test_warp_to_shape_with_plan_return_transform(rgb_image, affine_transform):
+    plan = WarpPlan((50, 60), affine_transform)
+    _, transform = rgb_image.warp_to_shape(plan, return_transform=True)
+    assert transform is affine_transform
+
+
+def test_warp_to_shape_with_plan_mismatched_transform(rgb_image, affine_transform):
+    plan = WarpPlan((50, 60), affine_transform)
+    with raises(ValueError):
+        rgb_image.warp_to_shape(plan, affine_transform.copy())
+
+
+def test_warp_to_shape_no_transform(rgb_image):
+    with raises(ValueError):
+        rgb_image.warp_to_shape((50, 60))
+
+
+def test_warp_to_mask_with_plan(rgb_image, affine_transform):
+    mask = BooleanImage.init_blank((60, 70))
+    mask.pixels[0, :10, :] = False
+    plan = WarpPlan(mask, affine_transform)
+    expected = rgb_image.warp_to_mask(mask, affine_transform)
+    warped = rgb_image.warp_to_mask(plan)
+    assert isinstance(warped, MaskedImage)
+    assert warped.mask.n_true() == mask.n_true()
+    assert_allclose(warped.pixels, expected.pixels)
+
+
+def test_warp_to_shape_with_mask_plan_raises(rgb_image, affine_transform):
+    mask = BooleanImage.init_blank((60, 70))
+    mask.pixels[0, :10, :] = False
+    plan = WarpPlan(mask, affine_transform)
+    with raises(ValueError):
+        rgb_image.warp_to_shape(plan)
+
+
+@pytest.mark.usefixtures("scipy_warps")
+def test_masked_image_warp_to_shape_with_plan(rgb_image, affine_transform):
+    masked = rgb_image.as_masked()
+    masked.mask.pixels[0, :100, :] = False
+    plan = WarpPlan((80, 90), affine_transform)
+    expected = masked.warp_to_shape((80, 90), affine_transform)
+    warped = masked.warp_to_shape(plan)
+    assert_allclose(warped.pixels, expected.pixels)
+    assert_equal(warped.mask.pixels, expected.mask.pixels)
+
+
+def test_boolean_image_warp_to_mask_with_plan(affine_transform):
+    image = BooleanImage.init_blank((100, 100))
+    image.pixels[0, 40:, 40:] = False
+    mask = BooleanImage.init_blank((60, 70))
+    plan = WarpPlan(mask, affine_transform)
+    warped = image.warp_to_mask(plan)
+    assert warped.pixels.dtype == bool
+    assert_equal(warped.pixels, image.warp_to_mask(mask, affine_transform).pixels)
+
+
+def test_warp_plan_pwa(rgb_image):
+    src = rgb_image.landmarks["PTS"]
+    shape = np.ceil(src.range()).astype(int)
+    target = PointCloud(src.points - src.bounds()[0])
+    pwa = PiecewiseAffine(target, src)
+    template = BooleanImage.init_blank(shape).constrain_to_pointcloud(target)
+    plan = WarpPlan(template, pwa)
+    assert plan.n_points == template.n_true()
+    expected = rgb_image.warp_to_mask(template, pwa)
+    assert_allclose(rgb_image.warp_to_mask(plan).pixels, expected.pixels)
+
+
+@pytest.mark.usefixtures("scipy_warps")
+def test_warp_plan_rebuilt_after_inplace_update(rgb_image, affine_transform):
+    plan = WarpPlan((50, 60), affine_transform)
+    rgb_image.warp_to_shape(plan)
+    assert not plan.is_stale
+    affine_transform._from_vector_inplace(affine_transform.as_vector() * 1.05)
+    assert plan.is_stale
+    expected = rgb_image.warp_to_shape((50, 60), affine_transform.copy())
+    assert_allclose(rgb_image.warp_to_shape(plan).pixels, expected.pixels)
+    assert not plan.is_stale
+
+
+def test_warp_plan_pwa_rebuilt_after_set_target(rgb_image):
+    src = rgb_image.landmarks["PTS"]
+    shape = np.ceil(src.range()).astype(int)
+    target = PointCloud(src.points - src.bounds()[0])
+    pwa = PiecewiseAffine(target, src)
+    template = BooleanImage.init_blank(shape).constrain_to_pointcloud(target)
+    plan = WarpPlan(template, pwa)
+    rgb_image.warp_to_mask(plan)
+    pwa.set_target(PointCloud(src.points + 1.5))
+    # the landmarks are no longer inside the (inverted) transform
+    expected = rgb_image.warp_to_mask(template, pwa.copy(), warp_landmarks=False)
+    warped = rgb_image.warp_to_mask(plan, warp_landmarks=False)
+    assert_allclose(warped.pixels, expected.pixels)
+
+
+def test_warp_plan_dims_mismatch(affine_transform):
+    with raises(ValueError):
+        WarpPlan((5, 5, 5), affine_transform)
+
+
+@pytest.mark.parametrize("order", [0, 1, 3])
+@pytest.mark.usefixtures("scipy_warps")
+def test_warp_images_shared_transform(rgb_image, affine_transform, order):
+    images = [rgb_image, rgb_image.rescale_pixels(0, 0.5)]
+    warped = warp_images(images, (40, 50), affine_transform, order=order)
+    assert warped.shape == (2, 3, 40, 50)
+    for w, i in zip(warped, images):
+        expected = i.warp_to_shape((40, 50), affine_transform, order=order)
+        assert_allclose(w, expected.pixels)
+
+
+@pytest.mark.usefixtures("scipy_warps")
+def test_warp_images_per_image_transforms(rgb_image, affine_transform):
+    transforms = [affine_transform, Affine.init_identity(2)]
+    pixels = np.stack([rgb_image.pixels, rgb_image.pixels[:, ::-1]])
+    warped = warp_images(pixels, (40, 50), transforms, mode="nearest")
+    for w, p, t in zip(warped, pixels, transforms):
+        expected = Image(p).warp_to_shape((40, 50), t, mode="nearest")
+        assert_allclose(w, expected.pixels)
+
+
+@pytest.mark.usefixtures("scipy_warps")
+def test_warp_images_different_shapes(rgb_image, affine_transform):
+    images = [rgb_image, rgb_image.crop((10, 10), (80, 90))]
+    # A chain is not Homogeneous, so the points are generated per transform
+    transforms = [affine_transform, TransformChain([affine_transform])]
+    warped = warp_images(images, (30, 30), transforms)
+    for w, i in zip(warped, images):
+        expected = i.warp_to_shape((30, 30), affine_transform)
+        assert_allclose(w, expected.pixels)
+
+
+def test_warp_images_transform_count_mismatch(rgb_image, affine_transform):
+    with raises(ValueError):
+        warp_images([rgb_image] * 3, (10, 10), [affine_transform] * 2)
+
+
+def test_warp_images_channel_mismatch(rgb_image, affine_transform):
+    with raises(ValueError):
+        warp_images([rgb_image, rgb_image.as_greyscale()], (10, 10), affine_transform)
@@ -0,0 +1,363 @@
+import itertools
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+
+from menpo.transform import Homogeneous, Translation
+
+from .warp import WarpPlan
+
+
+def _per_axis(value, n_dims, name):
+    value = np.array(value, dtype=int).ravel()
+    if value.size == 1:
+        value = np.repeat(value, n_dims)
+    if value.size != n_dims:
+        raise ValueError(
+            "{} must be a single value or one value per axis ({} "
+            "values provided for {} axes)".format(name, value.size, n_dims)
+        )
+    return value
+
+
+def iter_tiles(shape, tile_shape, halo=0):
+    r"""
+    Iterate over the tiles that cover an image of the given shape. Each tile
+    is extended by a halo on every side (clipped at the image boundary), so
+    that operations that depend on a neighbourhood of each pixel (e.g.
+    filtering) can be computed on each tile independently.
+
+    Parameters
+    ----------
+    shape : `tuple`
+        The shape of the image (without channel information).
+    tile_shape : `int` or `tuple`
+        The shape of each tile (without the halo). Tiles at the end of each
+        axis are smaller if the image shape is not a multiple of the tile
+        shape.
+    halo : `int` or `tuple`, optional
+        The number of pixels that each tile is extended by on each side,
+        either for all axes or per axis.
+
+    Yields
+    ------
+    read_slices : `tuple` of `slice`
+        The region of the image covered by the tile, including the halo.
+    write_slices : `tuple` of `slice`
+        The region of the image covered by the tile, excluding the halo.
+    crop_slices : `tuple` of `slice`
+        The region within the tile (including the halo) that is not part of
+        the halo, i.e. ``image[read_slices][crop_slices]`` is
+        ``image[write_slices]``.
+
+    Raises
+    ------
+    ValueError
+        If any tile dimension is not positive or any halo is negative.
+    """
+    shape = tuple(int(s) for s in shape)
+    n_dims = len(shape)
+    tile_shape = _per_axis(tile_shape, n_dims, "tile_shape")
+    halo = _per_axis(halo, n_dims, "halo")
+    if np.any(tile_shape < 1):
+        raise ValueError("All tile dimensions must be positive")
+    if np.any(halo < 0):
+        raise ValueError("The halo must not be negative")
+    starts = [range(0, s, t) for s, t in zip(shape, tile_shape)]
+    for start in itertools.product(*starts):
+        start = np.array(start, dtype=int)
+        stop = np.minimum(start + tile_shape, shape)
+        read_start = np.maximum(start - halo, 0)
+        read_stop = np.minimum(stop + halo, shape)
+        yield (
+            tuple(slice(a, b) for a, b in zip(read_start, read_stop)),
+            tuple(slice(a, b) for a, b in zip(start, stop)),
+            tuple(slice(a, b) for a, b in zip(start - read_start, stop - read_start)),
+        )
+
+
+def _map_in_threads(function, items, n_workers):
+    r"""
+    Call ``function`` on each of the given items, optionally spreading the
+    items across a pool of threads.
+    """
+    if n_workers is None or n_workers <= 1:
+        for item in items:
+            function(item)
+    else:
+        pool = ThreadPool(n_workers)
+        try:
+            # Consume the results to raise any errors
+            for _ in pool.imap_unordered(function, items):
+                pass
+        finally:
+            pool.close()
+            pool.join()
+
+
+def apply_tiled(image, function, tile_shape=1024, halo=0, n_workers=None, out=None):
+    r"""
+    Apply a function (e.g. a feature) to an image one tile at a time, writing
+    the results into a single preallocated output. The function only ever
+    sees a single tile (extended by a halo), so the temporaries that it
+    creates are bounded by the tile size rather than the image size. This
+    allows features to be computed on images that are too large to be
+    processed at once (e.g. memory mapped images, see
+    :meth:`Image.init_from_memmap`).
+
+    The function must return an array with the same spatial shape as its
+    input (e.g. :map:`gradient`, :map:`gaussian_filter`, :map:`igo` or
+    :map:`es`), although the number of channels may differ. For the result to
+    match applying the function to the whole image, the halo must cover the
+    neighbourhood that the function reads around each pixel, e.g. ``1`` for
+    :map:`gradient` or ``4 * sigma`` for :map:`gaussian_filter`. At the image
+    boundary the tiles are not extended, so boundary handling is unchanged.
+
+    Parameters
+    ----------
+    image : :map:`Image` or subclass or ``(C, X, Y, ..., Z)`` `ndarray`
+        The image to process.
+    function : `callable`
+        The function to apply to each tile. It is called with the
+        ``(C, X, Y, ..., Z)`` `ndarray` of pixels of the tile, so any
+        feature can be used (use :func:`functools.partial` to pass
+        arguments).
+    tile_shape : `int` or `tuple`, optional
+        The shape of each tile (without the halo).
+    halo : `int` or `tuple`, optional
+        The number of pixels that each tile is extended by on each side.
+    n_workers : `int` or ``None``, optional
+        If greater than ``1``, the tiles are processed by a pool of this many
+        threads. Note that this is only beneficial if the function releases
+        the GIL (as most NumPy and SciPy operations do).
+    out : `ndarray` or ``None``, optional
+        The array that the result is written into (e.g. a writeable
+        :class:`numpy.memmap`). If ``None``, a new array is allocated.
+
+    Returns
+    -------
+    result : :map:`Image` or subclass or ``(C', X, Y, ..., Z)`` `ndarray`
+        The result of the function over the whole image. If an image was
+        given, it is rebuilt in the same way as a feature image (e.g. keeping
+        its landmarks and mask).
+
+    Raises
+    ------
+    ValueError
+        If the function changes the spatial shape of a tile, or ``out`` does
+        not have the shape of the result.
+    """
+    pixels = image if isinstance(image, np.ndarray) else image.pixels
+    tiles = iter_tiles(pixels.shape[1:], tile_shape, halo=halo)
+    result = {"out": out}
+
+    def tile_function(tile):
+        tile_pixels = pixels[(slice(None),) + tile[0]]
+        f_pixels = function(tile_pixels)
+        if f_pixels.shape[1:] != tile_pixels.shape[1:]:
+            raise ValueError(
+                "Only functions that preserve the spatial shape can be "
+                "applied in tiles ({} became {})".format(
+                    tile_pixels.shape[1:], f_pixels.shape[1:]
+                )
+            )
+        return f_pixels
+
+    def write_tile(tile, f_pixels):
+        _, write_slices, crop_slices = tile
+        result["out"][(slice(None),) + write_slices] = f_pixels[
+            (slice(None),) + crop_slices
+        ]
+
+    # Process the first tile on its own, as its result defines the number of
+    # channels and type of the output
+    first_tile = next(tiles)
+    f_pixels = tile_function(first_tile)
+    out_shape = (f_pixels.shape[0],) + pixels.shape[1:]
+    if out is None:
+        result["out"] = np.empty(out_shape, dtype=f_pixels.dtype)
+    elif out.shape != out_shape:
+        raise ValueError(
+            "The output must have shape {} (not {})".format(out_shape, out.shape)
+        )
+    write_tile(first_tile, f_pixels)
+    del f_pixels
+    _map_in_threads(lambda t: write_tile(t, tile_function(t)), tiles, n_workers)
+
+    if isinstance(image, np.ndarray):
+        return result["out"]
+    from menpo.feature.base import rebuild_feature_image
+
+    return rebuild_feature_image(image, result["out"])
+
+
+def _source_region(points, shape, margin):
+    r"""
+    The region of an image of the given shape that contains every neighbour
+    of the given points that is required for interpolation.
+    """
+    shape = np.array(shape)
+    finite = np.all(np.isfinite(points), axis=1)
+    if not np.any(finite):
+        return np.zeros_like(shape), np.ones_like(shape)
+    points = points[finite]
+    lo = np.floor(points.min(axis=0)).astype(int) - margin
+    hi = np.floor(points.max(axis=0)).astype(int) + margin + 2
+    lo = np.clip(lo, 0, shape - 1)
+    return lo, np.clip(hi, lo + 1, shape)
+
+
+def warp_to_shape_tiled(
+    image,
+    template_shape,
+    transform,
+    tile_shape=1024,
+    order=1,
+    mode="constant",
+    cval=0.0,
+    halo=None,
+    warp_landmarks=True,
+    n_workers=None,
+    out=None,
+):
+    r"""
+    Warp an image into a different reference space one tile of the result at
+    a time, writing the tiles into a single preallocated output. For each
+    tile, only the region of the image that the tile samples from is read, so
+    that the temporaries created by the warp are bounded by the tile size
+    rather than the image size. Every tile is warped with
+    :meth:`Image.warp_to_shape`, so the result matches warping the whole
+    image at once for nearest neighbour and linear interpolation.
+
+    Parameters
+    ----------
+    image : :map:`Image` or subclass
+        The image to warp. Masks are warped along with the pixels.
+    template_shape : `tuple` or `ndarray`
+        Defines the shape of the result, and what pixel indices should be
+        sampled (all of them).
+    transform : :map:`Transform`
+        Transform **from the template_shape space back to the image**.
+    tile_shape : `int` or `tuple`, optional
+        The shape of each tile of the result.
+    order : `int`, optional
+        The order of interpolation. The order has to be in the range [0,5].
+    mode : ``{constant, nearest, reflect, wrap}``, optional
+        Points outside the boundaries of the input are filled according
+        to the given mode. As the ``reflect`` and ``wrap`` modes may sample
+        any part of the image, the whole image is read for every tile.
+    cval : `float`, optional
+        Used in conjunction with mode ``constant``, the value outside
+        the image boundaries.
+    halo : `int` or ``None``, optional
+        The number of extra pixels read around the region that each tile
+        samples from. Higher order interpolation prefilters the region that
+        is read, so a halo is needed to approximate prefiltering the whole
+        image. If ``None``, ``0`` for ``order`` 0 and 1 and ``12`` otherwise.
+    warp_landmarks : `bool`, optional
+        If ``True``, result will have the same landmark dictionary
+        as the image, but with each landmark updated to the warped position.
+    n_workers : `int` or ``None``, optional
+        If greater than ``1``, the tiles are warped by a pool of this many
+        threads. The transform must then be safe to apply from several
+        threads at once.
+    out : `ndarray` or ``None``, optional
+        The ``(n_channels,) + template_shape`` array that the warped pixels
+        are written into (e.g. a writeable :class:`numpy.memmap`). If
+        ``None``, a new array is allocated.
+
+    Returns
+    -------
+    warped_image : :map:`Image` or subclass
+        The warped image, of the type that :meth:`Image.warp_to_shape`
+        returns for ``image``.
+
+    Raises
+    ------
+    ValueError
+        If ``out`` does not have the shape of the result.
+    """
+    from .base import Image
+    from .boolean import BooleanImage
+    from .masked import MaskedImage
+
+    template_shape = tuple(int(s) for s in template_shape)
+    if halo is None:
+        halo = 0 if order in range(2) else 12
+    whole_image = mode not in {"constant", "nearest"}
+    out_shape = (image.n_channels,) + template_shape
+    if out is not None and out.shape != out_shape:
+        raise ValueError(
+            "The output must have shape {} (not {})".format(out_shape, out.shape)
+        )
+    result = {"out": out, "mask": None}
+
+    def process_tile(tile):
+        _, write_slices, _ = tile
+        start = np.array([s.start for s in write_slices])
+        shape = tuple(s.stop - s.start for s in write_slices)
+        tile_transform = Translation(start).compose_before(transform)
+        if isinstance(transform, Homogeneous):
+            # The tile samples from within the convex hull of its corners
+            corners = np.array(list(itertools.product(*[[0, s - 1] for s in shape])))
+            points = tile_transform.apply(corners)
+            plan = None
+        else:
+            # Generate the sampling locations of the tile once, both to find
+            # the region to read and to warp the tile
+            plan = WarpPlan(shape, tile_transform)
+            points = plan.points_to_sample
+        if whole_image:
+            lo, hi = np.zeros(image.n_dims, dtype=int), np.array(image.shape)
+        else:
+            lo, hi = _source_region(points, image.shape, margin=halo)
+        source = image.crop(lo, hi)
+        if plan is None:
+            warped = source.warp_to_shape(
+                shape,
+                tile_transform.compose_before(Translation(-lo)),
+                warp_landmarks=False,
+                order=order,
+                mode=mode,
+                cval=cval,
+            )
+        else:
+            # Move the sampling locations into the cropped region
+            plan.points_to_sample = plan.points_to_sample - lo
+            warped = source.warp_to_shape(
+                plan, warp_landmarks=False, order=order, mode=mode, cval=cval
+            )
+        return warped
+
+    def write_tile(tile, warped):
+        index = (slice(None),) + tile[1]
+        result["out"][index] = warped.pixels
+        if result["mask"] is not None:
+            result["mask"][index] = warped.mask.pixels
+
+    tiles = iter_tiles(template_shape, tile_shape)
+    # Warp the first tile on its own, as it defines the type of the output
+    first_tile = next(tiles)
+    warped = process_tile(first_tile)
+    if out is None:
+        result["out"] = np.empty(out_shape, dtype=warped.pixels.dtype)
+    if isinstance(warped, MaskedImage):
+        result["mask"] = np.empty((1,) + template_shape, dtype=bool)
+    write_tile(first_tile, warped)
+    del warped
+    _map_in_threads(lambda t: write_tile(t, process_tile(t)), tiles, n_workers)
+
+    if isinstance(image, BooleanImage):
+        warped_image = BooleanImage(result["out"][0], copy=False)
+    elif result["mask"] is not None:
+        warped_image = MaskedImage(
+            result["out"], mask=BooleanImage(result["mask"][0], copy=False), copy=False,
+        )
+    else:
+        warped_image = Image(result["out"], copy=False)
+    if warp_landmarks and image.has_landmarks:
+        warped_image.landmarks = image.landmarks
+        transform.pseudoinverse()._apply_inplace(warped_image.landmarks)
+    if hasattr(image, "path"):
+        warped_image.path = image.path
+    return warped_image
@@ -0,0 +1,396 @@
+import numpy as np
+
+from .interpolation import (
+    get_default_interpolation_backend,
+    interpolate,
+    sampling_indices_and_weights,
+    sample_with_indices_and_weights,
+)
+
+try:
+    from .interpolation import can_cv2_remap, cv2_remap_maps, cv2_remap_with_maps
+except ImportError:
+    cv2_remap_maps = None
+
+
+def _transform_state(transform):
+    r"""
+    Copies of the arrays that determine where ``transform`` maps points to,
+    used to detect that a transform has been updated in place (e.g. by
+    ``set_target`` during fitting). ``None`` if the state of the transform
+    can't be determined.
+    """
+    from menpo.base import Vectorizable
+    from menpo.transform import Homogeneous, TransformChain
+    from menpo.transform.base import Alignment
+
+    if isinstance(transform, Homogeneous):
+        return [transform.h_matrix.copy()]
+    if isinstance(transform, Alignment):
+        return [transform.source.points.copy(), transform.target.points.copy()]
+    if isinstance(transform, TransformChain):
+        states = [_transform_state(t) for t in transform.transforms]
+        if any(state is None for state in states):
+            return None
+        return [a for state in states for a in state]
+    if isinstance(transform, Vectorizable):
+        return [transform.as_vector().copy()]
+    return None
+
+
+class WarpPlan(object):
+    r"""
+    A reusable plan for warping many images into the same reference frame.
+
+    Building the plan applies the transform to every pixel of the template
+    once, storing the resulting sampling locations. For nearest neighbour and
+    linear interpolation the plan additionally caches the integer neighbour
+    indices and interpolation weights (per source image shape, order and
+    mode), so that every subsequent warp is reduced to a single gather and
+    weighted sum over all channels. If the ``'opencv'`` interpolation backend
+    is selected (see :map:`set_default_interpolation_backend`), 2D images
+    sampled in ``constant`` or ``nearest`` mode instead cache OpenCV
+    remapping maps, which works for any transform (e.g. piecewise affine or
+    thin plate splines).
+
+    A plan can be passed in place of the template to
+    :meth:`Image.warp_to_shape` (when built from a shape) or
+    :meth:`Image.warp_to_mask` (when built from a :map:`BooleanImage`), in
+    which case the ``transform`` argument may be ``None``.
+
+    The plan records the state of the transform (e.g. its homogeneous matrix,
+    or its source and target) when it is built. If the transform is updated
+    in place afterwards (e.g. with ``set_target``), the plan is rebuilt the
+    next time it is used to warp, rather than sampling stale locations.
+
+    Parameters
+    ----------
+    template : `tuple` or `ndarray` or :map:`BooleanImage`
+        Either the shape of the result (in which case all of the pixels are
+        sampled) or a mask defining the shape of the result and which pixels
+        should be sampled.
+    transform : :map:`Transform`
+        Transform **from the template space back to the images**. Defines,
+        for each pixel location on the template, which pixel location should
+        be sampled from on each image.
+    batch_size : `int` or ``None``, optional
+        How many template points should be passed through the transform at a
+        time when building the plan. If ``None``, no batching is used.
+    """
+
+    def __init__(self, template, transform, batch_size=None):
+        from .boolean import BooleanImage
+
+        if isinstance(template, BooleanImage):
+            self.template_mask = template
+            self.template_shape = template.shape
+            template_points = template.true_indices()
+        else:
+            self.template_mask = None
+            self.template_shape = tuple(int(s) for s in template)
+            template_points = (
+                np.indices(self.template_shape)
+                .reshape([len(self.template_shape), -1])
+                .T
+            )
+        # Some transforms (e.g. chains) don't know their dimensionality
+        if transform.n_dims is not None and len(self.template_shape) != (
+            transform.n_dims
+        ):
+            raise ValueError(
+                "Trying to build a {}D warp plan with a {}D transform "
+                "(they must match)".format(len(self.template_shape), transform.n_dims)
+            )
+        self.transform = transform
+        self.batch_size = batch_size
+        self._template_points = template_points
+        self._build()
+
+    def _build(self):
+        self._transform_state = _transform_state(self.transform)
+        self.points_to_sample = self.transform.apply(
+            self._template_points, batch_size=self.batch_size
+        )
+        self._sampling_cache = {}
+
+    @property
+    def is_stale(self):
+        r"""
+        Whether the transform has been changed in place since this plan was
+        built, so that the planned sampling locations are out of date.
+
+        :type: `bool`
+        """
+        state = _transform_state(self.transform)
+        if state is None or self._transform_state is None:
+            return False
+        return len(state) != len(self._transform_state) or not all(
+            np.array_equal(a, b) for a, b in zip(state, self._transform_state)
+        )
+
+    def update(self):
+        r"""
+        Rebuild this plan if the transform has been changed in place since it
+        was built (see :attr:`is_stale`). This is done automatically whenever
+        the plan is used to warp an image.
+
+        Returns
+        -------
+        rebuilt : `bool`
+            ``True`` if the plan had to be rebuilt.
+        """
+        if self.is_stale:
+            self._build()
+            return True
+        return False
+
+    @property
+    def n_dims(self):
+        r"""
+        The number of dimensions of the template.
+
+        :type: `int`
+        """
+        return len(self.template_shape)
+
+    @property
+    def n_points(self):
+        r"""
+        The number of template pixels that are sampled by this plan.
+
+        :type: `int`
+        """
+        return self.points_to_sample.shape[0]
+
+    def sample(
+        self, pixels, order=1, mode="constant", cval=0.0, spline_coefficients=None
+    ):
+        r"""
+        Sample the given pixels at the planned locations. For ``order`` 0 or 1
+        with the ``'numpy'`` (or ``'opencv'``) default interpolation backend,
+        the neighbour indices and weights (or the OpenCV remapping maps) are
+        computed on the first call for a given image shape and reused
+        afterwards. Higher orders and any other default backend sample
+        through the default backend.
+
+        Parameters
+        ----------
+        pixels : ``(n_channels, M, N, ...)`` `ndarray`
+            The image to be sampled from, the first axis containing channel
+            information.
+        order : `int`, optional
+            The order of interpolation. The order has to be in the range [0,5].
+        mode : ``{constant, nearest, reflect, wrap}``, optional
+            Points outside the boundaries of the input are filled according
+            to the given mode.
+        cval : `float`, optional
+            Used in conjunction with mode ``constant``, the value outside
+            the image boundaries.
+        spline_coefficients : :map:`SplineCoefficients` or ``None``, optional
+            Precomputed spline coefficients of ``pixels``, used instead of
+            prefiltering the pixels when ``order`` is greater than 1.
+
+        Returns
+        -------
+        sampled_pixels : ``(n_channels, n_points)`` `ndarray`
+            The interpolated values taken across every channel of the image.
+        """
+        backend = get_default_interpolation_backend()
+        if (
+            cv2_remap_maps is not None
+            and backend == "opencv"
+            and can_cv2_remap(pixels, order, mode)
+        ):
+            key = ("opencv", pixels.shape[1:], order, mode)
+            if key not in self._sampling_cache:
+                self._sampling_cache[key] = cv2_remap_maps(
+                    self.points_to_sample, pixels.shape[1:], order=order, mode=mode
+                )
+            return cv2_remap_with_maps(
+                pixels, self._sampling_cache[key], mode=mode, order=order, cval=cval
+            )
+        if order not in {0, 1} or backend not in {"numpy", "opencv"}:
+            # The planned sampling is only equivalent to the numpy backend
+            return interpolate(
+                pixels,
+                self.points_to_sample,
+                order=order,
+                mode=mode,
+                cval=cval,
+                spline_coefficients=spline_coefficients,
+            )
+        key = (pixels.shape[1:], order, mode)
+        if key not in self._sampling_cache:
+            self._sampling_cache[key] = sampling_indices_and_weights(
+                self.points_to_sample, pixels.shape[1:], order=order, mode=mode
+            )
+        indices, weights, outside = self._sampling_cache[key]
+        return sample_with_indices_and_weights(
+            pixels, indices, weights, outside, cval=cval
+        )
+
+    def __str__(self):
+        return "{} warp plan ({} points sampled via {})".format(
+            "x".join(str(s) for s in self.template_shape),
+            self.n_points,
+            type(self.transform).__name__,
+        )
+
+
+def _pixels_of(images):
+    r"""
+    Return a list of ``(n_channels, ...)`` pixel arrays for the given images,
+    which may be a list of :map:`Image` or a single ``(n_images, n_channels,
+    ...)`` `ndarray`.
+    """
+    if isinstance(images, np.ndarray):
+        return list(images)
+    return [getattr(i, "pixels", i) for i in images]
+
+
+def _warped_points(transforms, template_points, n_images, batch_size=None):
+    r"""
+    Apply one transform per image (or a single shared transform) to the
+    template points, returning a ``(n_images, n_points, n_dims)`` array, or a
+    ``(1, n_points, n_dims)`` array if the transform is shared. Homogeneous
+    transforms are applied in a single vectorized operation.
+    """
+    from menpo.transform import Homogeneous
+
+    if not isinstance(transforms, (list, tuple)):
+        points = transforms.apply(template_points, batch_size=batch_size)
+        return points[None]
+    if len(transforms) != n_images:
+        raise ValueError(
+            "{} transforms were provided for {} images - either provide a "
+            "single shared transform or one per image".format(len(transforms), n_images)
+        )
+    if all(isinstance(t, Homogeneous) for t in transforms):
+        h_matrices = np.array([t.h_matrix for t in transforms])
+        h_x = np.hstack([template_points, np.ones([template_points.shape[0], 1])])
+        h_y = np.einsum("nij, pj -> npi", h_matrices, h_x)
+        return h_y[..., :-1] / h_y[..., -1:]
+    return np.array(
+        [t.apply(template_points, batch_size=batch_size) for t in transforms]
+    )
+
+
+def warp_images(
+    images,
+    template_shape,
+    transforms,
+    order=1,
+    mode="constant",
+    cval=0.0,
+    batch_size=None,
+):
+    r"""
+    Warp a batch of images into the same reference space at once, returning
+    a single ``(n_images, n_channels, ...)`` `ndarray` of warped pixels.
+
+    Either a single transform is shared by every image or one transform is
+    provided per image. The sampling locations are generated for the whole
+    batch at once (homogeneous transforms are applied in a single vectorized
+    operation) and, for nearest neighbour and linear interpolation, every
+    image and channel is sampled with a single gather. The images do not have
+    to share the same shape, but they must all have the same number of
+    channels. Landmarks are not warped - see :meth:`Image.warp_to_shape` if
+    that is required.
+
+    Parameters
+    ----------
+    images : `list` of :map:`Image` or ``(n_images, n_channels, ...)`` `ndarray`
+        The images to warp.
+    template_shape : `tuple` or `ndarray`
+        Defines the shape of the result, and what pixel indices should be
+        sampled (all of them).
+    transforms : :map:`Transform` or `list` of :map:`Transform`
+        Transform(s) **from the template_shape space back to the images**.
+        If a single transform is given it is shared by all images, otherwise
+        there must be one per image.
+    order : `int`, optional
+        The order of interpolation. The order has to be in the range [0,5].
+        Only orders 0 and 1 are batched, higher orders are sampled image by
+        image.
+    mode : ``{constant, nearest, reflect, wrap}``, optional
+        Points outside the boundaries of the input are filled according
+        to the given mode.
+    cval : `float`, optional
+        Used in conjunction with mode ``constant``, the value outside
+        the image boundaries.
+    batch_size : `int` or ``None``, optional
+        Passed through to :meth:`Transform.apply` for each transform. If
+        ``None``, no batching is used and all points are warped at once.
+
+    Returns
+    -------
+    warped_pixels : ``(n_images, n_channels, ...)`` `ndarray`
+        The warped pixels of every image, stacked along the first axis.
+
+    Raises
+    ------
+    ValueError
+        If the images do not all have the same number of channels, or the
+        number of transforms does not match the number of images.
+    """
+    pixels = _pixels_of(images)
+    n_images = len(pixels)
+    if n_images == 0:
+        raise ValueError("At least one image must be provided")
+    n_channels = pixels[0].shape[0]
+    if any(p.shape[0] != n_channels for p in pixels):
+        raise ValueError("All images must have the same number of channels")
+    template_shape = tuple(int(s) for s in template_shape)
+    n_dims = len(template_shape)
+    template_points = np.indices(template_shape).reshape([n_dims, -1]).T
+    n_points = template_points.shape[0]
+    points = _warped_points(transforms, template_points, n_images, batch_size)
+
+    if order not in {0, 1}:
+        warped = [
+            interpolate(
+                p, points[min(i, len(points) - 1)], order=order, mode=mode, cval=cval
+            )
+            for i, p in enumerate(pixels)
+        ]
+        return np.array(warped).reshape((n_images, n_channels) + template_shape)
+
+    shapes = set(p.shape[1:] for p in pixels)
+    image_shape = pixels[0].shape[1:]
+    if len(shapes) > 1 or image_shape[0] == 1:
+        # The neighbour offsets depend on the image shape, so images of
+        # differing shapes (or a single row, which can't be stacked without
+        # gaining upper neighbours) are sampled one at a time
+        warped = [
+            sample_with_indices_and_weights(
+                p,
+                *sampling_indices_and_weights(
+                    points[min(i, len(points) - 1)], p.shape[1:], order=order, mode=mode
+                ),
+                cval=cval,
+            )
+            for i, p in enumerate(pixels)
+        ]
+        return np.array(warped).reshape((n_images, n_channels) + template_shape)
+
+    # Stack all the images along their first spatial axis, giving a buffer
+    # with the same strides as a single image, so that every image can be
+    # sampled with a single gather. All sampling indices are computed with a
+    # single call (when the transform is shared, only for a single image)
+    stacked_pixels = np.concatenate(pixels, axis=1)
+    offsets = np.arange(n_images) * int(np.prod(image_shape))
+    indices, weights, outside = sampling_indices_and_weights(
+        points.reshape([-1, n_dims]), image_shape, order=order, mode=mode
+    )
+    indices = (indices.reshape([-1, n_points]) + offsets[:, None]).ravel()
+    if points.shape[0] == 1 and n_images > 1:
+        if weights is not None:
+            weights = np.tile(weights, [1, n_images])
+        if outside is not None:
+            outside = np.tile(outside, n_images)
+
+    sampled = sample_with_indices_and_weights(
+        stacked_pixels, indices, weights, outside, cval=cval
+    )
+    sampled = sampled.reshape((n_channels, n_images) + template_shape)
+    return np.require(np.swapaxes(sampled, 0, 1), requirements=["C"])
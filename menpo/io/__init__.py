@@ -2,6 +2,8 @@ from .input import (
     import_image,
     import_images,
     image_paths,
+    probe_image,
+    probe_images,
     import_video,
     import_videos,
     video_paths,
@@ -19,6 +21,7 @@ from .input import (
     register_landmark_importer,
     register_pickle_importer,
     register_video_importer,
+    ImageInfo,
 )
 from .output import export_image, export_video, export_landmark_file, export_pickle
 from .exceptions import OverwriteError
@@ -2,6 +2,8 @@ from .base import (
     import_image,
     import_images,
     image_paths,
+    probe_image,
+    probe_images,
     import_video,
     import_videos,
     video_paths,
@@ -23,3 +25,4 @@ from .base import (
     same_name_video,
     resolve_from_paths,
 )
+from .image import ImageInfo
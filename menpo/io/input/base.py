@@ -2,27 +2,35 @@ try:
     import collections.abc as collections_abc
 except ImportError:
     import collections as collections_abc
+import json
 import os
 import random
 import warnings
 from collections import OrderedDict
 from functools import partial
+from multiprocessing.pool import ThreadPool
 from pathlib import Path
 
+import numpy as np
+
 from menpo.base import (
     menpo_src_dir_path,
     LazyList,
     partial_doc,
     MenpoDeprecationWarning,
+    keep_integer_pixels,
+    pixel_float_dtype,
 )
 from menpo.compatibility import basestring
 from menpo.visualize import print_progress
 from .extensions import (
     image_landmark_types,
     image_types,
+    image_probers,
     pickle_types,
     ffmpeg_video_types,
 )
+from .image import ImageInfo
 from ..utils import _norm_path, _possible_extensions_from_filepath, _normalize_extension
 
 
@@ -40,7 +48,9 @@ def _parse_deprecated_normalise(normalise, normalize):
         )
         normalize = normalise
     elif normalize is None:
-        normalize = True
+        # By default, only keep the native integer pixels if the pixel
+        # precision policy asks for it
+        normalize = not keep_integer_pixels()
     return normalize
 
 
@@ -320,7 +330,15 @@ def resolve_from_paths(names_to_path):
     return merge_all_dicts(dicts_to_merge)
 
 
-def import_image(filepath, landmark_resolver=same_name, normalize=None, normalise=None):
+def import_image(
+    filepath,
+    landmark_resolver=same_name,
+    normalize=None,
+    normalise=None,
+    crop=None,
+    scale=None,
+    greyscale=False,
+):
     r"""Single image (and associated landmarks) importer.
 
     If an image file is found at `filepath`, returns an :map:`Image` or
@@ -330,6 +348,12 @@ def import_image(filepath, landmark_resolver=same_name, normalize=None, normalis
     (see `landmark_resolver`). If the image defines a mask, this mask will be
     imported.
 
+    The ``crop``, ``scale`` and ``greyscale`` options are applied while the
+    image is decoded, before its pixels are converted to floating point, so
+    that the pixels that would otherwise be discarded straight after
+    importing are never decoded (where the format allows) or normalized. The
+    landmarks are mapped to the resulting image.
+
     Parameters
     ----------
     filepath : `pathlib.Path` or `str`
@@ -340,7 +364,7 @@ def import_image(filepath, landmark_resolver=same_name, normalize=None, normalis
         return a dictionary of the form ``{'group_name': 'landmark_filepath'}``
         Default finds landmarks with the same name as the image file.
         If ``None``, landmark importing will be skipped.
-    normalize : `bool`, optional
+    normalize : `bool` or ``None``, optional
         If ``True``, normalize the image pixels between 0 and 1 and convert
         to floating point. If false, the native datatype of the image will be
         maintained (commonly `uint8`). Note that in general Menpo assumes
@@ -348,8 +372,26 @@ def import_image(filepath, landmark_resolver=same_name, normalize=None, normalis
         this flag you will have to manually convert the images you import to
         floating point before doing most Menpo operations. This however can be
         useful to save on memory usage if you only wish to view or crop images.
+        If ``None``, the pixels are normalized unless the pixel precision
+        policy is ``uint8`` (see :map:`set_pixel_precision`).
     normalise: `bool`, optional
         Deprecated version of normalize. Please use the normalize arg.
+    crop : ``(min_indices, max_indices)`` or `callable`, optional
+        If not ``None``, only the pixels within these bounds are imported,
+        i.e. the image is imported as if it had been cropped with
+        :meth:`Image.crop` (constrained to the image boundary). The bounds are
+        in the pixels of the file. A callable is passed the path of each image
+        and should return its bounds, e.g. to crop each image around its
+        landmarks.
+    scale : `float`, optional
+        If not ``None``, the (cropped) image is rescaled by this factor, as if
+        with :meth:`Image.rescale`. JPEG images are decoded at a reduced size
+        (up to 8 times smaller) when downscaling, and only the remaining
+        scaling is interpolated, so the result is close to (but smoother than)
+        a rescaled full image.
+    greyscale : `bool`, optional
+        If ``True``, colour images are converted to single channel greyscale
+        images (using the luma). For JPEG images only the luma is decoded.
 
     Returns
     -------
@@ -357,7 +399,7 @@ def import_image(filepath, landmark_resolver=same_name, normalize=None, normalis
         An instantiated :map:`Image` or subclass thereof or a list of images.
     """
     normalize = _parse_deprecated_normalise(normalise, normalize)
-    kwargs = {"normalize": normalize}
+    kwargs = _image_importer_kwargs(normalize, crop, scale, greyscale)
     return _import(
         filepath,
         image_types,
@@ -368,6 +410,21 @@ def import_image(filepath, landmark_resolver=same_name, normalize=None, normalis
     )
 
 
+def _image_importer_kwargs(normalize, crop, scale, greyscale):
+    r"""
+    The kwargs for an image importer, only including the import options that
+    are set so that importers that don't support them are unaffected.
+    """
+    kwargs = {"normalize": normalize}
+    if crop is not None:
+        kwargs["crop"] = crop
+    if scale is not None:
+        kwargs["scale"] = scale
+    if greyscale:
+        kwargs["greyscale"] = greyscale
+    return kwargs
+
+
 def import_video(
     filepath,
     landmark_resolver=same_name_video,
@@ -406,7 +463,7 @@ def import_video(
         'landmark_filepath'}`` Default finds landmarks with the same name as the
         video file, appended with '_{frame_number}'.
         If ``None``, landmark importing will be skipped.
-    normalize : `bool`, optional
+    normalize : `bool` or ``None``, optional
         If ``True``, normalize the frame pixels between 0 and 1 and convert
         to floating point. If ``False``, the native datatype of the image will
         be maintained (commonly `uint8`). Note that in general Menpo assumes
@@ -414,6 +471,8 @@ def import_video(
         flag you will have to manually convert the farmes you import to floating
         point before doing most Menpo operations. This however can be useful to
         save on memory usage if you only wish to view or crop the frames.
+        If ``None``, the pixels are normalized unless the pixel precision
+        policy is ``uint8`` (see :map:`set_pixel_precision`).
     normalise : `bool`, optional
         Deprecated version of normalize. Please use the normalize arg.
     importer_method : {'ffmpeg'}, optional
@@ -588,6 +647,9 @@ def import_images(
     normalise=None,
     as_generator=False,
     verbose=False,
+    crop=None,
+    scale=None,
+    greyscale=False,
 ):
     r"""Multiple image (and associated landmarks) importer.
 
@@ -598,6 +660,12 @@ def import_images(
     (see `landmark_resolver`). If the image defines a mask, this mask will be
     imported.
 
+    The ``crop``, ``scale`` and ``greyscale`` options are applied while the
+    image is decoded, before its pixels are converted to floating point, so
+    that the pixels that would otherwise be discarded straight after
+    importing are never decoded (where the format allows) or normalized. The
+    landmarks are mapped to the resulting image.
+
     Note that this is a function returns a :map:`LazyList`. Therefore, the
     function will return immediately and indexing into the returned list
     will load an image at run time. If all images should be loaded, then simply
@@ -622,7 +690,7 @@ def import_images(
         return a dictionary of the form ``{'group_name': 'landmark_filepath'}``
         Default finds landmarks with the same name as the image file.
         If ``None``, landmark importing will be skipped.
-    normalize : `bool`, optional
+    normalize : `bool` or ``None``, optional
         If ``True``, normalize the image pixels between 0 and 1 and convert
         to floating point. If false, the native datatype of the image will be
         maintained (commonly `uint8`). Note that in general Menpo assumes
@@ -630,6 +698,8 @@ def import_images(
         this flag you will have to manually convert the images you import to
         floating point before doing most Menpo operations. This however can be
         useful to save on memory usage if you only wish to view or crop images.
+        If ``None``, the pixels are normalized unless the pixel precision
+        policy is ``uint8`` (see :map:`set_pixel_precision`).
     normalise : `bool`, optional
         Deprecated version of normalize. Please use the normalize arg.
     as_generator : `bool`, optional
@@ -638,6 +708,22 @@ def import_images(
     verbose : `bool`, optional
         If ``True`` progress of the importing will be dynamically reported with
         a progress bar.
+    crop : ``(min_indices, max_indices)`` or `callable`, optional
+        If not ``None``, only the pixels within these bounds are imported,
+        i.e. the image is imported as if it had been cropped with
+        :meth:`Image.crop` (constrained to the image boundary). The bounds are
+        in the pixels of the file. A callable is passed the path of each image
+        and should return its bounds, e.g. to crop each image around its
+        landmarks.
+    scale : `float`, optional
+        If not ``None``, the (cropped) image is rescaled by this factor, as if
+        with :meth:`Image.rescale`. JPEG images are decoded at a reduced size
+        (up to 8 times smaller) when downscaling, and only the remaining
+        scaling is interpolated, so the result is close to (but smoother than)
+        a rescaled full image.
+    greyscale : `bool`, optional
+        If ``True``, colour images are converted to single channel greyscale
+        images (using the luma). For JPEG images only the luma is decoded.
 
     Returns
     -------
@@ -661,7 +747,7 @@ def import_images(
     """
     normalize = _parse_deprecated_normalise(normalise, normalize)
 
-    kwargs = {"normalize": normalize}
+    kwargs = _image_importer_kwargs(normalize, crop, scale, greyscale)
     return _import_glob_lazy_list(
         pattern,
         image_types,
@@ -676,6 +762,223 @@ def import_images(
     )
 
 
+def probe_image(filepath, normalize=None):
+    r"""Read the metadata of an image without importing it.
+
+    Returns the shape, number of channels and dtype of the image that
+    :map:`import_image` would import from ``filepath``. Wherever possible only
+    the header of the file is read (through a lazy PIL/pillow open, or the
+    image properties reported by imageio), so probing is far cheaper than
+    importing. Images whose importer has no prober are imported in order to
+    find their metadata.
+
+    Parameters
+    ----------
+    filepath : `pathlib.Path` or `str`
+        A relative or absolute filepath to an image file.
+    normalize : `bool` or ``None``, optional
+        Whether the image would be imported with normalized pixels, which
+        determines the dtype (see :map:`import_image`). If ``None``, the
+        pixels are normalized unless the pixel precision policy is ``uint8``
+        (see :map:`set_pixel_precision`).
+
+    Returns
+    -------
+    info : :map:`ImageInfo`
+        A ``(path, shape, n_channels, dtype)`` named tuple describing the
+        image.
+
+    Raises
+    ------
+    ValueError
+        If ``filepath`` is not an image file that Menpo can import.
+    """
+    normalize = _parse_deprecated_normalise(None, normalize)
+    return _probe_image(_norm_path(filepath), normalize)
+
+
+def probe_images(
+    pattern,
+    max_images=None,
+    normalize=None,
+    n_workers=None,
+    cache=False,
+    verbose=False,
+):
+    r"""Read the metadata of multiple images without importing them.
+
+    Probes every image that matches the glob pattern (see
+    :map:`probe_image`), e.g. to size memory mapped arrays or bucket a dataset
+    by resolution before a large job. The probing can be spread over a pool
+    of threads and the results can be cached in a JSON file next to the
+    dataset, so that subsequent scans only probe the images that were added or
+    modified since.
+
+    Parameters
+    ----------
+    pattern : `str`
+        A glob path pattern to search for images. See :map:`image_paths` for
+        more details of what images will be found.
+    max_images : positive `int`, optional
+        If not ``None``, only probe the first ``max_images`` found. Else,
+        probe all.
+    normalize : `bool` or ``None``, optional
+        Whether the images would be imported with normalized pixels, which
+        determines the dtype (see :map:`import_images`). If ``None``, the
+        pixels are normalized unless the pixel precision policy is ``uint8``
+        (see :map:`set_pixel_precision`).
+    n_workers : `int` or ``None``, optional
+        If greater than ``1``, the images are probed by a pool of this many
+        threads.
+    cache : `bool` or `pathlib.Path` or `str`, optional
+        If ``True``, the results are cached in a ``.menpo_probe.json`` file in
+        the deepest directory that contains all of the images. A path to the
+        cache file can also be given. Cached results are reused as long as the
+        size and modification time of the image file are unchanged.
+    verbose : `bool`, optional
+        If ``True`` progress of the probing will be dynamically reported with
+        a progress bar.
+
+    Returns
+    -------
+    infos : `list` of :map:`ImageInfo`
+        The metadata of each image, in the alphanumerical order of the paths.
+
+    Raises
+    ------
+    ValueError
+        If no images are found at the provided glob.
+
+    Examples
+    --------
+    Find the resolutions present in a huge collection:
+
+    >>> infos = menpo.io.probe_images('./massive_image_db/*', n_workers=8,
+    ...                               cache=True)
+    >>> resolutions = set(info.shape for info in infos)
+    """
+    normalize = _parse_deprecated_normalise(None, normalize)
+    filepaths = list(image_paths(pattern))
+    if (max_images is not None) and max_images <= 0:
+        raise ValueError(
+            "Max elements should be positive" " ({} provided)".format(max_images)
+        )
+    elif max_images:
+        filepaths = filepaths[:max_images]
+    n_files = len(filepaths)
+    if n_files == 0:
+        raise ValueError("The glob {} yields no assets".format(pattern))
+
+    if cache is True:
+        cache = Path(os.path.commonpath([str(p.parent) for p in filepaths]))
+        cache = cache / _PROBE_CACHE_FILENAME
+    cache = _norm_path(cache) if cache else None
+    # The dtype of normalized pixels depends on the pixel precision policy,
+    # so the results are cached per setting
+    setting = pixel_float_dtype().name if normalize else "native"
+    cached = _read_probe_cache(cache).get(setting, {}) if cache else {}
+    probed = {}
+
+    def probe(path):
+        if cache is None:
+            return _probe_image(path, normalize)
+        key = Path(os.path.relpath(str(path), str(cache.parent))).as_posix()
+        stat = path.stat()
+        entry = cached.get(key)
+        if (
+            entry is not None
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return ImageInfo(
+                path,
+                tuple(entry["shape"]),
+                entry["n_channels"],
+                np.dtype(entry["dtype"]),
+            )
+        info = _probe_image(path, normalize)
+        probed[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "shape": [int(s) for s in info.shape],
+            "n_channels": int(info.n_channels),
+            "dtype": info.dtype.name,
+        }
+        return info
+
+    pool = None
+    if n_workers is not None and n_workers > 1:
+        pool = ThreadPool(n_workers)
+        infos = pool.imap(probe, filepaths)
+    else:
+        infos = (probe(p) for p in filepaths)
+    try:
+        if verbose:
+            infos = print_progress(infos, prefix="Probing images", n_items=n_files)
+        infos = list(infos)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    if probed:
+        _write_probe_cache(cache, setting, probed)
+    return infos
+
+
+_PROBE_CACHE_FILENAME = ".menpo_probe.json"
+
+
+def _probe_image(path, normalize):
+    r"""
+    Probe the image at the given (normalized) path, falling back to importing
+    it if its importer has no prober.
+    """
+    if not path.is_file():
+        raise ValueError("{} is not a file".format(path))
+    importer_callable = importer_for_filepath(path, image_types)
+    prober = image_probers.get(importer_callable)
+    if prober is not None:
+        return prober(path, normalize=normalize)
+    image = importer_callable(path, normalize=normalize)
+    if isinstance(image, LazyList):
+        # e.g. the frames of an animated GIF
+        image = image[0]
+    return ImageInfo(path, image.shape, image.n_channels, image.pixels.dtype)
+
+
+def _read_probe_cache(cache_path):
+    r"""
+    Read the probe cache at the given path, which is empty if the file does
+    not exist (or is not a valid cache).
+    """
+    try:
+        with open(str(cache_path), "r") as f:
+            cache = json.load(f)
+    except (IOError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != 1:
+        return {}
+    return cache.get("images", {})
+
+
+def _write_probe_cache(cache_path, setting, probed):
+    r"""
+    Merge the newly probed entries for the given setting into the probe cache
+    at the given path. Failing to write the cache (e.g. for a read only
+    dataset) only raises a warning.
+    """
+    images = _read_probe_cache(cache_path)
+    images.setdefault(setting, {}).update(probed)
+    tmp_path = str(cache_path) + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump({"version": 1, "images": images}, f)
+        os.replace(tmp_path, str(cache_path))
+    except (IOError, OSError) as e:
+        warnings.warn("Unable to write the probe cache {}: {}".format(cache_path, e))
+
+
 def import_videos(
     pattern,
     max_videos=None,
@@ -731,7 +1034,7 @@ def import_videos(
         'landmark_filepath'}`` Default finds landmarks with the same name as the
         video file, appended with '_{frame_number}'.
         If ``None``, landmark importing will be skipped.
-    normalize : `bool`, optional
+    normalize : `bool` or ``None``, optional
         If ``True``, normalize the frame pixels between 0 and 1 and convert
         to floating point. If ``False``, the native datatype of the image will
         be maintained (commonly `uint8`). Note that in general Menpo assumes
@@ -739,6 +1042,8 @@ def import_videos(
         flag you will have to manually convert the frames you import to floating
         point before doing most Menpo operations. This however can be useful to
         save on memory usage if you only wish to view or crop the frames.
+        If ``None``, the pixels are normalized unless the pixel precision
+        policy is ``uint8`` (see :map:`set_pixel_precision`).
     normalise : `bool`, optional
         Deprecated version of normalize. Please use the normalize arg.
     importer_method : {'ffmpeg'}, optional
@@ -1009,6 +1314,11 @@ def _import(
     if not isinstance(built_objects, list):
         built_objects = [built_objects]
 
+    # images that were cropped or rescaled as they were imported record the
+    # transform from the pixels of the file, which the landmarks need to be
+    # mapped through
+    import_transforms = [_pop_import_transform(x) for x in built_objects]
+
     # attach path if there is no x.path already.
     def attach_path(obj):
         if not hasattr(obj, "path"):
@@ -1032,6 +1342,9 @@ def _import(
         landmark_attach_func(
             built_objects, landmark_resolver, landmark_ext_map=landmark_ext_map
         )
+        for x, transform in zip(built_objects, import_transforms):
+            if transform is not None and x.has_landmarks:
+                x.landmarks = transform.apply(x.landmarks)
 
     if len(built_objects) == 1:
         built_objects = built_objects[0]
@@ -1039,6 +1352,17 @@ def _import(
     return built_objects
 
 
+def _pop_import_transform(obj):
+    r"""
+    Remove and return the transform from the pixels of the imported file that
+    an importer recorded on the object (if any).
+    """
+    transform = getattr(obj, "_import_transform", None)
+    if transform is not None:
+        del obj._import_transform
+    return transform
+
+
 def _pathlib_glob_for_pattern(pattern, sort=True):
     r"""Generator for glob matching a string path pattern
 
@@ -1,5 +1,14 @@
 from .landmark import lm2_importer, ljson_importer
-from .image import pillow_importer, abs_importer, flo_importer
+from .image import (
+    pillow_importer,
+    abs_importer,
+    flo_importer,
+    imageio_importer,
+    pillow_prober,
+    abs_prober,
+    flo_prober,
+    imageio_prober,
+)
 from .video import ffmpeg_types, ffmpeg_importer
 from .landmark_image import asf_image_importer, pts_image_importer
 from .pickle import pickle_importer, pickle_gzip_importer
@@ -33,6 +42,14 @@ image_types = {
     ".flo": flo_importer,
 }
 
+# Probers read the metadata of the images that an importer would import
+image_probers = {
+    pillow_importer: pillow_prober,
+    abs_importer: abs_prober,
+    flo_importer: flo_prober,
+    imageio_importer: imageio_prober,
+}
+
 
 ffmpeg_video_types = ffmpeg_types()
 ffmpeg_video_types[".gif"] = ffmpeg_importer
@@ -1,11 +1,31 @@
+from collections import namedtuple
 from functools import partial
 
 import numpy as np
 from pathlib import Path
 
-from menpo.base import LazyList
+from menpo.base import LazyList, pixel_float_dtype
 from menpo.image import Image, MaskedImage, BooleanImage
 from menpo.image.base import normalize_pixels_range, channels_to_front
+from menpo.transform import Scale, Translation
+
+
+ImageInfo = namedtuple("ImageInfo", ["path", "shape", "n_channels", "dtype"])
+ImageInfo.__doc__ = r"""
+The metadata of an image file, as returned by :map:`probe_image`. The fields
+describe the image that would be imported from the file.
+
+Parameters
+----------
+path : `pathlib.Path`
+    The path of the image file.
+shape : `tuple` of `int`
+    The spatial shape of the image, e.g. ``(height, width)``.
+n_channels : `int`
+    The number of channels of the image.
+dtype : `numpy.dtype`
+    The type of the pixels of the image.
+"""
 
 
 def _pil_to_numpy(pil_image, normalize, convert=None):
@@ -17,7 +37,92 @@ def _pil_to_numpy(pil_image, normalize, convert=None):
         return p
 
 
-def pillow_importer(filepath, asset=None, normalize=True, **kwargs):
+def _crop_box(crop, filepath, shape, reduction=1):
+    r"""
+    The ``(min_indices, max_indices)`` of the pixels of an image of the given
+    shape that are kept by the ``crop`` import option, for an image that has
+    been reduced by the given factor at decode time.
+    """
+    if callable(crop):
+        crop = crop(filepath)
+    min_indices, max_indices = [np.asarray(c, dtype=float) / reduction for c in crop]
+    min_indices = np.maximum(np.floor(min_indices), 0).astype(int)
+    max_indices = np.minimum(np.ceil(max_indices), shape).astype(int)
+    if np.any(max_indices <= min_indices):
+        raise ValueError("The crop {} does not overlap the image".format(crop))
+    return min_indices, max_indices
+
+
+def _set_import_transform(image, transforms):
+    r"""
+    Record the transform from the pixels of the imported file to the pixels of
+    the given image (the composition of the given transforms), so that the
+    landmarks that are attached to the image on import can be mapped through
+    it.
+    """
+    if transforms:
+        transform = transforms[0]
+        for t in transforms[1:]:
+            transform = transform.compose_before(t)
+        image._import_transform = transform
+
+
+def _apply_import_options(
+    image, filepath, crop=None, scale=None, greyscale=False, **kwargs
+):
+    r"""
+    Apply the ``crop``, ``scale`` and ``greyscale`` import options to an image
+    that has been decoded in full, for importers that can't apply them at
+    decode time.
+    """
+    transforms = []
+    if crop is not None:
+        min_indices, max_indices = _crop_box(crop, filepath, image.shape)
+        image, transform = image.crop(min_indices, max_indices, return_transform=True)
+        transforms.append(transform.pseudoinverse())
+    if greyscale and image.n_channels > 1:
+        mode = "luminosity" if image.n_channels == 3 else "average"
+        image = image.as_greyscale(mode=mode)
+    if scale is not None and scale != 1:
+        image, transform = image.rescale(scale, return_transform=True)
+        transforms.append(transform.pseudoinverse())
+    _set_import_transform(image, transforms)
+    return image
+
+
+def _pil_draft(pil_image, scale, greyscale):
+    r"""
+    Configure the PIL/pillow decoder to decode a reduced image that is at
+    least ``scale`` times the size of the image, and to only decode the luma
+    if ``greyscale``. Only some formats (i.e. JPEG) support this, others are
+    left unchanged.
+
+    Returns
+    -------
+    reduction : `int`
+        The factor that the image is reduced by when it is decoded.
+    """
+    width, height = pil_image.size
+    size = None
+    if scale is not None and scale < 1:
+        size = (int(np.ceil(width * scale)), int(np.ceil(height * scale)))
+    pil_image.draft("L" if greyscale else None, size)
+    new_width, new_height = pil_image.size
+    for reduction in [8, 4, 2]:
+        if (-(-width // reduction), -(-height // reduction)) == (new_width, new_height):
+            return reduction
+    return 1
+
+
+def pillow_importer(
+    filepath,
+    asset=None,
+    normalize=True,
+    crop=None,
+    scale=None,
+    greyscale=False,
+    **kwargs,
+):
     r"""
     Imports an image using PIL/pillow.
 
@@ -33,6 +138,11 @@ def pillow_importer(filepath, asset=None, normalize=True, **kwargs):
     F:
         Imported as a floating point image. Normalisation is ignored.
 
+    The ``crop``, ``scale`` and ``greyscale`` options are applied before the
+    pixels are converted (and normalized). JPEG images are decoded at a
+    reduced size (by a factor of up to 8, using the DCT scaling of the
+    decoder) when downscaling, and greyscale JPEG images only decode the luma.
+
     Parameters
     ----------
     filepath : `Path`
@@ -44,6 +154,15 @@ def pillow_importer(filepath, asset=None, normalize=True, **kwargs):
         If ``True``, normalize between 0.0 and 1.0 and convert to float. If
         ``False`` just pass whatever PIL imports back (according
         to types rules outlined in constructor).
+    crop : ``(min_indices, max_indices)`` or `callable`, optional
+        If not ``None``, only the pixels within these bounds (in the pixels of
+        the file) are imported. A callable is passed the filepath and should
+        return the bounds.
+    scale : `float`, optional
+        If not ``None``, the (cropped) image is rescaled by this factor.
+    greyscale : `bool`, optional
+        If ``True``, colour images are converted to greyscale (using the
+        luma).
     \**kwargs : `dict`, optional
         Any other keyword arguments.
 
@@ -54,24 +173,49 @@ def pillow_importer(filepath, asset=None, normalize=True, **kwargs):
     """
     import PIL.Image as PILImage
 
-    if isinstance(filepath, Path):
-        filepath = str(filepath)
-    pil_image = PILImage.open(filepath)
+    pil_image = PILImage.open(str(filepath))
+    transforms = []
+    reduction = 1
+    if (scale is not None and scale < 1) or greyscale:
+        reduction = _pil_draft(pil_image, scale, greyscale)
+        if reduction > 1:
+            # The decoded pixels are the averages of blocks of pixels
+            transforms.append(
+                Scale(1.0 / reduction, n_dims=2).compose_before(
+                    Translation([0.5 / reduction - 0.5] * 2)
+                )
+            )
+    if crop is not None:
+        min_indices, max_indices = _crop_box(
+            crop, filepath, pil_image.size[::-1], reduction=reduction
+        )
+        pil_image = pil_image.crop(
+            (min_indices[1], min_indices[0], max_indices[1], max_indices[0])
+        )
+        transforms.append(Translation(-min_indices))
+
     mode = pil_image.mode
+    colour_mode = "L" if greyscale else "RGB"
     if mode == "RGBA":
         # If normalize is False, then we return the alpha as an extra
         # channel, which can be useful if the alpha channel has semantic
         # meanings!
         if normalize:
             alpha = np.array(pil_image)[..., 3].astype(np.bool)
-            image_pixels = _pil_to_numpy(pil_image, True, convert="RGB")
+            image_pixels = _pil_to_numpy(pil_image, True, convert=colour_mode)
             image = MaskedImage.init_from_channels_at_back(image_pixels, mask=alpha)
         else:
             # With no normalisation we just return the pixels
-            image = Image.init_from_channels_at_back(_pil_to_numpy(pil_image, False))
+            convert = "LA" if greyscale else None
+            image = Image.init_from_channels_at_back(
+                _pil_to_numpy(pil_image, False, convert=convert)
+            )
     elif mode in ["L", "I", "RGB"]:
         # Greyscale, Integer and RGB images
-        image = Image.init_from_channels_at_back(_pil_to_numpy(pil_image, normalize))
+        convert = "L" if greyscale and mode == "RGB" else None
+        image = Image.init_from_channels_at_back(
+            _pil_to_numpy(pil_image, normalize, convert=convert)
+        )
     elif mode == "1":
         # Convert to 'L' type (http://stackoverflow.com/a/4114122/1716869).
         # Can't normalize a binary image
@@ -79,13 +223,18 @@ def pillow_importer(filepath, asset=None, normalize=True, **kwargs):
     elif mode == "P":
         # Convert pallete images to RGB
         image = Image.init_from_channels_at_back(
-            _pil_to_numpy(pil_image, normalize, convert="RGB")
+            _pil_to_numpy(pil_image, normalize, convert=colour_mode)
         )
     elif mode == "F":  # Floating point images
         # Don't normalize as we don't know the scale
         image = Image.init_from_channels_at_back(_pil_to_numpy(pil_image, False))
     else:
         raise ValueError("Unexpected mode for PIL: {}".format(mode))
+
+    if scale is not None and scale * reduction != 1:
+        image, transform = image.rescale(scale * reduction, return_transform=True)
+        transforms.append(transform.pseudoinverse())
+    _set_import_transform(image, transforms)
     return image
 
 
@@ -103,7 +252,9 @@ def abs_importer(filepath, asset=None, **kwargs):
         An optional asset that may help with loading. This is unused for this
         implementation.
     \**kwargs : `dict`, optional
-        Any other keyword arguments.
+        Any other keyword arguments. The ``crop``, ``scale`` and
+        ``greyscale`` options of :map:`import_image` are applied once the
+        image has been decoded.
 
     Returns
     -------
@@ -130,11 +281,12 @@ def abs_importer(filepath, asset=None, **kwargs):
     corrupt_value = np.min(data_view)
     data_view[np.any(np.isclose(data_view, corrupt_value), axis=1)] = np.nan
 
-    return MaskedImage(
+    image = MaskedImage(
         np.rollaxis(np.reshape(data_view, [n_rows, n_cols, 3]), -1),
         np.reshape(image_data[:, 0], [n_rows, n_cols]).astype(np.bool),
         copy=False,
     )
+    return _apply_import_options(image, filepath, **kwargs)
 
 
 def flo_importer(filepath, asset=None, **kwargs):
@@ -149,7 +301,9 @@ def flo_importer(filepath, asset=None, **kwargs):
         An optional asset that may help with loading. This is unused for this
         implementation.
     \**kwargs : `dict`, optional
-        Any other keyword arguments.
+        Any other keyword arguments. The ``crop``, ``scale`` and
+        ``greyscale`` options of :map:`import_image` are applied once the
+        image has been decoded.
 
     Returns
     -------
@@ -170,7 +324,7 @@ def flo_importer(filepath, asset=None, **kwargs):
     v_raw = rawData[1::2].reshape(shape)
     uv = np.vstack([u_raw[None, ...], v_raw[None, ...]])
 
-    return Image(uv, copy=False)
+    return _apply_import_options(Image(uv, copy=False), filepath, **kwargs)
 
 
 def imageio_importer(filepath, asset=None, normalize=True, **kwargs):
@@ -190,7 +344,9 @@ def imageio_importer(filepath, asset=None, normalize=True, **kwargs):
         If ``True``, normalize between 0.0 and 1.0 and convert to float. If
         ``False`` just return whatever imageio imports.
     \**kwargs : `dict`, optional
-        Any other keyword arguments.
+        Any other keyword arguments. The ``crop``, ``scale`` and
+        ``greyscale`` options of :map:`import_image` are applied once the
+        image has been decoded.
 
     Returns
     -------
@@ -209,15 +365,15 @@ def imageio_importer(filepath, asset=None, normalize=True, **kwargs):
         # meanings!
         if normalize:
             p = normalize_pixels_range(pixels[:3])
-            return MaskedImage(p, mask=pixels[-1].astype(np.bool), copy=False)
+            image = MaskedImage(p, mask=pixels[-1].astype(bool), copy=False)
         else:
-            return Image(pixels, copy=False)
-
+            image = Image(pixels, copy=False)
     # Assumed not to have an Alpha channel
-    if normalize:
-        return Image(normalize_pixels_range(pixels), copy=False)
+    elif normalize:
+        image = Image(normalize_pixels_range(pixels), copy=False)
     else:
-        return Image(pixels, copy=False)
+        image = Image(pixels, copy=False)
+    return _apply_import_options(image, filepath, **kwargs)
 
 
 def imageio_gif_importer(filepath, asset=None, normalize=True, **kwargs):
@@ -272,3 +428,162 @@ def imageio_gif_importer(filepath, asset=None, normalize=True, **kwargs):
     index_callable = partial(imageio_to_menpo, reader)
     ll = LazyList.init_from_index_callable(index_callable, reader.get_length())
     return ll
+
+
+def _imported_dtype(dtype, normalize):
+    r"""
+    The type that pixels of the given type are imported as, following
+    :func:`menpo.image.base.normalize_pixels_range`.
+    """
+    dtype = np.dtype(dtype)
+    if not normalize:
+        return dtype
+    elif dtype == np.uint8 or dtype == np.uint16:
+        return pixel_float_dtype()
+    else:
+        raise ValueError(
+            "Unexpected dtype ({}) - normalisation range " "is unknown".format(dtype)
+        )
+
+
+def pillow_prober(filepath, asset=None, normalize=True, **kwargs):
+    r"""
+    Reads the metadata of an image that ``pillow_importer`` would import,
+    using PIL/pillow. Only the header of the file is read, the pixels are not
+    decoded.
+
+    Parameters
+    ----------
+    filepath : `Path`
+        Absolute filepath of image
+    asset : `object`, optional
+        An optional asset that may help with loading. This is unused for this
+        implementation.
+    normalize : `bool`, optional
+        If ``True``, the pixels would be normalized between 0.0 and 1.0 and
+        converted to float.
+    \**kwargs : `dict`, optional
+        Any other keyword arguments.
+
+    Returns
+    -------
+    info : :map:`ImageInfo`
+        The metadata of the image.
+    """
+    import PIL.Image as PILImage
+
+    with PILImage.open(str(filepath)) as pil_image:
+        mode = pil_image.mode
+        width, height = pil_image.size
+    if mode == "RGBA":
+        # The alpha channel becomes the mask of a normalized image
+        n_channels = 3 if normalize else 4
+        dtype = _imported_dtype(np.uint8, normalize)
+    elif mode in ["L", "I", "RGB", "P"]:
+        # Pallete images are converted to RGB
+        n_channels = 1 if mode in ["L", "I"] else 3
+        dtype = _imported_dtype(np.int32 if mode == "I" else np.uint8, normalize)
+    elif mode == "1":
+        n_channels, dtype = 1, np.dtype(bool)
+    elif mode == "F":
+        n_channels, dtype = 1, np.dtype(np.float32)
+    else:
+        raise ValueError("Unexpected mode for PIL: {}".format(mode))
+    return ImageInfo(Path(filepath), (height, width), n_channels, dtype)
+
+
+def abs_prober(filepath, asset=None, **kwargs):
+    r"""
+    Reads the metadata of an image that ``abs_importer`` would import.
+    Only the header of the file is read.
+
+    Parameters
+    ----------
+    filepath : `Path`
+        Absolute filepath of the file.
+    asset : `object`, optional
+        An optional asset that may help with loading. This is unused for this
+        implementation.
+    \**kwargs : `dict`, optional
+        Any other keyword arguments.
+
+    Returns
+    -------
+    info : :map:`ImageInfo`
+        The metadata of the image.
+    """
+    import re
+
+    with open(str(filepath), "r") as f:
+        n_rows = int(re.findall("([0-9]+) rows", f.readline())[0])
+        n_cols = int(re.findall("([0-9]+) columns", f.readline())[0])
+    return ImageInfo(Path(filepath), (n_rows, n_cols), 3, np.dtype(np.float64))
+
+
+def flo_prober(filepath, asset=None, **kwargs):
+    r"""
+    Reads the metadata of an image that ``flo_importer`` would import.
+    Only the header of the file is read.
+
+    Parameters
+    ----------
+    filepath : `Path`
+        Absolute filepath of the file.
+    asset : `object`, optional
+        An optional asset that may help with loading. This is unused for this
+        implementation.
+    \**kwargs : `dict`, optional
+        Any other keyword arguments.
+
+    Returns
+    -------
+    info : :map:`ImageInfo`
+        The metadata of the image.
+    """
+    with open(str(filepath), "rb") as f:
+        fingerprint = f.read(4)
+        if fingerprint != b"PIEH":
+            raise ValueError("Invalid FLO file.")
+
+        width, height = np.fromfile(f, dtype=np.uint32, count=2)
+    return ImageInfo(Path(filepath), (int(height), int(width)), 2, np.dtype(np.float32))
+
+
+def imageio_prober(filepath, asset=None, normalize=True, **kwargs):
+    r"""
+    Reads the metadata of an image that ``imageio_importer`` would import,
+    using the image properties reported by the imageio library.
+
+    Parameters
+    ----------
+    filepath : `Path`
+        Absolute filepath of the image.
+    asset : `object`, optional
+        An optional asset that may help with loading. This is unused for this
+        implementation.
+    normalize : `bool`, optional
+        If ``True``, the pixels would be normalized between 0.0 and 1.0 and
+        converted to float.
+    \**kwargs : `dict`, optional
+        Any other keyword arguments.
+
+    Returns
+    -------
+    info : :map:`ImageInfo`
+        The metadata of the image.
+    """
+    import imageio.v3 as iio
+
+    properties = iio.improps(str(filepath))
+    # Mirror the channels_to_front call and the Image constructor of the
+    # importer
+    shape = (properties.shape[-1],) + tuple(properties.shape[:-1])
+    if len(shape) == 2:
+        shape = (1,) + shape
+    n_channels, shape = shape[0], shape[1:]
+
+    transparent_types = {".png"}
+    if n_channels == 4 and Path(filepath).suffix in transparent_types and normalize:
+        n_channels = 3
+    dtype = _imported_dtype(properties.dtype, normalize)
+    return ImageInfo(Path(filepath), shape, n_channels, dtype)
@@ -1,6 +1,7 @@
 import warnings
 
 import numpy as np
+from numpy.testing import assert_allclose
 from PIL import Image as PILImage
 from mock import patch, MagicMock
 from pytest import raises
@@ -832,3 +833,90 @@ def test_register_no_leading_period():
     mio.input.base._register_importer(ext_map, "foo", lambda x: x)
     assert ".foo" in ext_map
     assert "foo" not in ext_map
+
+
+def test_import_image_crop():
+    img = mio.import_builtin_asset("lenna.png")
+    min_indices, max_indices = img.landmarks["LJSON"].bounds(boundary=10)
+    expected = img.crop(min_indices, max_indices)
+
+    cropped = mio.import_image(
+        mio.data_path_to("lenna.png"), crop=(min_indices, max_indices)
+    )
+    assert_allclose(cropped.pixels, expected.pixels)
+    assert_allclose(
+        cropped.landmarks["LJSON"].points, expected.landmarks["LJSON"].points
+    )
+
+
+def test_import_image_crop_constrained_to_boundary():
+    img = mio.import_image(mio.data_path_to("takeo.ppm"), crop=((-10, 100), (50, 1000)))
+    assert img.shape == (50, 50)
+
+
+def test_import_image_crop_outside_raises():
+    with raises(ValueError):
+        mio.import_image(mio.data_path_to("takeo.ppm"), crop=((300, 0), (400, 10)))
+
+
+def test_import_images_crop_callable():
+    def crop(path):
+        lms = mio.import_landmark_file(path.with_suffix(".pts"))
+        return lms["PTS"].bounds()
+
+    pattern = str(mio.data_dir_path() / "takeo*")
+    img = mio.import_images(pattern, crop=crop)[0]
+    assert_allclose(img.landmarks["PTS"].bounds()[0], 0, atol=1)
+    assert_allclose(np.array(img.shape) - 1, img.landmarks["PTS"].range(), atol=1)
+
+
+def test_import_image_scale_png():
+    img = mio.import_builtin_asset("lenna.png")
+    expected = img.rescale(0.5)
+
+    rescaled = mio.import_image(mio.data_path_to("lenna.png"), scale=0.5)
+    assert rescaled.shape == expected.shape
+    assert_allclose(rescaled.pixels, expected.pixels)
+    assert_allclose(
+        rescaled.landmarks["LJSON"].points, expected.landmarks["LJSON"].points
+    )
+
+
+def test_import_image_scale_jpeg_reduced_decoding():
+    img = mio.import_builtin_asset("breakingbad.jpg")
+    expected = img.rescale(0.25)
+
+    with patch("PIL.JpegImagePlugin.JpegImageFile.draft") as draft:
+        mio.import_image(mio.data_path_to("breakingbad.jpg"), scale=0.25)
+    assert draft.called
+    rescaled = mio.import_image(mio.data_path_to("breakingbad.jpg"), scale=0.25)
+    assert rescaled.shape == expected.shape
+    assert_allclose(
+        rescaled.landmarks["PTS"].points, expected.landmarks["PTS"].points, atol=0.5
+    )
+    assert np.abs(rescaled.pixels - expected.pixels).mean() < 0.02
+
+
+def test_import_image_greyscale():
+    img = mio.import_builtin_asset("breakingbad.jpg")
+
+    grey = mio.import_image(mio.data_path_to("breakingbad.jpg"), greyscale=True)
+    assert grey.n_channels == 1
+    assert grey.shape == img.shape
+    # The luma of the decoder is close to the luminosity of the RGB pixels
+    assert np.abs(grey.pixels - img.as_greyscale().pixels).mean() < 0.005
+    assert_allclose(grey.landmarks["PTS"].points, img.landmarks["PTS"].points)
+
+
+@patch("PIL.Image.open")
+@patch("menpo.io.input.base.Path.is_file")
+def test_importing_PIL_RGBA_normalize_greyscale(is_file, mock_image):
+    from menpo.image import MaskedImage
+
+    mock_image.return_value = PILImage.new("RGBA", (10, 15))
+    is_file.return_value = True
+
+    im = mio.import_image("fake_image_being_mocked.png", greyscale=True)
+    assert im.shape == (15, 10)
+    assert im.n_channels == 1
+    assert type(im) == MaskedImage
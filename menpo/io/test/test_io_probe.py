@@ -0,0 +1,80 @@
+import numpy as np
+from PIL import Image as PILImage
+from mock import patch
+from pytest import raises, mark
+
+import menpo.io as mio
+
+
+@mark.parametrize("mode", ["RGBA", "RGB", "L", "P", "1", "F", "I"])
+@mark.parametrize("normalize", [True, False])
+@patch("PIL.Image.open")
+@patch("menpo.io.input.base.Path.is_file")
+def test_probe_image_PIL_matches_import(is_file, mock_image, normalize, mode):
+    is_file.return_value = True
+    mock_image.side_effect = lambda *args: PILImage.new(mode, (10, 15))
+
+    if mode == "I" and normalize:
+        with raises(ValueError):
+            mio.probe_image("fake_image_being_mocked.ppm", normalize=normalize)
+        return
+    info = mio.probe_image("fake_image_being_mocked.ppm", normalize=normalize)
+    im = mio.import_image("fake_image_being_mocked.ppm", normalize=normalize)
+    assert info.path.name == "fake_image_being_mocked.ppm"
+    assert info.shape == im.shape
+    assert info.n_channels == im.n_channels
+    assert info.dtype == im.pixels.dtype
+
+
+def test_probe_images_builtin_assets():
+    pattern = str(mio.data_dir_path()) + "/*"
+    infos = mio.probe_images(pattern)
+    assert [i.path for i in infos] == list(mio.image_paths(pattern))
+    for info in infos:
+        im = mio.import_image(info.path, landmark_resolver=None)
+        assert info.shape == im.shape
+        assert info.n_channels == im.n_channels
+        assert info.dtype == im.pixels.dtype
+
+
+def test_probe_images_n_workers():
+    pattern = str(mio.data_dir_path()) + "/*"
+    assert mio.probe_images(pattern, n_workers=3) == mio.probe_images(pattern)
+
+
+def test_probe_images_max_images():
+    pattern = str(mio.data_dir_path()) + "/*"
+    assert len(mio.probe_images(pattern, max_images=2)) == 2
+
+
+def test_probe_images_wrong_path_raises_value_error():
+    with raises(ValueError):
+        mio.probe_images("asldfjalkgjlaknglkajlekjaltknlaekstjlakj")
+
+
+def test_probe_images_cache(tmpdir):
+    for i, shape in enumerate([(10, 15), (20, 5)]):
+        PILImage.new("RGB", shape).save(str(tmpdir.join("{}.png".format(i))))
+    pattern = str(tmpdir.join("*"))
+
+    infos = mio.probe_images(pattern, cache=True)
+    assert tmpdir.join(".menpo_probe.json").check()
+    with patch("menpo.io.input.base._probe_image") as probe:
+        assert mio.probe_images(pattern, cache=True) == infos
+        assert not probe.called
+
+    # Modified images are probed again
+    PILImage.new("L", (7, 8)).save(str(tmpdir.join("1.png")))
+    infos = mio.probe_images(pattern, cache=True)
+    assert infos[1].shape == (8, 7)
+    assert infos[1].n_channels == 1
+
+
+def test_probe_images_cache_per_normalize(tmpdir):
+    PILImage.new("RGB", (10, 15)).save(str(tmpdir.join("0.png")))
+    cache = str(tmpdir.join("cache.json"))
+    pattern = str(tmpdir.join("*.png"))
+
+    assert mio.probe_images(pattern, cache=cache)[0].dtype == np.float64
+    assert mio.probe_images(pattern, cache=cache, normalize=False)[0].dtype == np.uint8
+    assert mio.probe_images(pattern, cache=cache)[0].dtype == np.float64
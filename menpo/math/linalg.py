@@ -86,7 +86,9 @@ def dot_inplace_right(a, b, block_size=1000):
     return b[:n_small]
 
 
-def as_matrix(vectorizables, length=None, return_template=False, verbose=False):
+def as_matrix(
+    vectorizables, length=None, return_template=False, verbose=False, dtype=None
+):
     r"""
     Create a matrix from a list/generator of :map:`Vectorizable` objects.
     All the objects in the list **must** be the same size when vectorized.
@@ -107,6 +109,10 @@ def as_matrix(vectorizables, length=None, return_template=False, verbose=False):
         If ``True``, will return the first element of the list/generator, which
         was used as the template. Useful if you need to map back from the
         matrix to a list of vectorizable objects.
+    dtype : `numpy.dtype` or ``None``, optional
+        The data type of the matrix. If ``None``, the data type of the vector of
+        the first element is used, so that e.g. single precision images are
+        stacked into a single precision matrix.
 
     Returns
     -------
@@ -134,7 +140,9 @@ def as_matrix(vectorizables, length=None, return_template=False, verbose=False):
     n_features = template.n_parameters
     template_vector = template.as_vector()
 
-    data = np.zeros((length, n_features), dtype=template_vector.dtype)
+    if dtype is None:
+        dtype = template_vector.dtype
+    data = np.zeros((length, n_features), dtype=dtype)
     if verbose:
         print(
             "Allocated data matrix of size {} "
@@ -11,6 +11,7 @@ except ImportError:
 from scipy.sparse import csr_matrix
 from scipy.spatial.distance import cdist
 
+from menpo.base import ensure_writeable
 from menpo.transform import WithDims
 from menpo.visualize import viewwrapper
 
@@ -160,6 +161,8 @@ class PointCloud(Shape):
         In general this should only be used if you know what you are doing.
     """
 
+    _copy_on_write_attributes = ("points",)
+
     def __init__(self, points, copy=True):
         super(PointCloud, self).__init__()
         if not copy:
@@ -1389,6 +1392,7 @@ class PointCloud(Shape):
             The constrained pointcloud.
         """
         pc = self.copy()
+        pc.points = ensure_writeable(pc.points)
         for k in range(pc.n_dims):
             tmp = pc.points[:, k]
             tmp[tmp < bounds[0][k]] = bounds[0][k]
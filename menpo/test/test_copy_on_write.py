@@ -0,0 +1,103 @@
+import numpy as np
+from numpy.testing import assert_allclose
+from pytest import raises
+
+import menpo.io as mio
+from menpo.base import copy_on_write, ensure_writeable, get_copy_on_write
+from menpo.image import BooleanImage, MaskedImage
+from menpo.shape import PointCloud
+
+
+def test_copy_on_write_disabled_by_default():
+    assert not get_copy_on_write()
+    with copy_on_write():
+        assert get_copy_on_write()
+        with copy_on_write(False):
+            assert not get_copy_on_write()
+        assert get_copy_on_write()
+    assert not get_copy_on_write()
+
+
+def test_copy_on_write_shares_pixels_and_landmarks():
+    image = mio.import_builtin_asset("takeo.ppm")
+    with copy_on_write():
+        copy = image.copy()
+    assert copy.pixels is image.pixels
+    assert copy.landmarks["PTS"].points is image.landmarks["PTS"].points
+    assert not image.pixels.flags.writeable
+    with raises(ValueError):
+        copy.pixels[0, 0, 0] = 1
+
+
+def test_copy_on_write_original_write_does_not_reach_copy():
+    image = mio.import_builtin_asset("takeo.ppm")
+    with copy_on_write():
+        copy = image.copy()
+    expected = copy.pixels.copy()
+    # writing to the shared pixels of the original directly is refused
+    with raises(ValueError):
+        image.pixels[0, 0, 0] = 5
+    with raises(ValueError):
+        image.landmarks["PTS"].points[0] = 0
+    # a private copy is obtained to write to the original
+    image.pixels = ensure_writeable(image.pixels)
+    image.pixels[0, 0, 0] = 5
+    assert image.pixels[0, 0, 0] == 5
+    assert_allclose(copy.pixels, expected)
+
+
+def test_copy_on_write_inplace_operation_on_original_leaves_copy():
+    image = MaskedImage.init_blank((20, 20), fill=1.0)
+    with copy_on_write():
+        copy = image.copy()
+    image._from_vector_inplace(np.zeros(image.n_true_elements()))
+    assert_allclose(image.pixels, 0)
+    assert_allclose(copy.pixels, 1)
+
+
+def test_ensure_writeable():
+    pixels = np.zeros((3, 4))
+    assert ensure_writeable(pixels) is pixels
+    pixels.flags.writeable = False
+    writeable = ensure_writeable(pixels)
+    assert writeable is not pixels
+    writeable[0] = 1
+    assert_allclose(pixels, 0)
+
+
+def test_copy_on_write_chain_matches_copy():
+    image = mio.import_builtin_asset("breakingbad.jpg").rescale(0.25)
+    original = image.pixels.copy()
+
+    def chain(image):
+        image = image.crop_to_landmarks_proportion(0.2).as_greyscale()
+        image = image.set_patches_around_landmarks(np.zeros((68, 1, 1, 3, 3)))
+        return image.normalize_std()
+
+    expected = chain(image)
+    with copy_on_write():
+        result = chain(image)
+    assert_allclose(result.pixels, expected.pixels)
+    assert_allclose(result.landmarks[None].points, expected.landmarks[None].points)
+    assert_allclose(image.pixels, original)
+
+
+def test_copy_on_write_inplace_operations_leave_original():
+    image = MaskedImage.init_blank((20, 20), fill=1.0)
+    image.landmarks["a"] = PointCloud(
+        np.array([[-2.0, 5.0], [10.0, 25.0], [15.0, 0.0]])
+    )
+    with copy_on_write():
+        bordered = image.set_boundary_pixels(value=0.0)
+        copy = image.copy()
+        copy._from_vector_inplace(np.zeros(copy.n_true_elements()))
+        mask = BooleanImage.init_blank((20, 20))
+        constrained = mask.copy().constrain_to_pointcloud(image.landmarks["a"])
+        points = image.landmarks["a"].constrain_to_bounds(image.bounds()).points
+    assert_allclose(bordered.pixels[0, 0], 0)
+    assert_allclose(copy.pixels, 0)
+    assert_allclose(image.pixels, 1)
+    assert 0 < constrained.n_true() < 400
+    assert mask.all_true()
+    assert_allclose(points, [[0, 5], [10, 19], [15, 0]])
+    assert_allclose(image.landmarks["a"].points, [[-2, 5], [10, 25], [15, 0]])
@@ -0,0 +1,109 @@
+import numpy as np
+from numpy.testing import assert_allclose
+from pytest import raises
+
+import menpo.io as mio
+from menpo.base import (
+    get_pixel_precision,
+    keep_integer_pixels,
+    pixel_float_dtype,
+    pixel_precision,
+    set_pixel_precision,
+)
+from menpo.feature import es, gaussian_filter, gradient, igo
+from menpo.image import Image, MaskedImage
+from menpo.image.base import normalize_pixels_range
+from menpo.math import as_matrix
+from menpo.transform import Affine
+
+takeo_path = mio.data_path_to("takeo.ppm")
+affine = Affine(np.array([[1.1, 0.1, 2.3], [-0.05, 0.9, 3.7], [0, 0, 1]]))
+
+
+def test_default_pixel_precision():
+    assert get_pixel_precision() == np.float64
+    assert pixel_float_dtype() == np.float64
+    assert not keep_integer_pixels()
+
+
+def test_pixel_precision_restores_previous():
+    with pixel_precision(np.float32):
+        assert get_pixel_precision() == np.float32
+        with pixel_precision("uint8"):
+            assert keep_integer_pixels()
+        assert get_pixel_precision() == np.float32
+    assert get_pixel_precision() == np.float64
+
+
+def test_pixel_precision_restored_on_error():
+    with raises(ZeroDivisionError):
+        with pixel_precision(np.float32):
+            1 / 0
+    assert get_pixel_precision() == np.float64
+
+
+def test_set_pixel_precision_unsupported():
+    with raises(ValueError):
+        set_pixel_precision(np.int32)
+
+
+def test_pixel_float_dtype_preserves_floats():
+    with pixel_precision(np.float32):
+        assert pixel_float_dtype(np.float64) == np.float64
+        assert pixel_float_dtype(np.uint8) == np.float32
+    with pixel_precision(np.uint8):
+        assert pixel_float_dtype() == np.float32
+
+
+def test_normalize_pixels_range_float32():
+    pixels = np.array([[[0, 51, 255]]], dtype=np.uint8)
+    with pixel_precision(np.float32):
+        normalized = normalize_pixels_range(pixels)
+    assert normalized.dtype == np.float32
+    assert_allclose(normalized, [[[0, 0.2, 1]]])
+
+
+def test_init_blank_follows_precision():
+    with pixel_precision(np.float32):
+        assert Image.init_blank((4, 5)).pixels.dtype == np.float32
+        assert MaskedImage.init_blank((4, 5), fill=2).pixels.dtype == np.float32
+        assert Image.init_blank((4, 5), dtype=np.uint8).pixels.dtype == np.uint8
+    assert Image.init_blank((4, 5)).pixels.dtype == np.float64
+
+
+def test_float32_pipeline():
+    with pixel_precision(np.float32):
+        image = mio.import_image(takeo_path)
+        assert image.pixels.dtype == np.float32
+        warped = image.warp_to_shape((50, 60), affine)
+        assert warped.pixels.dtype == np.float32
+        assert image.rescale(0.5).pixels.dtype == np.float32
+        for feature in [gradient, igo, es]:
+            assert feature(warped).pixels.dtype == np.float32
+        assert gaussian_filter(warped, 2).pixels.dtype == np.float32
+        assert as_matrix([warped, warped]).dtype == np.float32
+    # The result matches the double precision pipeline
+    expected = mio.import_image(takeo_path).warp_to_shape((50, 60), affine)
+    assert_allclose(warped.pixels, expected.pixels, atol=1e-5)
+
+
+def test_uint8_pipeline():
+    with pixel_precision(np.uint8):
+        image = mio.import_image(takeo_path)
+        assert image.pixels.dtype == np.uint8
+        warped = image.warp_to_shape((50, 60), affine)
+        assert warped.pixels.dtype == np.uint8
+        assert gaussian_filter(warped, 2).pixels.dtype == np.uint8
+        # Arithmetic requires floating point
+        assert gradient(warped).pixels.dtype == np.float32
+        assert igo(warped).pixels.dtype == np.float32
+        assert as_matrix([warped, warped]).dtype == np.uint8
+        assert as_matrix([warped], dtype=np.float32).dtype == np.float32
+    # Explicit normalisation is still respected
+    with pixel_precision(np.uint8):
+        assert mio.import_image(takeo_path, normalize=True).pixels.dtype == np.float32
+
+
+def test_gradient_uint8_raises_by_default():
+    with raises(TypeError):
+        gradient(Image(np.zeros((1, 5, 5), dtype=np.uint8)))
@@ -1,7 +1,14 @@
 from .base import Transform, TransformChain
 from .homogeneous import *
 from .thinplatesplines import ThinPlateSplines
-from .piecewiseaffine import PiecewiseAffine
+from .piecewiseaffine import (
+    PiecewiseAffine,
+    apply_piecewise_affine,
+    clear_shared_caches,
+    get_shared_cache_memory,
+    set_shared_cache_memory,
+    shared_cache_memory,
+)
 from .rbf import R2LogR2RBF, R2LogRRBF
 from .groupalign.procrustes import GeneralizedProcrustesAnalysis
 from .compositions import (
@@ -1,7 +1,40 @@
 import warnings
+from multiprocessing.pool import ThreadPool
+
 import numpy as np
 
-from menpo.base import Copyable, MenpoDeprecationWarning
+from menpo.base import Copyable, MenpoDeprecationWarning, get_max_transform_memory
+
+
+def _array_key(*arrays):
+    r"""
+    A cheap key for the content of the given arrays, made of their shape,
+    dtype and a strided sample of (at most 64 of) their values. A match of
+    keys must therefore be confirmed by comparing the arrays.
+    """
+    key = []
+    for a in arrays:
+        flat = np.ravel(a)
+        sample = flat[:: max(1, flat.size // 64)]
+        key.append((a.shape, a.dtype.str, sample.tobytes()))
+    return tuple(key)
+
+
+def _map_batches(function, x, batch_size, n_workers=None):
+    r"""
+    Call ``function`` on each batch of ``batch_size`` points of ``x``, in a
+    pool of ``n_workers`` threads if more than one worker is requested. NumPy
+    releases the GIL in most of the operations that transforms perform, so the
+    batches can be processed in parallel. Returns the results in order.
+    """
+    batches = [x[lo : lo + batch_size] for lo in range(0, x.shape[0], batch_size)]
+    if n_workers is None or n_workers <= 1 or len(batches) <= 1:
+        return [function(batch) for batch in batches]
+    pool = ThreadPool(min(n_workers, len(batches)))
+    try:
+        return pool.map(function, batches)
+    finally:
+        pool.close()
 
 
 class Transform(Copyable):
@@ -145,7 +178,7 @@ class Transform(Copyable):
                 "apply_inplace can only be used on Transformable" " objects."
             )
 
-    def apply(self, x, batch_size=None, **kwargs):
+    def apply(self, x, batch_size=None, max_memory=None, n_workers=None, **kwargs):
         r"""
         Applies this transform to ``x``.
 
@@ -168,6 +201,16 @@ class Transform(Copyable):
             array will be passed through the transform at a time. This is
             useful for operations that require large intermediate matrices
             to be computed.
+        max_memory : `int` or ``None``, optional
+            If ``batch_size`` is ``None``, the maximum number of bytes of
+            intermediate results. The batch size is then chosen automatically
+            from the memory that this transform requires per point. If
+            ``None``, the library-wide budget is used (see
+            :map:`set_max_transform_memory`).
+        n_workers : `int` or ``None``, optional
+            If the points are processed in more than one batch, the number of
+            threads that the batches are processed in. If ``None``, the
+            batches are processed one after the other.
         kwargs : `dict`
             Passed through to :meth:`_apply`.
 
@@ -182,22 +225,63 @@ class Transform(Copyable):
             Local closure which calls the :meth:`_apply` method with the
             `kwargs` attached.
             """
-            return self._apply_batched(x_, batch_size, **kwargs)
+            return self._apply_batched(
+                x_,
+                self._batch_size(x_, batch_size, max_memory),
+                n_workers=n_workers,
+                **kwargs,
+            )
 
         try:
             return x._transform(transform)
         except AttributeError:
-            return self._apply_batched(x, batch_size, **kwargs)
+            return self._apply_batched(
+                x,
+                self._batch_size(x, batch_size, max_memory),
+                n_workers=n_workers,
+                **kwargs,
+            )
 
-    def _apply_batched(self, x, batch_size, **kwargs):
+    def _apply_bytes_per_point(self):
+        r"""
+        The (approximate) number of bytes of intermediate results that
+        :meth:`_apply` requires per point, used to choose the batch size for
+        a memory budget.
+
+        Returns
+        -------
+        n_bytes : `int` or ``None``
+            The bytes per point, or ``None`` if :meth:`_apply` does not
+            compute any intermediate results that are large enough to be
+            worth batching (e.g. homogeneous transforms).
+        """
+        return None
+
+    def _batch_size(self, x, batch_size, max_memory):
+        r"""
+        The batch size to apply this transform to ``x`` with - either the
+        given ``batch_size`` or the size that fits the memory budget. ``None``
+        if ``x`` should be transformed in a single batch.
+        """
+        if batch_size is not None:
+            return batch_size
+        if max_memory is None:
+            max_memory = get_max_transform_memory()
+        if max_memory is None or not hasattr(x, "shape"):
+            return None
+        bytes_per_point = self._apply_bytes_per_point()
+        if bytes_per_point is None:
+            return None
+        batch_size = max(int(max_memory // bytes_per_point), 1)
+        return batch_size if batch_size < x.shape[0] else None
+
+    def _apply_batched(self, x, batch_size, n_workers=None, **kwargs):
         if batch_size is None:
             return self._apply(x, **kwargs)
         else:
-            outputs = []
-            n_points = x.shape[0]
-            for lo_ind in range(0, n_points, batch_size):
-                hi_ind = lo_ind + batch_size
-                outputs.append(self._apply(x[lo_ind:hi_ind], **kwargs))
+            outputs = _map_batches(
+                lambda batch: self._apply(batch, **kwargs), x, batch_size, n_workers
+            )
             return np.vstack(outputs)
 
     def compose_before(self, transform):
@@ -290,6 +290,13 @@ class TransformChain(ComposableTransform):
         """
         return reduce(lambda x_i, tr: tr._apply(x_i), self.transforms, x)
 
+    def _apply_bytes_per_point(self):
+        # The transforms are applied one after the other, so only the largest
+        # intermediate results are needed at any one time
+        n_bytes = [t._apply_bytes_per_point() for t in self.transforms]
+        n_bytes = [n for n in n_bytes if n is not None]
+        return max(n_bytes) if n_bytes else None
+
     @property
     def composes_inplace_with(self):
         r"""
@@ -1,2 +1,9 @@
 from .base import CachedPWA as PiecewiseAffine  # the default PWA caches
-from .base import TriangleContainmentError
+from .base import (
+    TriangleContainmentError,
+    apply_piecewise_affine,
+    clear_shared_caches,
+    get_shared_cache_memory,
+    set_shared_cache_memory,
+    shared_cache_memory,
+)
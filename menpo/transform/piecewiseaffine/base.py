@@ -1,7 +1,17 @@
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from threading import RLock
+
 import numpy as np
 from copy import deepcopy
 from menpo.base import Copyable
-from menpo.transform.base import Alignment, Invertible, Transform
+from menpo.transform.base import (
+    Alignment,
+    Invertible,
+    Transform,
+    _array_key,
+    _map_batches,
+)
 
 # TODO View is broken for PWA (TriangleContainmentError)
 
@@ -185,6 +195,206 @@ def barycentric_vectors(points, trilist):
     return x[0], x[1] - x[0], x[2] - x[0]
 
 
+class TriangleGrid(object):
+    r"""
+    A uniform grid over the bounding box of a triangulation that stores, for
+    every cell, the triangles whose bounding box overlaps that cell. Locating
+    the containing triangle of a point then only requires testing the handful
+    of candidate triangles of the cell the point falls in, rather than every
+    triangle of the triangulation. The grid only depends on the source
+    triangulation and is therefore built once per source mesh.
+
+    The containment test uses exactly the same arithmetic as
+    :func:`alpha_beta` and, when a point lies on an edge shared by several
+    triangles, the same (highest index) triangle is chosen as
+    :func:`index_alpha_beta`. The results are therefore identical to the
+    brute force search.
+
+    Parameters
+    ----------
+    points : ``(n_points, 2)`` `ndarray`
+        The vertices of the triangulation.
+    trilist : ``(n_tris, 3)`` `ndarray`
+        The 0-based index triangulation joining the points.
+    cells_per_triangle : `float`, optional
+        The (approximate) number of grid cells to allocate per triangle.
+    """
+
+    def __init__(self, points, trilist, cells_per_triangle=4.0):
+        self.i, self.ij, self.ik = barycentric_vectors(points, trilist)
+        self.dot_jj = np.einsum("dt, dt -> t", self.ij, self.ij)
+        self.dot_kk = np.einsum("dt, dt -> t", self.ik, self.ik)
+        self.dot_jk = np.einsum("dt, dt -> t", self.ij, self.ik)
+        with np.errstate(divide="ignore"):
+            self.d = 1.0 / (self.dot_jj * self.dot_kk - self.dot_jk * self.dot_jk)
+
+        n_tris = trilist.shape[0]
+        tri_points = points[trilist]
+        self.lower = tri_points.reshape(-1, 2).min(axis=0)
+        upper = tri_points.reshape(-1, 2).max(axis=0)
+        extent = upper - self.lower
+        # Points just outside of a triangle can be classified as inside due to
+        # rounding, so allow a small tolerance around every bounding box
+        self.tolerance = 1e-6 * max(extent.max(), 1.0)
+        self.upper = upper + self.tolerance
+        self.lower = self.lower - self.tolerance
+        extent = self.upper - self.lower
+        # Roughly square cells, but never more cells along an axis than
+        # cells overall (which could happen for a very thin triangulation)
+        n_cells = cells_per_triangle * max(n_tris, 1)
+        self.cell_size = max(np.sqrt(extent.prod() / n_cells), extent.max() / n_cells)
+        self.shape = np.ceil(extent / self.cell_size).astype(np.intp)
+
+        # The range of cells that the bounding box of each triangle overlaps
+        tri_lower = self._cell_coordinates(tri_points.min(axis=1) - self.tolerance)
+        tri_upper = self._cell_coordinates(tri_points.max(axis=1) + self.tolerance)
+        tri_shape = tri_upper - tri_lower + 1
+        n_cells = tri_shape.prod(axis=1)
+        # Enumerate every (triangle, cell) pair, keeping the triangles in
+        # ascending order within each cell
+        tri_index = np.repeat(np.arange(n_tris), n_cells)
+        offset = np.arange(tri_index.shape[0]) - np.repeat(
+            np.cumsum(n_cells) - n_cells, n_cells
+        )
+        width = tri_shape[tri_index, 1]
+        rows = tri_lower[tri_index, 0] + offset // width
+        cols = tri_lower[tri_index, 1] + offset % width
+        cell_index = rows * self.shape[1] + cols
+        order = np.argsort(cell_index, kind="stable")
+        self.cell_tris = tri_index[order]
+        self.cell_count = np.bincount(cell_index, minlength=self.shape.prod())
+        self.cell_start = np.cumsum(self.cell_count) - self.cell_count
+
+    @property
+    def n_tris(self):
+        r"""
+        The number of triangles in the grid.
+
+        :type: `int`
+        """
+        return self.d.shape[0]
+
+    @property
+    def nbytes(self):
+        r"""
+        The number of bytes of the arrays of the grid.
+
+        :type: `int`
+        """
+        return sum(
+            a.nbytes
+            for a in (
+                self.i,
+                self.ij,
+                self.ik,
+                self.dot_jj,
+                self.dot_kk,
+                self.dot_jk,
+                self.d,
+                self.cell_tris,
+                self.cell_count,
+                self.cell_start,
+            )
+        )
+
+    @property
+    def bytes_per_point(self):
+        r"""
+        The (approximate) number of bytes of intermediate results that
+        :meth:`index_alpha_beta` requires per point, given the average number
+        of candidate triangles in the cells that contain any triangles.
+
+        :type: `int`
+        """
+        n_candidates = self.cell_tris.size / max(np.count_nonzero(self.cell_count), 1)
+        return int(144 * n_candidates) + 64
+
+    def _cell_coordinates(self, points):
+        cells = np.floor((points - self.lower) / self.cell_size).astype(np.intp)
+        return np.clip(cells, 0, self.shape - 1)
+
+    def candidates(self, points):
+        r"""
+        The candidate triangles for each of the given points, that is the
+        triangles whose bounding box overlaps the grid cell of the point.
+
+        Parameters
+        ----------
+        points : ``(n_points, 2)`` `ndarray`
+            The points to find the candidate triangles of.
+
+        Returns
+        -------
+        point_index : ``(n_candidates,)`` `ndarray`
+            The index of the point each candidate belongs to, in ascending
+            order.
+        tri_index : ``(n_candidates,)`` `ndarray`
+            The index of each candidate triangle. The triangles of each point
+            are in ascending order.
+        """
+        in_grid = np.all(
+            np.logical_and(points >= self.lower, points <= self.upper), axis=1
+        )
+        cells = np.zeros(points.shape[0], dtype=np.intp)
+        cell_coords = self._cell_coordinates(points[in_grid])
+        cells[in_grid] = cell_coords[:, 0] * self.shape[1] + cell_coords[:, 1]
+        counts = np.where(in_grid, self.cell_count[cells], 0)
+        point_index = np.repeat(np.arange(points.shape[0]), counts)
+        offset = np.arange(point_index.shape[0]) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        tri_index = self.cell_tris[self.cell_start[cells[point_index]] + offset]
+        return point_index, tri_index
+
+    def index_alpha_beta(self, points):
+        r"""
+        Finds for each input point the index of its bounding triangle and the
+        `alpha` and `beta` value for that point in the triangle. See
+        :func:`index_alpha_beta` for more information.
+
+        Parameters
+        ----------
+        points : ``(n_points, 2)`` `ndarray`
+            Points to calculate the barycentric coordinates for.
+
+        Returns
+        -------
+        tri_index : ``(n_points,)`` `ndarray`
+            Triangle index for each of the `points`, assigning each point to
+            its containing triangle.
+        alpha : ``(n_points,)`` `ndarray`
+            Alpha for containing triangle of each point.
+        beta : ``(n_points,)`` `ndarray`
+            Beta for containing triangle of each point.
+
+        Raises
+        ------
+        TriangleContainmentError
+            All `points` must be contained in a source triangle. Check
+            `error.points_outside_source_domain` to handle this case.
+        """
+        point_index, tri_index = self.candidates(points)
+        # Exactly the same arithmetic as alpha_beta, for each candidate only
+        ip = points[point_index].T - self.i[:, tri_index]
+        ij, ik = self.ij[:, tri_index], self.ik[:, tri_index]
+        dot_pj = ip[0] * ij[0] + ip[1] * ij[1]
+        dot_pk = ip[0] * ik[0] + ip[1] * ik[1]
+        d = self.d[tri_index]
+        alpha = (self.dot_kk[tri_index] * dot_pj - self.dot_jk[tri_index] * dot_pk) * d
+        beta = (self.dot_jj[tri_index] * dot_pk - self.dot_jk[tri_index] * dot_pj) * d
+        contained = np.flatnonzero(
+            np.logical_and(np.logical_and(alpha >= 0, beta >= 0), alpha + beta <= 1)
+        )
+        contained_point = point_index[contained]
+        in_a_triangle = np.zeros(points.shape[0], dtype=bool)
+        in_a_triangle[contained_point] = True
+        if not np.all(in_a_triangle):
+            raise TriangleContainmentError(~in_a_triangle)
+        # Choose the last (highest index) containing triangle of each point
+        last = contained[np.diff(np.append(contained_point, -1)) != 0]
+        return tri_index[last].astype(np.uint32), alpha[last], beta[last]
+
+
 # Note we inherit from Alignment first to get it's n_dims behavior
 class AbstractPWA(Alignment, Transform, Invertible):
     r"""
@@ -284,7 +494,7 @@ class AbstractPWA(Alignment, Transform, Invertible):
             + beta[:, None] * self.tik[tri_index]
         )
 
-    def _apply_batched(self, x, batch_size, **kwargs):
+    def _apply_batched(self, x, batch_size, n_workers=None, **kwargs):
         # This is a rare case where we need to override the batched apply
         # method. In this case, we override it because we want to the
         # possibly raised TriangleContainmentError to contain ALL the points
@@ -292,27 +502,28 @@ class AbstractPWA(Alignment, Transform, Invertible):
         if batch_size is None:
             return self._apply(x, **kwargs)
         else:
-            outputs = []
-            points_outside_source_domain = []
-            n_points = x.shape[0]
-            exception_thrown = False
-            for lo_ind in range(0, n_points, batch_size):
+
+            def apply_batch(batch):
                 try:
-                    hi_ind = lo_ind + batch_size
-                    outputs.append(self._apply(x[lo_ind:hi_ind], **kwargs))
+                    return self._apply(batch, **kwargs), None
                 except TriangleContainmentError as e:
-                    exception_thrown = True
-                    points_outside_source_domain.append(e.points_outside_source_domain)
-                else:
-                    # No exception was thrown, so all points were inside
-                    points_outside_source_domain.append(
-                        np.zeros(batch_size, dtype=np.bool)
+                    return None, e.points_outside_source_domain
+
+            results = _map_batches(apply_batch, x, batch_size, n_workers)
+            if any(outside is not None for _, outside in results):
+                # Points of the batches without exception were all inside
+                raise TriangleContainmentError(
+                    np.hstack(
+                        [
+                            np.zeros(output.shape[0], dtype=bool)
+                            if outside is None
+                            else outside
+                            for output, outside in results
+                        ]
                     )
-
-            if exception_thrown:
-                raise TriangleContainmentError(np.hstack(points_outside_source_domain))
+                )
             else:
-                return np.vstack(outputs)
+                return np.vstack([output for output, _ in results])
 
     def index_alpha_beta(self, points):
         """
@@ -380,26 +591,407 @@ class AbstractPWA(Alignment, Transform, Invertible):
 class PythonPWA(AbstractPWA):
     def __init__(self, source, target):
         super(PythonPWA, self).__init__(source, target)
-        si, sij, sik = barycentric_vectors(self.source.points, self.trilist)
-        self.s, self.sij, self.sik = si, sij, sik
+        self._grid = self._triangle_grid()
+        self.s, self.sij, self.sik = self._grid.i, self._grid.ij, self._grid.ik
+
+    def _triangle_grid(self):
+        # The grid only depends on the source, so is built once here
+        return TriangleGrid(self.source.points, self.trilist)
 
     def index_alpha_beta(self, points):
-        return index_alpha_beta(self.s, self.sij, self.sik, points)
+        return self._grid.index_alpha_beta(points)
 
+    def _apply_bytes_per_point(self):
+        return self._grid.bytes_per_point
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "max_entries", "n_entries"])
+CacheInfo.__doc__ = r"""
+The statistics of an :class:`IndexAlphaBetaCache`, in the same spirit as
+:func:`functools.lru_cache`.
+"""
 
-class CachedPWA(PythonPWA):
-    def __init__(self, source, target):
-        super(CachedPWA, self).__init__(source, target)
-        self._applied_points, self._iab = None, None
+
+class IndexAlphaBetaCache(object):
+    r"""
+    A bounded, least recently used cache of the results of
+    :meth:`TriangleGrid.index_alpha_beta` for a single source triangulation.
+    Entries are keyed by a cheap summary of the query points, confirmed by an
+    exact comparison with the points of the entry, so that a number of
+    different templates (e.g. one per level of a pyramid) can be
+    interleaved without evicting each other.
+
+    Parameters
+    ----------
+    grid : :class:`TriangleGrid`
+        The grid of the source triangulation.
+    max_entries : `int`, optional
+        The maximum number of point sets that are cached.
+    max_bytes : `int` or ``None``, optional
+        The maximum number of bytes of the grid and the cached entries
+        together. If ``None``, only the number of entries is bounded.
+    """
+
+    def __init__(self, grid, max_entries=8, max_bytes=None):
+        self.grid = grid
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits, self.misses = 0, 0
+        self._entries = OrderedDict()
+        self._entries_nbytes = 0
+        # Set if the cache is shared (see shared_index_alpha_beta_cache)
+        self._shared_key = None
+        self.evicted = False
+
+    @property
+    def nbytes(self):
+        r"""
+        The number of bytes of the grid and the cached entries.
+
+        :type: `int`
+        """
+        return self.grid.nbytes + self._entries_nbytes
 
     def index_alpha_beta(self, points):
+        r"""
+        The cached :meth:`TriangleGrid.index_alpha_beta` of the given points,
+        computed and cached if they have not been seen recently.
+        """
+        key = _array_key(points)
+        with _CACHE_LOCK:
+            entry = self._entries.get(key)
+        if entry is not None and np.array_equal(entry[0], points):
+            hit = True
+        else:
+            hit = False
+            # This must happen first in case index_alpha_beta throws a
+            # TriangleContainmentError. It happens outside of the lock, so
+            # that several threads can locate points at once.
+            entry = (np.array(points), self.grid.index_alpha_beta(points))
+        with _CACHE_LOCK:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._entries_nbytes -= _entry_nbytes(previous)
+            # Insert as the most recently used entry
+            self._entries[key] = entry
+            self._entries_nbytes += _entry_nbytes(entry)
+            self._trim()
+            if _SHARED_CACHES.get(self._shared_key) is self:
+                _trim_shared_caches(keep=self)
+        return entry[1]
+
+    def _trim(self):
+        # Must be called with _CACHE_LOCK held
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            self._entries_nbytes -= _entry_nbytes(self._entries.popitem(last=False)[1])
+
+    def cache_info(self):
+        r"""
+        The hit and miss counters and the size of this cache.
+
+        :type: :class:`CacheInfo`
+        """
+        return CacheInfo(self.hits, self.misses, self.max_entries, len(self._entries))
+
+    def clear(self):
+        r"""
+        Discard all of the cached entries and reset the counters.
+        """
+        with _CACHE_LOCK:
+            self._entries.clear()
+            self._entries_nbytes = 0
+            self.hits, self.misses = 0, 0
+
+    def _evict(self):
+        # Must be called with _CACHE_LOCK held. Transforms may still refer to
+        # the cache, so it must stop storing entries to stay within budget.
+        self.clear()
+        self.max_entries = 0
+        self.evicted = True
+
+
+def _entry_nbytes(entry):
+    points, (tri_index, alpha, beta) = entry
+    return points.nbytes + tri_index.nbytes + alpha.nbytes + beta.nbytes
+
+
+# The caches shared between all CachedPWA with the same source triangulation.
+# The lock guards them and the entries of every cache, which may be used by
+# several threads at once (e.g. Transform.apply with n_workers).
+_CACHE_LOCK = RLock()
+_SHARED_CACHES = OrderedDict()
+_MAX_SHARED_CACHES = 16
+_shared_cache_memory = [64 * 2 ** 20]
+
+
+def get_shared_cache_memory():
+    r"""
+    The memory budget of the caches shared by piecewise affine transforms
+    (see :map:`set_shared_cache_memory`).
+
+    Returns
+    -------
+    n_bytes : `int`
+        The maximum number of bytes of all of the shared caches together.
+        ``0`` if caching is disabled.
+    """
+    return _shared_cache_memory[0]
+
+
+def set_shared_cache_memory(n_bytes):
+    r"""
+    Set the memory budget of the caches shared by piecewise affine transforms,
+    which is 64 MB by default. :map:`PiecewiseAffine` caches the triangle
+    index and barycentric coordinates of the points it is applied to, shared
+    by every transform with the same source triangulation (see
+    :map:`apply_piecewise_affine`). When the caches of all triangulations
+    together exceed the budget, the entries of the least recently used
+    triangulations are discarded first. A budget of ``0`` disables caching,
+    in which case every transform locates the points anew.
+
+    Parameters
+    ----------
+    n_bytes : `int`
+        The maximum number of bytes of all of the shared caches together, or
+        ``0`` to disable caching.
+
+    Raises
+    ------
+    ValueError
+        If ``n_bytes`` is negative.
+    """
+    if n_bytes < 0:
+        raise ValueError(
+            "The memory budget must not be negative, not {}".format(n_bytes)
+        )
+    with _CACHE_LOCK:
+        _shared_cache_memory[0] = int(n_bytes)
+        for cache in _SHARED_CACHES.values():
+            cache.max_bytes = _shared_cache_memory[0]
+            cache._trim()
+        _trim_shared_caches()
+
+
+@contextmanager
+def shared_cache_memory(n_bytes):
+    r"""
+    Context manager that sets the memory budget of the caches shared by
+    piecewise affine transforms (see :map:`set_shared_cache_memory`) for the
+    duration of a ``with`` block, restoring the previous budget afterwards.
+    ::
+
+        with shared_cache_memory(0):
+            warped = image.warp_to_mask(mask, pwa)
+
+    Parameters
+    ----------
+    n_bytes : `int`
+        The maximum number of bytes of all of the shared caches together, or
+        ``0`` to disable caching.
+
+    Raises
+    ------
+    ValueError
+        If ``n_bytes`` is negative.
+    """
+    previous = get_shared_cache_memory()
+    set_shared_cache_memory(n_bytes)
+    try:
+        yield
+    finally:
+        set_shared_cache_memory(previous)
+
+
+def clear_shared_caches():
+    r"""
+    Discard the caches shared by piecewise affine transforms (see
+    :map:`set_shared_cache_memory`), releasing their memory. Transforms that
+    already exist start sharing a new cache the next time they are applied.
+    """
+    with _CACHE_LOCK:
+        for cache in _SHARED_CACHES.values():
+            cache._evict()
+        _SHARED_CACHES.clear()
+
+
+def _trim_shared_caches(keep=None):
+    # Must be called with _CACHE_LOCK held. Discard the least recently used
+    # triangulations until the budget is met. The cache that is being used
+    # (keep) is bounded by its own max_bytes.
+    total = sum(cache.nbytes for cache in _SHARED_CACHES.values())
+    for key in list(_SHARED_CACHES):
         if (
-            self._applied_points is None
-            or not points.shape == self._applied_points.shape
-            or not np.allclose(points, self._applied_points)
+            total <= _shared_cache_memory[0]
+            and len(_SHARED_CACHES) <= _MAX_SHARED_CACHES
         ):
-            # This must happen first in case index_alpha_beta throws a
-            # TriangleContainmentError
-            self._iab = PythonPWA.index_alpha_beta(self, points)
-            self._applied_points = points
-        return self._iab
+            break
+        cache = _SHARED_CACHES[key]
+        if cache is keep:
+            continue
+        del _SHARED_CACHES[key]
+        total -= cache.nbytes
+        cache._evict()
+
+
+def shared_index_alpha_beta_cache(points, trilist, grid=None):
+    r"""
+    The :class:`IndexAlphaBetaCache` (and therefore :class:`TriangleGrid`)
+    shared by every :class:`CachedPWA` with the given source triangulation.
+    The caches are bounded by memory (see :map:`set_shared_cache_memory`)
+    and a bounded number of triangulations is kept, the least recently used
+    being discarded first. A discarded cache stops storing entries, even if
+    transforms still refer to it. If caching is disabled, a new cache that
+    never keeps any entries is returned.
+
+    Parameters
+    ----------
+    points : ``(n_points, 2)`` `ndarray`
+        The vertices of the source triangulation.
+    trilist : ``(n_tris, 3)`` `ndarray`
+        The 0-based index triangulation joining the points.
+    grid : :class:`TriangleGrid` or ``None``, optional
+        The grid of the triangulation, if it has already been built. It is
+        used if a new cache has to be created.
+
+    Returns
+    -------
+    cache : :class:`IndexAlphaBetaCache`
+        The cache of the triangulation.
+    """
+    if _shared_cache_memory[0] == 0:
+        if grid is None:
+            grid = TriangleGrid(points, trilist)
+        return IndexAlphaBetaCache(grid, max_entries=0)
+    key = _array_key(points, trilist)
+    with _CACHE_LOCK:
+        cache = _SHARED_CACHES.get(key)
+        if (
+            cache is None
+            or not np.array_equal(cache.points, points)
+            or not np.array_equal(cache.trilist, trilist)
+        ):
+            if grid is None:
+                grid = TriangleGrid(points, trilist)
+            cache = IndexAlphaBetaCache(grid, max_bytes=_shared_cache_memory[0])
+            cache.points, cache.trilist = np.array(points), np.array(trilist)
+            cache._shared_key = key
+            _SHARED_CACHES[key] = cache
+        _SHARED_CACHES.move_to_end(key)
+        _trim_shared_caches(keep=cache)
+    return cache
+
+
+class CachedPWA(PythonPWA):
+    r"""
+    A :class:`PythonPWA` that caches the triangle index and barycentric
+    coordinates of the most recently applied point sets. The cache is shared
+    by all instances with the same source triangulation (see
+    :func:`shared_index_alpha_beta_cache`), so e.g. the transforms of every
+    fitting iteration, which only differ in their target, reuse the same
+    entries.
+    """
+
+    def _triangle_grid(self):
+        self._cache = shared_index_alpha_beta_cache(self.source.points, self.trilist)
+        return self._cache.grid
+
+    def index_alpha_beta(self, points):
+        if self._cache.evicted:
+            # The shared cache has been discarded, so share a new one
+            self._cache = shared_index_alpha_beta_cache(
+                self.source.points, self.trilist, grid=self._grid
+            )
+        return self._cache.index_alpha_beta(points)
+
+    def cache_info(self):
+        r"""
+        The hit and miss counters and the size of the (shared) cache of this
+        transform.
+
+        :type: :class:`CacheInfo`
+        """
+        return self._cache.cache_info()
+
+
+# The number of elements of each temporary array in apply_piecewise_affine
+_APPLY_BATCH_ELEMENTS = 2 ** 18
+
+
+def apply_piecewise_affine(source, points, targets, batch_size=None):
+    r"""
+    Apply the piecewise affine transforms from a single `source` to each of
+    many `targets` to the same `points`, as in e.g. model fitting or data
+    augmentation. The containing triangle and barycentric coordinates of the
+    points are only located once (and are cached, see :map:`PiecewiseAffine`)
+    and all the targets are then warped in a single vectorized operation.
+    The result for each target is identical to that of
+    ``PiecewiseAffine(source, target).apply(points)``.
+
+    Parameters
+    ----------
+    source : :map:`PointCloud` or :map:`TriMesh`
+        The source points. If a TriMesh is provided, the triangulation on
+        the TriMesh is used. If a PointCloud is provided, a Delaunay
+        triangulation of the source is performed automatically.
+    points : ``(n_points, 2)`` `ndarray`
+        The points to apply the transforms to.
+    targets : ``(n_targets, n_source_points, 2)`` `ndarray` or `list` of :map:`PointCloud`
+        The targets of the transforms.
+    batch_size : `int` or ``None``, optional
+        The targets are warped in batches of this size, bounding the size of
+        the temporary arrays. If ``None``, a batch size is chosen such that
+        the temporary arrays of each batch stay small (a few MB), which is
+        faster than warping all targets at once.
+
+    Returns
+    -------
+    warped : ``(n_targets, n_points, 2)`` `ndarray`
+        The points transformed by each of the transforms.
+
+    Raises
+    ------
+    ValueError
+        If the targets do not match the source in shape.
+    TriangleContainmentError
+        All `points` must be contained in a source triangle. Check
+        `error.points_outside_source_domain` to handle this case.
+    """
+    from menpo.shape import TriMesh  # to avoid circular import
+
+    if not isinstance(source, TriMesh):
+        source = TriMesh(source.points)
+    if not isinstance(targets, np.ndarray):
+        targets = np.array([t.points for t in targets])
+    if targets.ndim != 3 or targets.shape[1:] != source.points.shape:
+        raise ValueError(
+            "targets must be of shape (n_targets, {}, {}), not {}".format(
+                *(source.points.shape + (targets.shape,))
+            )
+        )
+    iab = shared_index_alpha_beta_cache(source.points, source.trilist)
+    tri_index, alpha, beta = iab.index_alpha_beta(points)
+    # The vertices of the containing triangle of each point
+    i, j, k = source.trilist[tri_index].T
+    alpha, beta = alpha[:, None], beta[:, None]
+
+    n_targets, n_points = targets.shape[0], points.shape[0]
+    if batch_size is None:
+        batch_size = max(_APPLY_BATCH_ELEMENTS // (2 * max(n_points, 1)), 1)
+    warped = np.empty((n_targets,) + points.shape, dtype=np.float64)
+    for lo in range(0, n_targets, batch_size):
+        t = targets[lo : lo + batch_size]
+        # (n_source_points, n_batch * 2), so that gathering the vertices of
+        # the triangles copies whole contiguous rows
+        t = np.ascontiguousarray(t.transpose(1, 0, 2)).reshape(t.shape[1], -1)
+        ti = t[i]
+        # Exactly the same arithmetic as PiecewiseAffine.apply
+        w = ti + alpha * (t[j] - ti) + beta * (t[k] - ti)
+        warped[lo : lo + batch_size] = w.reshape(n_points, -1, 2).transpose(1, 0, 2)
+    return warped
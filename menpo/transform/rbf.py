@@ -48,6 +48,10 @@ class RadialBasisFunction(Transform):
         """
         return self.n_centres
 
+    def _apply_bytes_per_point(self):
+        # The distances, the basis and the temporaries of computing it
+        return 40 * self.n_centres
+
 
 class R2LogR2RBF(RadialBasisFunction):
     r"""
@@ -3,6 +3,11 @@ from numpy.testing import assert_allclose
 from pytest import raises
 from mock import Mock
 
+from menpo.base import (
+    get_max_transform_memory,
+    max_transform_memory,
+    set_max_transform_memory,
+)
 from menpo.transform import Transform
 
 
@@ -80,3 +85,65 @@ def test_transform_compose_after():
     assert len(chain.transforms) == 2
     assert chain.transforms[0] is mocked
     assert chain.transforms[1] is tr
+
+
+class BatchCountingTransform(Transform):
+    def __init__(self, bytes_per_point):
+        self.bytes_per_point = bytes_per_point
+        self.batch_sizes = []
+
+    def _apply(self, x, **kwargs):
+        self.batch_sizes.append(x.shape[0])
+        return x * 2
+
+    def _apply_bytes_per_point(self):
+        return self.bytes_per_point
+
+
+def test_transform_apply_max_memory_batches():
+    tr = BatchCountingTransform(100)
+    points = np.arange(50.0).reshape([25, 2])
+    result = tr.apply(points, max_memory=1000)
+    assert tr.batch_sizes == [10, 10, 5]
+    assert_allclose(result, points * 2)
+
+
+def test_transform_apply_max_memory_fits_single_batch():
+    tr = BatchCountingTransform(100)
+    tr.apply(np.zeros([25, 2]), max_memory=10 ** 6)
+    assert tr.batch_sizes == [25]
+
+
+def test_transform_apply_max_memory_explicit_batch_size():
+    tr = BatchCountingTransform(100)
+    tr.apply(np.zeros([25, 2]), batch_size=20, max_memory=1000)
+    assert tr.batch_sizes == [20, 5]
+
+
+def test_transform_apply_max_memory_no_footprint():
+    tr = MockTransform()
+    assert_allclose(tr.apply(x, max_memory=1), x)
+
+
+def test_transform_apply_global_max_memory():
+    tr = BatchCountingTransform(100)
+    points = np.zeros([25, 2])
+    with max_transform_memory(1000):
+        assert get_max_transform_memory() == 1000
+        tr.apply(points)
+    assert get_max_transform_memory() is None
+    tr.apply(points)
+    assert tr.batch_sizes == [10, 10, 5, 25]
+
+
+def test_transform_apply_n_workers():
+    tr = BatchCountingTransform(100)
+    points = np.arange(50.0).reshape([25, 2])
+    result = tr.apply(points, max_memory=1000, n_workers=2)
+    assert sorted(tr.batch_sizes) == [5, 10, 10]
+    assert_allclose(result, points * 2)
+
+
+def test_set_max_transform_memory_invalid_raises():
+    with raises(ValueError):
+        set_max_transform_memory(0)
@@ -1,6 +1,26 @@
-import menpo
+import numpy as np
 from numpy.testing import assert_equal
-from menpo.transform.piecewiseaffine.base import CachedPWA, PythonPWA
+from pytest import raises
+
+import menpo
+from menpo.shape import PointCloud, TriMesh
+from menpo.transform.piecewiseaffine.base import (
+    CachedPWA,
+    PythonPWA,
+    TriangleContainmentError,
+    TriangleGrid,
+    _entry_nbytes,
+    index_alpha_beta,
+    shared_index_alpha_beta_cache,
+)
+from menpo.transform import (
+    PiecewiseAffine,
+    apply_piecewise_affine,
+    clear_shared_caches,
+    get_shared_cache_memory,
+    set_shared_cache_memory,
+    shared_cache_memory,
+)
 
 b = menpo.io.import_builtin_asset("breakingbad.jpg").as_masked()
 b = b.crop_to_landmarks_proportion(0.1)
@@ -38,3 +58,220 @@ def test_cached_pwa_forgets_cache():
     # should clear cache and be fine
     r2 = cached_pwa.apply(points)
     assert_equal(r1, r2)
+
+
+def _brute_force_index_alpha_beta(grid, points):
+    try:
+        return index_alpha_beta(grid.i, grid.ij, grid.ik, points)
+    except TriangleContainmentError as e:
+        return e.points_outside_source_domain
+
+
+def _grid_index_alpha_beta(grid, points):
+    try:
+        return grid.index_alpha_beta(points)
+    except TriangleContainmentError as e:
+        return e.points_outside_source_domain
+
+
+def test_triangle_grid_same_as_brute_force():
+    rng = np.random.RandomState(1)
+    for scale in [1, 2, 10]:
+        # rounded vertices put many of the tested points on triangle edges
+        src = np.round(rng.rand(30, 2) * 20 * scale) / scale
+        mesh = TriMesh(src)
+        grid = TriangleGrid(mesh.points, mesh.trilist)
+        pixels = np.mgrid[-1:22, -1:22].reshape(2, -1).T.astype(np.float64)
+        inside = ~_brute_force_index_alpha_beta(grid, pixels)
+        assert_equal(
+            _grid_index_alpha_beta(grid, pixels),
+            _brute_force_index_alpha_beta(grid, pixels),
+        )
+        for r_grid, r_brute in zip(
+            _grid_index_alpha_beta(grid, pixels[inside]),
+            _brute_force_index_alpha_beta(grid, pixels[inside]),
+        ):
+            assert r_grid.dtype == r_brute.dtype
+            assert_equal(r_grid, r_brute)
+
+
+def test_pwa_points_outside_source_domain():
+    python_pwa = PythonPWA(src, tgt)
+    outside = np.array([[-1000.0, -1000.0], [np.nan, 0.0]])
+    with raises(TriangleContainmentError) as e:
+        python_pwa.apply(np.vstack([points, outside]))
+    expected = np.zeros(points.shape[0] + 2, dtype=bool)
+    expected[-2:] = True
+    assert_equal(e.value.points_outside_source_domain, expected)
+
+
+def test_cached_pwa_interleaved_point_sets_hit():
+    cached_pwa = CachedPWA(src, tgt)
+    cached_pwa._cache.clear()
+    small = points[::2].copy()
+    r1, r2 = cached_pwa.apply(points), cached_pwa.apply(small)
+    for _ in range(3):
+        assert_equal(cached_pwa.apply(points), r1)
+        assert_equal(cached_pwa.apply(small), r2)
+    info = cached_pwa.cache_info()
+    assert info.misses == 2
+    assert info.hits == 6
+    assert info.n_entries == 2
+
+
+def test_cached_pwa_cache_exact_match():
+    cached_pwa = CachedPWA(src, tgt)
+    r1 = cached_pwa.apply(points)
+    moved = points + 1e-9
+    assert_equal(cached_pwa.apply(moved), PythonPWA(src, tgt).apply(moved))
+    assert_equal(cached_pwa.apply(points), r1)
+
+
+def test_cached_pwa_cache_bounded():
+    cached_pwa = CachedPWA(src, tgt)
+    cache = cached_pwa._cache
+    cache.clear()
+    for i in range(cache.max_entries + 3):
+        cached_pwa.apply(points[i:])
+    assert cached_pwa.cache_info().n_entries == cache.max_entries
+    # the least recently used entry has been discarded
+    cached_pwa.apply(points)
+    assert cached_pwa.cache_info().hits == 0
+
+
+def test_cached_pwa_cache_shared_by_source():
+    pwa_1 = CachedPWA(src, tgt)
+    pwa_2 = CachedPWA(src.copy(), tgt.copy())
+    assert pwa_1._cache is pwa_2._cache
+    pwa_3 = CachedPWA(src, PointCloud(tgt.points * 1.1))
+    assert pwa_3.pseudoinverse()._cache is not pwa_1._cache
+    assert shared_index_alpha_beta_cache(src.points, pwa_1.trilist) is pwa_1._cache
+
+
+def test_shared_caches_bounded_by_memory():
+    clear_shared_caches()
+    cached_pwa = CachedPWA(src, tgt)
+    cache = cached_pwa._cache
+    # room for the grid and a single entry
+    budget = cache.nbytes + points.nbytes * 3
+    with shared_cache_memory(budget):
+        for i in range(4):
+            cached_pwa.apply(points[i:])
+        assert cache.nbytes <= budget
+        assert cached_pwa.cache_info().n_entries == 1
+        # a second triangulation evicts the least recently used one
+        other = CachedPWA(TriMesh(src.points * 2.0), tgt)
+        other.apply(points * 2.0)
+        assert (
+            shared_index_alpha_beta_cache(other.source.points, other.trilist)
+            is other._cache
+        )
+        assert cached_pwa.cache_info().n_entries == 0
+    clear_shared_caches()
+
+
+def test_shared_caches_budget_includes_live_transforms():
+    clear_shared_caches()
+    budget = 4 * 2 ** 20
+    with shared_cache_memory(budget):
+        pwas = [
+            CachedPWA(TriMesh(src.points * (1.0 + i / 10.0)), tgt) for i in range(20)
+        ]
+        # the second round applies transforms whose cache was evicted
+        for _ in range(2):
+            for i, pwa in enumerate(pwas):
+                pwa.apply(points * (1.0 + i / 10.0))
+                pwa.apply(points[::2] * (1.0 + i / 10.0))
+        caches = {id(pwa._cache): pwa._cache for pwa in pwas}.values()
+        # evicted caches held by live transforms no longer keep entries
+        assert sum(c._entries_nbytes for c in caches) <= budget
+        evicted = [pwa for pwa in pwas if pwa._cache.evicted]
+        assert len(evicted) > 0
+        # and share a new cache when they are next applied
+        pwa = evicted[0]
+        pwa.apply(pwa.source.points[:3])
+        assert not pwa._cache.evicted
+        assert pwa.cache_info().n_entries == 1
+    clear_shared_caches()
+
+
+def test_shared_cache_threads_keep_bookkeeping_consistent():
+    clear_shared_caches()
+    cached_pwa = CachedPWA(src, tgt)
+    for _ in range(3):
+        cached_pwa.apply(points, batch_size=50, n_workers=4)
+    cache = cached_pwa._cache
+    assert cache._entries_nbytes == sum(
+        _entry_nbytes(e) for e in cache._entries.values()
+    )
+    assert cache.hits + cache.misses == 3 * int(np.ceil(points.shape[0] / 50))
+    clear_shared_caches()
+
+
+def test_clear_shared_caches():
+    cached_pwa = CachedPWA(src, tgt)
+    cached_pwa.apply(points)
+    clear_shared_caches()
+    assert cached_pwa.cache_info().n_entries == 0
+    assert CachedPWA(src, tgt)._cache is not cached_pwa._cache
+    # the transform keeps working
+    assert_equal(cached_pwa.apply(points), PythonPWA(src, tgt).apply(points))
+
+
+def test_shared_caches_disabled():
+    with shared_cache_memory(0):
+        assert get_shared_cache_memory() == 0
+        pwa_1, pwa_2 = CachedPWA(src, tgt), CachedPWA(src, tgt)
+        assert pwa_1._cache is not pwa_2._cache
+        assert_equal(pwa_1.apply(points), PythonPWA(src, tgt).apply(points))
+        assert pwa_1.cache_info().n_entries == 0
+
+
+def test_set_shared_cache_memory_negative_raises():
+    with raises(ValueError):
+        set_shared_cache_memory(-1)
+
+
+def _random_targets(n_targets):
+    rng = np.random.RandomState(2)
+    return tgt.points + rng.randn(n_targets, tgt.n_points, 2)
+
+
+def test_apply_piecewise_affine_same_as_pwa():
+    targets = _random_targets(5)
+    warped = apply_piecewise_affine(src, points, targets)
+    assert warped.shape == (5,) + points.shape
+    for target, w in zip(targets, warped):
+        assert_equal(w, PiecewiseAffine(src, PointCloud(target)).apply(points))
+
+
+def test_apply_piecewise_affine_batch_size_and_pointclouds():
+    targets = _random_targets(7)
+    warped = apply_piecewise_affine(src, points, targets)
+    pointclouds = [PointCloud(t) for t in targets]
+    assert_equal(apply_piecewise_affine(src, points, pointclouds, batch_size=3), warped)
+
+
+def test_apply_piecewise_affine_wrong_targets_shape_raises():
+    with raises(ValueError):
+        apply_piecewise_affine(src, points, tgt.points)
+
+
+def test_apply_piecewise_affine_points_outside_raises():
+    with raises(TriangleContainmentError):
+        apply_piecewise_affine(src, np.array([[-1000.0, 0.0]]), _random_targets(2))
+
+
+def test_pwa_apply_max_memory_points_outside_source_domain():
+    python_pwa = PythonPWA(src, tgt)
+    outside = np.array([[-1000.0, -1000.0]])
+    all_points = np.vstack([outside, points, outside])
+    max_memory = 100 * python_pwa._apply_bytes_per_point()
+    with raises(TriangleContainmentError) as e:
+        python_pwa.apply(all_points, max_memory=max_memory, n_workers=2)
+    expected = np.zeros(all_points.shape[0], dtype=bool)
+    expected[[0, -1]] = True
+    assert_equal(e.value.points_outside_source_domain, expected)
+    assert_equal(
+        python_pwa.apply(points, max_memory=max_memory), python_pwa.apply(points)
+    )
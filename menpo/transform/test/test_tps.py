@@ -1,5 +1,6 @@
 import numpy as np
 from numpy.testing import assert_allclose
+from mock import patch
 
 from menpo.transform.thinplatesplines import ThinPlateSplines
 from menpo.shape import PointCloud
@@ -58,3 +59,51 @@ def test_tps_apply_batched():
     result = tps.apply(pts, batch_size=2)
     expected = np.array([[-0.2, -2.0], [-1.0, 2.0], [4.2, -5.0]])
     assert_allclose(result.points, expected)
+
+
+def test_tps_set_target_reuses_inverse():
+    tps = ThinPlateSplines(src, tgt)
+    with patch("numpy.linalg.svd") as svd:
+        tps.set_target(tgt_perturbed)
+    svd.assert_not_called()
+    expected = ThinPlateSplines(src, tgt_perturbed)
+    assert_allclose(tps.coefficients, expected.coefficients)
+    assert_allclose(
+        tps.apply(square_sample_points), expected.apply(square_sample_points)
+    )
+
+
+def test_tps_cache_kernel_same_as_uncached():
+    tps = ThinPlateSplines(src, tgt, cache_kernel=True)
+    for target in [tgt_perturbed, tgt, tgt_perturbed]:
+        tps.set_target(target)
+        expected = ThinPlateSplines(src, target).apply(square_sample_points)
+        assert_allclose(tps.apply(square_sample_points), expected)
+    assert len(tps._kernel_cache) == 1
+
+
+def test_tps_cache_kernel_hit():
+    tps = ThinPlateSplines(src, tgt_perturbed, cache_kernel=True)
+    tps.apply(square_sample_points)
+    with patch.object(tps.kernel, "apply", wraps=tps.kernel.apply) as kernel_apply:
+        tps.apply(square_sample_points)
+        kernel_apply.assert_not_called()
+        tps.apply(square_sample_points[::2])
+        kernel_apply.assert_called_once()
+
+
+def test_tps_cache_kernel_bounded():
+    tps = ThinPlateSplines(src, tgt_perturbed, cache_kernel=True)
+    for i in range(tps._max_cached_kernels + 2):
+        tps.apply(square_sample_points[i:])
+    assert len(tps._kernel_cache) == tps._max_cached_kernels
+    tps.clear_kernel_cache()
+    assert len(tps._kernel_cache) == 0
+
+
+def test_tps_apply_max_memory_same_as_unbatched():
+    tps = ThinPlateSplines(src, tgt_perturbed)
+    expected = tps.apply(square_sample_points)
+    # a few hundred points per batch
+    max_memory = 300 * tps._apply_bytes_per_point()
+    assert_allclose(tps.apply(square_sample_points, max_memory=max_memory), expected)
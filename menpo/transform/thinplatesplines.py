@@ -1,5 +1,7 @@
+from collections import OrderedDict
+
 import numpy as np
-from .base import Transform, Alignment, Invertible
+from .base import Transform, Alignment, Invertible, _array_key
 from .rbf import R2LogR2RBF
 
 
@@ -25,6 +27,11 @@ class ThinPlateSplines(Alignment, Transform, Invertible):
         matrix is rank deficient, and therefore not invertible. Therefore, we
         only take the inverse on the full-rank matrix and drop any singular
         values that are less than this value (close to zero).
+    cache_kernel : `bool`, optional
+        If ``True``, the kernel matrix between the most recently applied sets
+        of points and the centres of the kernel is cached, so that applying
+        the transform to the same points again (e.g. the same template grid
+        for a target that changes every frame) only costs a matrix multiply.
 
     Raises
     ------
@@ -32,7 +39,12 @@ class ThinPlateSplines(Alignment, Transform, Invertible):
         TPS is only with on 2-dimensional data
     """
 
-    def __init__(self, source, target, kernel=None, min_singular_val=1e-4):
+    # The maximum number of kernel matrices cached if cache_kernel is True
+    _max_cached_kernels = 4
+
+    def __init__(
+        self, source, target, kernel=None, min_singular_val=1e-4, cache_kernel=False
+    ):
         Alignment.__init__(self, source, target)
         if self.n_dims != 2:
             raise ValueError("TPS can only be used on 2D data.")
@@ -40,6 +52,8 @@ class ThinPlateSplines(Alignment, Transform, Invertible):
             kernel = R2LogR2RBF(source.points)
         self.min_singular_val = min_singular_val
         self.kernel = kernel
+        self.cache_kernel = cache_kernel
+        self._kernel_cache = OrderedDict()
         # k[i, j] is the rbf weighting between source i and j
         # (of course, k is thus symmetrical and it's diagonal nil)
         self.k = self.kernel.apply(self.source.points)
@@ -51,20 +65,49 @@ class ThinPlateSplines(Alignment, Transform, Invertible):
         top_l = np.concatenate([self.k, self.p], axis=1)
         bot_l = np.concatenate([self.p.T, o], axis=1)
         self.l = np.concatenate([top_l, bot_l], axis=0)
+        # l only depends on the source, so it is only inverted once here.
+        # If two points are coincident, or very close to being so, then the
+        # matrix is rank deficient and thus not-invertible. Therefore,
+        # only take the inverse on the full-rank set of indices.
+        _u, _s, _v = np.linalg.svd(self.l)
+        keep = _s.shape[0] - sum(_s < self.min_singular_val)
+        self.inv_l = _u[:, :keep].dot(1.0 / _s[:keep, None] * _v[:keep, :])
         self.v, self.y, self.coefficients = None, None, None
         self._build_coefficients()
 
     def _build_coefficients(self):
         self.v = self.target.points.T.copy()
         self.y = np.hstack([self.v, np.zeros([2, 3])])
+        self.coefficients = self.inv_l.dot(self.y.T)
 
-        # If two points are coincident, or very close to being so, then the
-        # matrix is rank deficient and thus not-invertible. Therefore,
-        # only take the inverse on the full-rank set of indices.
-        _u, _s, _v = np.linalg.svd(self.l)
-        keep = _s.shape[0] - sum(_s < self.min_singular_val)
-        inv_l = _u[:, :keep].dot(1.0 / _s[:keep, None] * _v[:keep, :])
-        self.coefficients = inv_l.dot(self.y.T)
+    def _kernel_matrix(self, points):
+        r"""
+        The kernel matrix between the given points and the centres of the
+        kernel, cached if ``cache_kernel`` is ``True``.
+        """
+        if not self.cache_kernel:
+            return self.kernel.apply(points)
+        key = _array_key(points)
+        # Popping and reinserting (rather than moving) the entry keeps the
+        # cache consistent if it is used by several threads at once
+        entry = self._kernel_cache.pop(key, None)
+        if entry is None or not np.array_equal(entry[0], points):
+            entry = (np.array(points), self.kernel.apply(points))
+        # Insert as the most recently used kernel matrix
+        self._kernel_cache[key] = entry
+        while len(self._kernel_cache) > self._max_cached_kernels:
+            self._kernel_cache.popitem(last=False)
+        return entry[1]
+
+    def _apply_bytes_per_point(self):
+        # The kernel matrix (and its intermediate results) dominate
+        return self.kernel._apply_bytes_per_point()
+
+    def clear_kernel_cache(self):
+        r"""
+        Discard all of the cached kernel matrices.
+        """
+        self._kernel_cache.clear()
 
     def _sync_state_from_target(self):
         # now the target is updated, we only have to rebuild the
@@ -103,7 +146,7 @@ class ThinPlateSplines(Alignment, Transform, Invertible):
         f_affine = c_affine_c + c_affine_x * x + c_affine_y * y
         # calculate a distance matrix (for L2 Norm) between every source
         # and the target
-        kernel_dist = self.kernel.apply(points)
+        kernel_dist = self._kernel_matrix(points)
         # grab the affine free components of the warp
         c_affine_free = self.coefficients[:-3]
         # build the affine free warp component
@@ -126,4 +169,6 @@ class ThinPlateSplines(Alignment, Transform, Invertible):
 
         :type: ``type(self)``
         """
-        return ThinPlateSplines(self.target, self.source, kernel=self.kernel)
+        return ThinPlateSplines(
+            self.target, self.source, kernel=self.kernel, cache_kernel=self.cache_kernel
+        )